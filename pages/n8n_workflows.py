@@ -9,7 +9,11 @@ import os
 
 # Add utils to path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'utils'))
-from n8n_integration import N8NAgent, WebhookManager, CSVManager, AutomationWorkflows, initialize_sample_data
+from n8n_integration import (
+    get_shared_csv_manager, get_shared_log_rollup, get_shared_n8n_agent, get_shared_query_engine,
+    get_shared_scheduler, get_shared_webhook_manager, get_shared_workflow_deployer,
+    get_shared_workflow_engine, get_shared_workflow_registry
+)
 
 def n8n_workflows_page():
     """N8N Workflows Management Page"""
@@ -21,13 +25,15 @@ def n8n_workflows_page():
     </div>
     """, unsafe_allow_html=True)
     
-    # Initialize managers
+    # Managers are process-wide singletons; sessions only keep references to them
     if 'n8n_agent' not in st.session_state:
-        st.session_state.n8n_agent = N8NAgent()
+        st.session_state.n8n_agent = get_shared_n8n_agent()
     if 'webhook_manager' not in st.session_state:
-        st.session_state.webhook_manager = WebhookManager()
+        st.session_state.webhook_manager = get_shared_webhook_manager()
     if 'csv_manager' not in st.session_state:
-        st.session_state.csv_manager = initialize_sample_data()
+        st.session_state.csv_manager = get_shared_csv_manager()
+    if 'query_engine' not in st.session_state:
+        st.session_state.query_engine = get_shared_query_engine()
     
     # Tabs for different sections
     tab1, tab2, tab3, tab4 = st.tabs(["🔄 Workflows", "🔗 Webhooks", "📊 CSV Management", "📈 Analytics"])
@@ -54,25 +60,42 @@ def workflow_management_section():
         # Pre-built workflows
         st.markdown("### 📋 Pre-built Workflows")
         
-        workflows = {
-            "Lead Generation Bot": AutomationWorkflows.lead_generation_workflow(),
-            "Appointment Scheduler": AutomationWorkflows.appointment_scheduling_workflow(),
-            "Customer Follow-up": AutomationWorkflows.customer_follow_up_workflow(),
-            "Invoice Generator": AutomationWorkflows.invoice_generation_workflow()
+        if st.button("🚀 Deploy All Workflows", use_container_width=True):
+            result = get_shared_workflow_deployer().deploy_all()
+            if result["success"]:
+                actions = [r["action"] for r in result["results"].values()]
+                st.success(f"✅ {actions.count('created')} created, {actions.count('updated')} updated, "
+                           f"{actions.count('unchanged')} unchanged")
+            else:
+                st.error(f"❌ Deployment failed: {result.get('error') or 'see individual workflows'}")
+        
+        # Definitions are loaded, validated and frozen once per process by the shared registry
+        registry = get_shared_workflow_registry()
+        labels = {
+            "lead_generation_workflow": "Lead Generation Bot",
+            "appointment_scheduling_workflow": "Appointment Scheduler",
+            "customer_follow_up_workflow": "Customer Follow-up",
+            "invoice_generation_workflow": "Invoice Generator"
         }
+        workflows = {labels[key]: definition for key, definition in registry.builtin().items()}
+        
+        if registry.errors:
+            st.warning("⚠️ Skipped invalid workflow definitions: " +
+                       "; ".join(f"{key} ({error})" for key, error in registry.errors.items()))
         
         for workflow_name, workflow_config in workflows.items():
             with st.expander(f"🔧 {workflow_name}"):
-                st.json(workflow_config)
+                st.json(workflow_config.json)
                 
                 col_a, col_b, col_c = st.columns(3)
                 with col_a:
                     if st.button(f"Deploy {workflow_name}", key=f"deploy_{workflow_name}"):
-                        result = st.session_state.n8n_agent.create_workflow(workflow_config)
+                        result = get_shared_workflow_deployer().deploy_all({workflow_config["name"]: workflow_config})
                         if result["success"]:
                             st.success(f"✅ {workflow_name} deployed successfully!")
                         else:
-                            st.error(f"❌ Failed to deploy: {result.get('error', 'Unknown error')}")
+                            error = result.get("error") or next(iter(result["results"].values()))["error"]
+                            st.error(f"❌ Failed to deploy: {error or 'Unknown error'}")
                 
                 with col_b:
                     if st.button(f"Execute {workflow_name}", key=f"execute_{workflow_name}"):
@@ -82,33 +105,60 @@ def workflow_management_section():
                 
                 with col_c:
                     if st.button(f"Test {workflow_name}", key=f"test_{workflow_name}"):
-                        st.info(f"🧪 Testing {workflow_name}...")
-                        st.success(f"✅ {workflow_name} test completed!")
+                        # Dry run on the local engine: no n8n round-trips and no CSV writes
+                        result = get_shared_workflow_engine().run(workflow_config, [{}], dry_run=True, batch=True)
+                        if result["success"]:
+                            st.success(f"✅ {workflow_name} test completed in {result['duration'] * 1000:.1f} ms!")
+                            st.json(result["nodes"])
+                        else:
+                            st.error(f"❌ Test failed: {result['error']}")
     
     with col2:
         # Workflow status
         st.markdown("### 📊 Workflow Status")
         
-        status_data = {
-            'Workflow': ['Lead Generation', 'Appointment Scheduler', 'Follow-up Assistant', 'Invoice Generator'],
-            'Status': ['Active', 'Active', 'Active', 'Paused'],
-            'Last Run': ['2 min ago', '1 hour ago', '30 min ago', '1 day ago'],
-            'Success Rate': [98, 95, 92, 100]
-        }
-        
-        status_df = pd.DataFrame(status_data)
+        scheduler = get_shared_scheduler()
+        schedules = scheduler.get_status()
+        if scheduler.errors:
+            st.warning("⚠️ Not scheduled: " +
+                       "; ".join(f"{name} ({error})" for name, error in scheduler.errors.items()))
         
-        for _, row in status_df.iterrows():
-            status_color = "🟢" if row['Status'] == 'Active' else "🟡"
+        for workflow_name, workflow_config in workflows.items():
+            job = schedules.get(workflow_config["name"])
+            if job is None:
+                status, last_run, next_run, success = "On demand", "—", "On webhook call", "—"
+            else:
+                status = "Running" if job['running'] else "Active"
+                last_run = format_relative(job['last_run'])
+                next_run = format_relative(job['next_run'])
+                success = f"{job['successes'] / job['runs'] * 100:.0f}%" if job['runs'] else "—"
+            status_color = "🟡" if job is None else "🔴" if job['last_status'] == 'error' else "🟢"
             st.markdown(f"""
             <div class="metric-card" style="margin: 10px 0; padding: 15px;">
-                <h4>{status_color} {row['Workflow']}</h4>
-                <p>Status: {row['Status']}<br>
-                Last Run: {row['Last Run']}<br>
-                Success: {row['Success Rate']}%</p>
+                <h4>{status_color} {workflow_name}</h4>
+                <p>Status: {status}<br>
+                Last Run: {last_run}<br>
+                Next Run: {next_run}<br>
+                Success: {success}</p>
             </div>
             """, unsafe_allow_html=True)
 
+def format_relative(moment):
+    """Format a datetime as a short relative time like '5 min ago' or 'in 2 h'"""
+    if moment is None:
+        return "Never"
+    seconds = (moment - datetime.now()).total_seconds()
+    magnitude = abs(seconds)
+    if magnitude < 60:
+        return "just now" if seconds <= 0 else "in under a minute"
+    if magnitude < 3600:
+        amount = f"{magnitude // 60:.0f} min"
+    elif magnitude < 86400:
+        amount = f"{magnitude // 3600:.0f} h"
+    else:
+        amount = f"{magnitude // 86400:.0f} days"
+    return f"{amount} ago" if seconds < 0 else f"in {amount}"
+
 def webhook_management_section():
     """Webhook management section"""
     st.subheader("🔗 Webhook Management")
@@ -143,13 +193,26 @@ def webhook_management_section():
             if test_webhook != "No webhooks created":
                 try:
                     data = json.loads(test_data)
-                    result = st.session_state.webhook_manager.send_webhook_data(test_webhook, data)
-                    if result["success"]:
-                        st.success("✅ Test data sent successfully!")
-                    else:
-                        st.error(f"❌ Failed to send: {result.get('error', 'Unknown error')}")
+                    ticket = st.session_state.webhook_manager.send_webhook_data_async(test_webhook, data)
+                    st.session_state.setdefault('webhook_tickets', []).append((test_webhook, ticket))
+                    st.info("📤 Test data queued for delivery")
                 except json.JSONDecodeError:
                     st.error("❌ Invalid JSON format")
+        
+        # Report deliveries that finished since the last rerun
+        pending_tickets = []
+        for name, ticket in st.session_state.get('webhook_tickets', []):
+            if not ticket.done():
+                pending_tickets.append((name, ticket))
+                continue
+            result = ticket.result()
+            if result["success"]:
+                st.success(f"✅ Test data sent to {name} successfully!")
+            else:
+                st.error(f"❌ Failed to send to {name}: {result.get('error', 'Unknown error')}")
+        st.session_state.webhook_tickets = pending_tickets
+        if pending_tickets:
+            st.caption(f"⏳ {len(pending_tickets)} delivery(ies) in flight")
     
     with col2:
         st.markdown("### 📊 Active Webhooks")
@@ -219,6 +282,9 @@ def csv_management_section():
                         col_a, col_b, col_c = st.columns([2, 1, 1])
                         with col_a:
                             st.text(file)
+                            info = st.session_state.csv_manager.get_file_info(file, category)
+                            if info is not None:
+                                st.caption(f"{info['rows']} rows · {len(info['columns'])} columns · {info['size'] / 1024:.1f} KB")
                         with col_b:
                             if st.button("View", key=f"view_{category}_{file}"):
                                 df = st.session_state.csv_manager.load_csv(file, category)
@@ -259,10 +325,10 @@ def csv_management_section():
                 st.markdown("### 🔍 Filter Data")
                 if len(df.columns) > 0:
                     filter_column = st.selectbox("Filter Column", df.columns)
-                    if df[filter_column].dtype in ['object', 'string']:
+                    if not pd.api.types.is_numeric_dtype(df[filter_column]):
                         filter_value = st.text_input("Contains")
                         if filter_value:
-                            filtered_df = df[df[filter_column].str.contains(filter_value, na=False)]
+                            filtered_df = df[df[filter_column].astype(str).str.contains(filter_value, na=False)]
                             st.dataframe(filtered_df, use_container_width=True)
                     else:
                         min_val = st.number_input("Minimum Value", value=float(df[filter_column].min()))
@@ -278,22 +344,19 @@ def analytics_section():
     """Analytics and reporting section"""
     st.subheader("📈 Automation Analytics")
     
-    # Load automation logs
-    automation_logs = st.session_state.csv_manager.load_csv('automation_logs.csv', 'automations')
+    # Pre-aggregated per (day, workflow); only rows appended since the last rerun are read
+    rollup = get_shared_log_rollup()
+    daily_executions = rollup.daily_executions()
     
-    if automation_logs is not None:
+    if not daily_executions.empty:
+        summary = rollup.workflow_summary()
         col1, col2 = st.columns(2)
         
         with col1:
             # Workflow execution trends
             st.markdown("### 📊 Workflow Execution Trends")
             
-            daily_executions = automation_logs.groupby([
-                automation_logs['execution_time'].str[:10], 
-                'workflow_name'
-            ]).size().reset_index(name='executions')
-            
-            fig = px.line(daily_executions, x='execution_time', y='executions', 
+            fig = px.line(daily_executions, x='day', y='executions', 
                          color='workflow_name', title="Daily Workflow Executions")
             fig.update_layout(
                 plot_bgcolor='rgba(0,0,0,0)',
@@ -304,9 +367,7 @@ def analytics_section():
             
             # Success rate by workflow
             st.markdown("### ✅ Success Rates")
-            success_rates = automation_logs.groupby('workflow_name')['status'].apply(
-                lambda x: (x == 'success').mean() * 100
-            ).reset_index()
+            success_rates = summary[['workflow_name', 'success_rate']]
             success_rates.columns = ['Workflow', 'Success Rate']
             
             fig = px.bar(success_rates, x='Workflow', y='Success Rate', 
@@ -323,7 +384,7 @@ def analytics_section():
             # Performance metrics
             st.markdown("### ⚡ Performance Metrics")
             
-            avg_duration = automation_logs.groupby('workflow_name')['execution_duration'].mean().reset_index()
+            avg_duration = summary[['workflow_name', 'avg_duration']]
             avg_duration.columns = ['Workflow', 'Avg Duration (s)']
             
             fig = px.bar(avg_duration, x='Workflow', y='Avg Duration (s)', 
@@ -338,7 +399,7 @@ def analytics_section():
             
             # Records processed
             st.markdown("### 📊 Records Processed")
-            total_records = automation_logs.groupby('workflow_name')['records_processed'].sum().reset_index()
+            total_records = summary[['workflow_name', 'total_records']]
             total_records.columns = ['Workflow', 'Total Records']
             
             fig = px.pie(total_records, values='Total Records', names='Workflow', 
@@ -353,7 +414,7 @@ def analytics_section():
         
         # Recent activity
         st.markdown("### 🕒 Recent Activity")
-        recent_logs = automation_logs.sort_values('execution_time', ascending=False).head(10)
+        recent_logs = rollup.recent()
         
         for _, log in recent_logs.iterrows():
             status_icon = "✅" if log['status'] == 'success' else "❌"
@@ -374,6 +435,19 @@ def analytics_section():
     
     else:
         st.info("No automation logs available. Run some workflows to see analytics!")
+    
+    # Ad-hoc SQL over every data file
+    with st.expander("🧮 SQL Query"):
+        tables = st.session_state.query_engine.list_tables()
+        st.caption("Read-only (SELECT). Tables: " + ", ".join(tables.keys()))
+        sql = st.text_area("Query", value=(
+            "SELECT substr(execution_time, 1, 10) AS day, workflow_name, COUNT(*) AS executions\n"
+            "FROM automations_automation_logs GROUP BY day, workflow_name"
+        ))
+        if st.button("Run Query"):
+            result = st.session_state.query_engine.query(sql)
+            if result is not None:
+                st.dataframe(result, use_container_width=True)
 
 if __name__ == "__main__":
     n8n_workflows_page()
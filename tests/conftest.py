@@ -0,0 +1,138 @@
+import gzip
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class StubN8N:
+    """Minimal stand-in for the n8n REST API and webhook endpoints, backed by in-memory state"""
+
+    def __init__(self):
+        self.workflows = {}
+        self.executions = {}
+        self.requests = []
+        # Status codes to answer the next requests with, in order; 200 once exhausted
+        self.status_codes = []
+        self.delay = 0.0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _body(self):
+                raw = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                if self.headers.get("Content-Encoding") == "gzip":
+                    raw = gzip.decompress(raw)
+                return json.loads(raw) if raw else None
+
+            def _send(self, status, body, headers=None):
+                encoded = json.dumps(body).encode("utf-8") if body is not None else b""
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(encoded)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(encoded)
+
+            def _handle(self, method):
+                body = self._body() if method in ("POST", "PUT") else None
+                with stub._lock:
+                    stub.requests.append((method, self.path, body))
+                    status = stub.status_codes.pop(0) if stub.status_codes else 200
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                try:
+                    if stub.delay:
+                        time.sleep(stub.delay)
+                    if status >= 300:
+                        return self._send(status, {"message": f"stub error {status}"})
+                    status, reply = stub.respond(method, self.path, body)
+                    if status >= 300:
+                        return self._send(status, reply)
+                    etag = '"' + hashlib.sha1(json.dumps(reply, sort_keys=True).encode()).hexdigest() + '"'
+                    if method == "GET" and self.headers.get("If-None-Match") == etag:
+                        return self._send(304, None, {"ETag": etag})
+                    self._send(200, reply, {"ETag": etag})
+                finally:
+                    with stub._lock:
+                        stub.in_flight -= 1
+
+            def do_GET(self):
+                self._handle("GET")
+
+            def do_POST(self):
+                self._handle("POST")
+
+            def do_PUT(self):
+                self._handle("PUT")
+
+        return Handler
+
+    def respond(self, method, path, body):
+        """(status, body) for a request that was not answered with a scripted status code"""
+        parts = urlsplit(path)
+        path, query = parts.path, parse_qs(parts.query)
+        if path == "/api/v1/workflows" and method == "GET":
+            workflows = list(self.workflows.values())
+            limit = int(query.get("limit", [len(workflows) or 1])[0])
+            start = int(query.get("cursor", [0])[0])
+            next_cursor = str(start + limit) if start + limit < len(workflows) else None
+            return 200, {"data": workflows[start:start + limit], "nextCursor": next_cursor}
+        if path == "/api/v1/workflows" and method == "POST":
+            workflow_id = str(len(self.workflows) + 1)
+            self.workflows[workflow_id] = dict(body, id=workflow_id)
+            return 200, self.workflows[workflow_id]
+        if path.startswith("/api/v1/workflows/") and path.endswith("/execute"):
+            return 200, {"executionId": str(len(self.requests)), "input": body}
+        if path.startswith("/api/v1/workflows/"):
+            workflow_id = path.rsplit("/", 1)[1]
+            if method == "PUT":
+                self.workflows[workflow_id] = dict(body, id=workflow_id)
+            if workflow_id not in self.workflows:
+                return 404, {"message": "Not Found"}
+            return 200, self.workflows[workflow_id]
+        if path == "/api/v1/executions":
+            executions = [execution for execution in self.executions.values()
+                          if execution.get("workflowId") == query.get("workflowId", [None])[0]]
+            return 200, {"data": executions, "nextCursor": None}
+        if path.startswith("/api/v1/executions/"):
+            execution_id = path.rsplit("/", 1)[1]
+            if execution_id not in self.executions:
+                return 404, {"message": "Not Found"}
+            return 200, self.executions[execution_id]
+        return 200, {"received": body}
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def n8n():
+    stub = StubN8N()
+    stub.start()
+    yield stub
+    stub.stop()
@@ -0,0 +1,59 @@
+import time
+
+from utils.n8n_integration import CircuitBreakerRegistry, N8NAgent
+
+
+def make_agent(n8n, **options):
+    options.setdefault("backoff_factor", 0)
+    return N8NAgent(n8n.url, breakers=CircuitBreakerRegistry(), cache_ttls={"/api/v1/workflows": 0}, **options)
+
+
+def test_idempotent_requests_are_retried_on_server_errors(n8n):
+    n8n.status_codes = [503, 502]
+    agent = make_agent(n8n, max_retries=3)
+
+    assert agent.list_workflows()["success"]
+    assert [method for method, _, _ in n8n.requests] == ["GET"] * 3
+
+
+def test_retries_give_up_after_max_retries(n8n):
+    n8n.status_codes = [503] * 5
+    agent = make_agent(n8n, max_retries=2)
+
+    result = agent.list_workflows()
+
+    assert not result["success"]
+    assert result["error"].startswith("HTTP 503")
+    assert len(n8n.requests) == 3
+
+
+def test_posts_are_not_retried(n8n):
+    n8n.status_codes = [503]
+    agent = make_agent(n8n, max_retries=3)
+
+    agent.execute_workflow("7", {"lead": 1})
+
+    assert [method for method, _, _ in n8n.requests] == ["POST"]
+
+
+def test_read_timeout_bounds_a_slow_server(n8n):
+    n8n.delay = 1.0
+    agent = make_agent(n8n, max_retries=0, read_timeout=0.1)
+
+    started = time.monotonic()
+    result = agent.get_workflow_status("1")
+
+    assert not result["success"]
+    assert time.monotonic() - started < 0.9
+
+
+def test_session_pool_is_sized_and_reused(n8n):
+    agent = make_agent(n8n, pool_size=5)
+    adapter = agent.session.get_adapter(n8n.url)
+
+    agent.list_workflows()
+    agent.list_workflows()
+
+    assert adapter._pool_maxsize == 5
+    assert agent.session.get_adapter(n8n.url) is adapter
+    assert agent.session.headers["X-N8N-API-KEY"] == "demo-api-key"
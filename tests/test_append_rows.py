@@ -0,0 +1,76 @@
+import os
+import threading
+
+import pandas as pd
+
+from utils.n8n_integration import CSVManager, DataFrameCache
+
+
+def make_manager(tmp_path):
+    return CSVManager(str(tmp_path / "data"), cache=DataFrameCache())
+
+
+def leads_path(tmp_path):
+    return tmp_path / "data" / "clients" / "leads.csv"
+
+
+def test_rows_are_aligned_to_the_existing_header(tmp_path):
+    manager = make_manager(tmp_path)
+    assert manager.append_rows({"lead_id": 1, "name": "Ada", "email": "ada@example.com"}, "leads.csv", "clients")
+    assert manager.append_rows([{"email": "bob@example.com", "lead_id": 2}], "leads.csv", "clients")
+
+    assert leads_path(tmp_path).read_text() == "lead_id,name,email\n1,Ada,ada@example.com\n2,,bob@example.com\n"
+    assert manager.load_csv("leads.csv", "clients")["lead_id"].tolist() == [1, 2]
+
+
+def test_unknown_columns_are_rejected_without_writing(tmp_path):
+    manager = make_manager(tmp_path)
+    manager.append_rows({"lead_id": 1, "name": "Ada"}, "leads.csv", "clients")
+    before = leads_path(tmp_path).read_bytes()
+
+    assert not manager.append_rows({"lead_id": 2, "phone": "555"}, "leads.csv", "clients")
+    assert leads_path(tmp_path).read_bytes() == before
+
+
+def test_missing_trailing_newline_is_repaired(tmp_path):
+    manager = make_manager(tmp_path)
+    path = leads_path(tmp_path)
+    path.write_text("lead_id,name\n1,Ada")
+
+    assert manager.append_rows({"lead_id": 2, "name": "Bob"}, "leads.csv", "clients")
+    assert path.read_text() == "lead_id,name\n1,Ada\n2,Bob\n"
+
+
+def test_failed_write_is_rolled_back(tmp_path, monkeypatch):
+    manager = make_manager(tmp_path)
+    manager.append_rows({"lead_id": 1, "name": "Ada"}, "leads.csv", "clients")
+    before = leads_path(tmp_path).read_bytes()
+
+    def fail(fd):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, "fsync", fail)
+    assert not manager.append_rows({"lead_id": 2, "name": "Bob"}, "leads.csv", "clients")
+    assert leads_path(tmp_path).read_bytes() == before
+
+
+def test_concurrent_appends_and_batches_keep_every_row(tmp_path):
+    manager = make_manager(tmp_path)
+    manager.append_rows({"lead_id": 0, "name": "seed"}, "leads.csv", "clients")
+
+    def worker(start):
+        for i in range(start, start + 20):
+            manager.append_rows({"lead_id": i, "name": f"Lead {i}"}, "leads.csv", "clients", fsync=False)
+
+    threads = [threading.Thread(target=worker, args=(start,)) for start in (1, 21, 41)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    with manager.append_batch() as batch:
+        for i in range(61, 71):
+            batch.append_rows({"lead_id": i, "name": f"Lead {i}"}, "leads.csv", "clients")
+
+    ids = manager.load_csv("leads.csv", "clients")["lead_id"]
+    assert sorted(ids) == list(range(71))
+    assert ids.tolist()[-10:] == list(range(61, 71))
@@ -0,0 +1,42 @@
+import logging
+
+import pytest
+
+from utils.n8n_integration import AsyncN8NAgent, CircuitBreakerRegistry, N8NAgent
+
+
+def make_agent(n8n, max_workers=4):
+    agent = N8NAgent(n8n.url, max_retries=0, pool_size=max_workers, breakers=CircuitBreakerRegistry())
+    return AsyncN8NAgent(agent, max_workers=max_workers)
+
+
+def test_execute_many_returns_one_result_per_input(n8n):
+    client = make_agent(n8n)
+    inputs = [{"lead": i} for i in range(10)]
+    results = client.execute_many_sync("7", inputs, concurrency=3)
+    client.close()
+
+    assert sorted(result["index"] for result in results) == list(range(10))
+    assert all(result["result"]["success"] for result in results)
+    assert {result["result"]["data"]["input"]["input"]["lead"] for result in results} == set(range(10))
+    assert n8n.max_in_flight <= 3
+
+
+def test_execute_many_rejects_zero_concurrency(n8n):
+    client = make_agent(n8n)
+    with pytest.raises(ValueError):
+        client.execute_many_sync("7", [{"lead": 1}], concurrency=0)
+    client.close()
+
+
+def test_execute_many_concurrency_above_max_workers_is_honoured(n8n, caplog):
+    n8n.delay = 0.2
+    client = make_agent(n8n, max_workers=2)
+    with caplog.at_level(logging.WARNING, logger="urllib3.connectionpool"):
+        results = client.execute_many_sync("7", [{"lead": i} for i in range(6)], concurrency=6)
+    client.close()
+
+    assert len(results) == 6
+    assert n8n.max_in_flight > 2
+    assert client.agent.pool_size == 6
+    assert not [record for record in caplog.records if "Connection pool is full" in record.getMessage()]
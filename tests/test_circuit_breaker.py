@@ -0,0 +1,82 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from utils.n8n_integration import CircuitBreaker, CircuitBreakerRegistry, CircuitOpenError, N8NAgent
+
+
+def reply(status_code=200):
+    return SimpleNamespace(status_code=status_code)
+
+
+def test_breaker_opens_then_half_opens_for_one_probe():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert breaker.state == "half_open" and not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and breaker.times_opened == 2
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_success()
+    assert (breaker.state, breaker.failures) == ("closed", 0)
+
+
+def test_registry_fails_fast_once_open():
+    registry = CircuitBreakerRegistry(failure_threshold=2, reset_timeout=60)
+    sends = []
+
+    def send():
+        sends.append(1)
+        return reply(503)
+
+    for _ in range(2):
+        assert registry.call("GET /x", send).status_code == 503
+    with pytest.raises(CircuitOpenError):
+        registry.call("GET /x", send)
+
+    metrics = registry.metrics()["GET /x"]
+    assert len(sends) == 2
+    assert (metrics["state"], metrics["requests"], metrics["failures"], metrics["rejected"]) == ("open", 2, 2, 1)
+    assert registry.call("GET /y", lambda: reply()).status_code == 200
+
+
+def test_slow_requests_are_hedged_past_the_latency_percentile():
+    registry = CircuitBreakerRegistry(min_hedge_samples=3)
+    for _ in range(3):
+        registry.call("GET /x", lambda: reply(), hedge_percentile=95)
+    calls = []
+    lock = threading.Lock()
+
+    def send():
+        with lock:
+            calls.append(1)
+            first = len(calls) == 1
+        time.sleep(1.0 if first else 0)
+        return reply(201 if first else 200)
+
+    started = time.monotonic()
+    assert registry.call("GET /x", send, hedge_percentile=95).status_code == 200
+    assert time.monotonic() - started < 0.9
+    metrics = registry.metrics()["GET /x"]
+    assert (metrics["hedged"], metrics["hedge_wins"]) == (1, 1)
+
+
+def test_agent_calls_share_one_breaker_per_endpoint(n8n):
+    n8n.status_codes = [503, 503]
+    agent = N8NAgent(n8n.url, max_retries=0, breakers=CircuitBreakerRegistry(failure_threshold=2))
+
+    results = [agent.get_workflow_status(execution_id) for execution_id in ("1", "2", "3")]
+
+    assert [result["success"] for result in results] == [False, False, False]
+    assert "Circuit open" in results[2]["error"]
+    assert len(n8n.requests) == 2
+    assert agent.get_metrics()[f"GET {n8n.url}/api/v1/executions/{{id}}"]["state"] == "open"
@@ -0,0 +1,62 @@
+import os
+
+import pandas as pd
+import pytest
+
+from utils.n8n_integration import PYARROW_AVAILABLE, CSVManager, DataFrameCache
+
+pytestmark = pytest.mark.skipif(not PYARROW_AVAILABLE, reason="pyarrow is not installed")
+
+LOGS = pd.DataFrame({"log_id": [1, 2, 3], "workflow_name": ["A", "B", "A"], "status": ["success", "error", "success"],
+                     "execution_duration": [1.5, 2.0, 0.25]})
+
+
+def make_manager(tmp_path, storage_format):
+    return CSVManager(str(tmp_path / "data"), cache=DataFrameCache(), storage_format=storage_format)
+
+
+@pytest.mark.parametrize("storage_format, extension", [("parquet", ".parquet"), ("feather", ".feather")])
+def test_csv_is_converted_on_first_read(tmp_path, storage_format, extension):
+    make_manager(tmp_path, "csv").save_csv(LOGS, "automation_logs.csv", "automations")
+    manager = make_manager(tmp_path, storage_format)
+
+    df = manager.load_csv("automation_logs.csv", "automations", columns=["workflow_name", "status"])
+
+    folder = tmp_path / "data" / "automations"
+    assert sorted(os.listdir(folder)) == sorted([f"automation_logs{extension}", "automation_logs.csv.migrated"])
+    assert list(df.columns) == ["workflow_name", "status"]
+    pd.testing.assert_frame_equal(manager.load_csv("automation_logs.csv", "automations"), LOGS)
+    assert manager.list_csv_files("automations") == ["automation_logs.csv"]
+
+
+def test_migrate_storage_converts_every_file_once(tmp_path):
+    plain = make_manager(tmp_path, "csv")
+    plain.save_csv(LOGS, "automation_logs.csv", "automations")
+    plain.save_csv(LOGS.head(1), "clients.csv", "clients")
+    manager = make_manager(tmp_path, "parquet")
+
+    assert manager.migrate_storage() == 2
+    assert manager.migrate_storage() == 0
+
+
+def test_csv_manager_keeps_writing_to_the_migrated_file(tmp_path):
+    make_manager(tmp_path, "csv").save_csv(LOGS, "automation_logs.csv", "automations")
+    make_manager(tmp_path, "parquet").migrate_storage()
+    plain = make_manager(tmp_path, "csv")
+
+    assert plain.append_rows({"log_id": 4, "workflow_name": "C", "status": "success", "execution_duration": 1.0},
+                             "automation_logs.csv", "automations")
+
+    folder = tmp_path / "data" / "automations"
+    assert not os.path.exists(folder / "automation_logs.csv")
+    assert plain.load_csv("automation_logs.csv", "automations")["log_id"].tolist() == [1, 2, 3, 4]
+
+
+def test_failed_conversion_leaves_the_csv_in_place(tmp_path):
+    folder = tmp_path / "data" / "automations"
+    folder.mkdir(parents=True)
+    (folder / "broken.csv").write_text('a,b\n1,"unterminated\n')
+    manager = make_manager(tmp_path, "parquet")
+
+    assert manager.load_csv("broken.csv", "automations") is None
+    assert sorted(os.listdir(folder)) == ["broken.csv"]
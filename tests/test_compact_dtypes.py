@@ -0,0 +1,77 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from utils.n8n_integration import CSVManager, DataFrameCache
+
+
+def make_manager(tmp_path, **options):
+    return CSVManager(str(tmp_path / "data"), cache=DataFrameCache(), compact_dtypes=True, **options)
+
+
+def clients(rows=100):
+    return pd.DataFrame({
+        "client_id": np.arange(1, rows + 1),
+        "status": ["active" if i % 3 else "paused" for i in range(rows)],
+        "region": [["north", "south"][i % 2] for i in range(rows)],
+        "email": [f"c{i}@example.com" for i in range(rows)],
+        "visits": np.arange(rows, dtype=np.int64),
+        "monthly_amount": [i * 0.5 for i in range(rows)],
+        "created_at": pd.date_range("2026-01-01", periods=rows, freq="D").strftime("%Y-%m-%d")
+    })
+
+
+def test_load_compacts_dtypes_and_keeps_ids_wide(tmp_path):
+    manager = make_manager(tmp_path)
+    manager.save_csv(clients(), "clients.csv", "clients")
+
+    df = manager.load_csv("clients.csv", "clients")
+
+    assert isinstance(df["status"].dtype, pd.CategoricalDtype)
+    assert isinstance(df["region"].dtype, pd.CategoricalDtype)
+    assert not isinstance(df["email"].dtype, pd.CategoricalDtype)
+    assert pd.api.types.is_datetime64_any_dtype(df["created_at"])
+    assert df["client_id"].dtype == np.int64
+    assert df["visits"].dtype == np.int32
+    assert df["monthly_amount"].dtype == np.float32
+    plain = CSVManager(str(tmp_path / "data"), cache=DataFrameCache()).load_csv("clients.csv", "clients")
+    assert df.memory_usage(deep=True).sum() < plain.memory_usage(deep=True).sum()
+
+
+def test_schema_sidecar_is_reused_and_dropped_on_save(tmp_path):
+    manager = make_manager(tmp_path)
+    manager.save_csv(clients(), "clients.csv", "clients")
+    manager.load_csv("clients.csv", "clients")
+    schema_path = tmp_path / "data" / "clients" / ".schemas" / "clients.csv.json"
+
+    schema = json.loads(schema_path.read_text())
+    assert schema["dtypes"]["status"] == "category"
+    assert schema["parse_dates"] == ["created_at"]
+
+    reloaded = make_manager(tmp_path).load_csv("clients.csv", "clients")
+    assert isinstance(reloaded["region"].dtype, pd.CategoricalDtype)
+
+    manager.save_csv(clients(10), "clients.csv", "clients")
+    assert not os.path.exists(schema_path)
+
+
+def test_values_that_outgrow_the_stored_width_survive(tmp_path):
+    manager = make_manager(tmp_path)
+    manager.save_csv(clients(), "clients.csv", "clients")
+    manager.load_csv("clients.csv", "clients")
+
+    row = clients(1).assign(client_id=101, visits=2 ** 40)
+    assert manager.append_rows(row, "clients.csv", "clients")
+
+    df = manager.load_csv("clients.csv", "clients")
+    assert df["visits"].iloc[-1] == 2 ** 40
+    assert df["client_id"].max() + 1 == 102
+
+
+def test_schema_hints_override_inference(tmp_path):
+    manager = make_manager(tmp_path, schema_hints={"clients": {"email": "category"}})
+    manager.save_csv(clients(), "clients.csv", "clients")
+
+    assert isinstance(manager.load_csv("clients.csv", "clients")["email"].dtype, pd.CategoricalDtype)
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.n8n_integration import PYARROW_AVAILABLE, CSVManager, DataFrameCache
+
+FORMATS = ["csv"] + (["parquet"] if PYARROW_AVAILABLE else [])
+
+
+def sample_logs(rows=200):
+    return pd.DataFrame({
+        "log_id": np.arange(1, rows + 1),
+        "workflow_name": [f"Workflow {i % 4}" for i in range(rows)],
+        "execution_time": pd.date_range("2026-01-01", periods=rows, freq="h").strftime("%Y-%m-%d %H:%M:%S"),
+        "status": ["success" if i % 5 else "error" for i in range(rows)],
+        "region": [["north", "south", "east"][i % 3] for i in range(rows)],
+        "records_processed": [i % 7 for i in range(rows)],
+        "execution_duration": [np.nan if i % 11 == 0 else i / 4 for i in range(rows)]
+    })
+
+
+def make_manager(tmp_path, **options):
+    return CSVManager(str(tmp_path / "data"), cache=DataFrameCache(), **options)
+
+
+@pytest.mark.parametrize("storage_format", FORMATS)
+@pytest.mark.parametrize("compact_dtypes", [False, True])
+def test_streaming_filter_matches_in_memory_filter(tmp_path, storage_format, compact_dtypes):
+    manager = make_manager(tmp_path, storage_format=storage_format, compact_dtypes=compact_dtypes)
+    manager.save_csv(sample_logs(), "automation_logs.csv", "automations")
+    filters = {"records_processed": {"min": 2, "max": 5}, "region": {"contains": "th"}}
+
+    in_memory = manager.filter_csv_data("automation_logs.csv", filters, "automations")
+    streamed = manager.filter_csv_data("automation_logs.csv", filters, "automations", chunksize=17)
+
+    pd.testing.assert_frame_equal(streamed, in_memory)
+    if compact_dtypes:
+        assert isinstance(streamed["region"].dtype, pd.CategoricalDtype)
+        assert pd.api.types.is_datetime64_any_dtype(streamed["execution_time"])
+
+
+def test_streaming_filter_stops_after_limit(tmp_path):
+    manager = make_manager(tmp_path)
+    manager.save_csv(sample_logs(), "automation_logs.csv", "automations")
+
+    result = manager.filter_csv_data("automation_logs.csv", {"status": {"equals": "error"}}, "automations",
+                                     chunksize=10, limit=3)
+
+    assert list(result["log_id"]) == [1, 6, 11]
+    assert list(result.index) == [0, 5, 10]
@@ -0,0 +1,79 @@
+import os
+
+import pandas as pd
+
+from utils.n8n_integration import CSVManager, DataFrameCache
+
+
+def write(path, rows):
+    pd.DataFrame({"value": range(rows)}).to_csv(path, index=False)
+
+
+def test_hits_until_the_file_changes(tmp_path):
+    path = str(tmp_path / "data.csv")
+    write(path, 5)
+    cache = DataFrameCache()
+    reads = []
+
+    def loader(filepath):
+        reads.append(filepath)
+        return pd.read_csv(filepath)
+
+    first = cache.load(path, loader)
+    second = cache.load(path, loader)
+    assert len(reads) == 1
+    pd.testing.assert_frame_equal(first, second)
+
+    write(path, 8)
+    os.utime(path, ns=(os.stat(path).st_atime_ns, os.stat(path).st_mtime_ns + 1_000_000))
+    assert len(cache.load(path, loader)) == 8
+    assert len(reads) == 2
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 2)
+
+
+def test_callers_cannot_modify_the_cached_frame(tmp_path):
+    path = str(tmp_path / "data.csv")
+    write(path, 3)
+    cache = DataFrameCache()
+
+    frame = cache.load(path, pd.read_csv)
+    frame.loc[0, "value"] = 99
+    frame["extra"] = 1
+
+    cached = cache.load(path, pd.read_csv)
+    assert cached["value"].tolist() == [0, 1, 2]
+    assert "extra" not in cached.columns
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    paths = [str(tmp_path / f"{i}.csv") for i in range(3)]
+    for path in paths:
+        write(path, 100)
+    entry_bytes = int(pd.read_csv(paths[0]).memory_usage(deep=True).sum())
+    cache = DataFrameCache(max_bytes=entry_bytes * 2)
+
+    cache.load(paths[0], pd.read_csv)
+    cache.load(paths[1], pd.read_csv)
+    cache.load(paths[0], pd.read_csv)
+    cache.load(paths[2], pd.read_csv)
+
+    assert cache.get(paths[1]) is None
+    assert cache.get(paths[0]) is not None
+    assert cache.stats()["bytes"] <= cache.stats()["max_bytes"]
+
+    cache.configure(0)
+    assert cache.stats()["entries"] == 0
+
+
+def test_managers_share_a_cache_and_saves_invalidate_it(tmp_path):
+    cache = DataFrameCache()
+    writer = CSVManager(str(tmp_path / "data"), cache=cache)
+    reader = CSVManager(str(tmp_path / "data"), cache=cache)
+    writer.save_csv(pd.DataFrame({"value": [1]}), "numbers.csv", "reports")
+
+    assert reader.load_csv("numbers.csv", "reports")["value"].tolist() == [1]
+    assert writer.load_csv("numbers.csv", "reports")["value"].tolist() == [1]
+    assert cache.stats()["hits"] == 1
+
+    writer.save_csv(pd.DataFrame({"value": [2]}), "numbers.csv", "reports")
+    assert reader.load_csv("numbers.csv", "reports")["value"].tolist() == [2]
@@ -0,0 +1,50 @@
+import time
+
+from utils.n8n_integration import CircuitBreakerRegistry, ExecutionTracker, N8NAgent
+
+
+def make_tracker(n8n, **options):
+    agent = N8NAgent(n8n.url, max_retries=0, breakers=CircuitBreakerRegistry())
+    tracker = ExecutionTracker(agent, **options)
+    changes = []
+    tracker.subscribe(lambda execution_id, old, new, execution: changes.append((execution_id, old, new)))
+    return tracker, changes
+
+
+def test_finished_executions_are_resolved_from_the_listing(n8n):
+    n8n.executions["10"] = {"id": "10", "workflowId": "w1", "finished": True, "status": "success"}
+    n8n.executions["11"] = {"id": "11", "workflowId": "w1", "finished": False, "status": "running"}
+    tracker, changes = make_tracker(n8n, min_interval=0.0)
+    tracker.register("10", "w1")
+    tracker.register("11", "w1")
+
+    tracker.poll_once()
+
+    assert sorted(changes) == [("10", "unknown", "success"), ("11", "unknown", "running")]
+    assert tracker.get_status() == {"11": {"workflow_id": "w1", "status": "running"}}
+    assert [method for method, _, _ in n8n.requests] == ["GET"]
+
+
+def test_deleted_executions_resolve_as_not_found(n8n):
+    tracker, changes = make_tracker(n8n, min_interval=0.0)
+    tracker.register("404", "w1")
+
+    tracker.poll_once()
+
+    assert changes == [("404", "unknown", "not_found")]
+    assert tracker.get_status() == {}
+
+
+def test_errors_back_off_and_give_up_after_max_errors(n8n):
+    n8n.status_codes = [503] * 4
+    tracker, changes = make_tracker(n8n, min_interval=1.0, max_errors=2)
+    tracker.register("12", "w1")
+
+    tracker.poll_once()
+    assert changes == []
+    assert tracker.executions["12"]["next_poll"] - time.monotonic() > 1.5
+
+    tracker.executions["12"]["next_poll"] = 0
+    tracker.poll_once()
+    assert changes == [("12", "unknown", "unreachable")]
+    assert tracker.get_status() == {}
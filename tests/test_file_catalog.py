@@ -0,0 +1,60 @@
+import pandas as pd
+
+from utils.n8n_integration import CSVManager, DataFrameCache
+
+
+def make_manager(tmp_path):
+    return CSVManager(str(tmp_path / "data"), cache=DataFrameCache())
+
+
+def counting(monkeypatch, manager, method):
+    calls = []
+    original = getattr(manager, method)
+    monkeypatch.setattr(manager, method, lambda *args: calls.append(args) or original(*args))
+    return calls
+
+
+def test_listing_rescans_only_when_the_directory_changes(tmp_path, monkeypatch):
+    manager = make_manager(tmp_path)
+    manager.save_csv(pd.DataFrame({"a": [1]}), "one.csv", "reports")
+    scans = counting(monkeypatch, manager, "_scan_category")
+
+    assert manager.list_csv_files("reports") == ["one.csv"]
+    assert manager.list_csv_files("reports") == ["one.csv"]
+    assert len(scans) == 1
+
+    manager.save_csv(pd.DataFrame({"a": [2]}), "two.csv", "reports")
+    assert sorted(manager.list_csv_files("reports")) == ["one.csv", "two.csv"]
+    assert manager.delete_csv("one.csv", "reports")
+    assert manager.list_csv_files("reports") == ["two.csv"]
+    assert manager.list_csv_files("missing") == []
+
+
+def test_file_info_is_computed_once_per_file_version(tmp_path, monkeypatch):
+    manager = make_manager(tmp_path)
+    manager.save_csv(pd.DataFrame({"id": [1, 2], "note": ["one\nline two", "plain"]}), "notes.csv", "reports")
+    counts = counting(monkeypatch, manager, "_count_rows")
+
+    info = manager.get_file_info("notes.csv", "reports")
+    assert (info["rows"], info["columns"]) == (2, ["id", "note"])
+    assert info["schema"]["id"] == "int64"
+    manager.get_file_info("notes.csv", "reports")
+    assert len(counts) == 1
+
+    manager.save_csv(pd.DataFrame({"id": [1, 2, 3], "note": ["a", "b", "c"]}), "notes.csv", "reports")
+    assert manager.get_file_info("notes.csv", "reports")["rows"] == 3
+    assert len(counts) == 2
+
+
+def test_appends_bump_the_row_count_without_recounting(tmp_path, monkeypatch):
+    manager = make_manager(tmp_path)
+    manager.save_csv(pd.DataFrame({"id": [1, 2]}), "ids.csv", "reports")
+    manager.get_file_info("ids.csv", "reports")
+    counts = counting(monkeypatch, manager, "_count_rows")
+
+    manager.append_rows([{"id": 3}, {"id": 4}], "ids.csv", "reports")
+
+    info = manager.get_file_info("ids.csv", "reports")
+    assert info["rows"] == 4
+    assert counts == []
+    assert info["size"] == (tmp_path / "data" / "reports" / "ids.csv").stat().st_size
@@ -0,0 +1,71 @@
+import gzip
+import json
+from datetime import date, datetime
+from types import MappingProxyType
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.n8n_integration import ORJSON_AVAILABLE, CircuitBreakerRegistry, JSONSerializer, WebhookManager
+
+ENCODERS = [False] + ([True] if ORJSON_AVAILABLE else [])
+
+FRAME = pd.DataFrame({
+    "client_id": np.array([1, 2], dtype=np.int64),
+    "amount": [10.5, np.nan],
+    "created_at": pd.to_datetime(["2026-10-17 09:30:00.250", None]),
+    "status": ["active", "paused"]
+})
+RECORDS = [
+    {"client_id": 1, "amount": 10.5, "created_at": "2026-10-17T09:30:00.250000", "status": "active"},
+    {"client_id": 2, "amount": None, "created_at": None, "status": "paused"}
+]
+
+
+@pytest.mark.parametrize("use_orjson", ENCODERS)
+def test_pandas_numpy_and_datetime_values_encode_natively(use_orjson):
+    serializer = JSONSerializer(use_orjson=use_orjson)
+    payload = {
+        "rows": FRAME,
+        "first": FRAME.iloc[0],
+        "count": np.int32(3),
+        "ratio": float("nan"),
+        "values": np.array([1, 2]),
+        "when": datetime(2026, 10, 17, 12, 0),
+        "day": date(2026, 10, 17),
+        "settings": MappingProxyType({"retries": 2})
+    }
+
+    decoded = json.loads(serializer.dumps(payload))
+
+    assert decoded["rows"] == RECORDS
+    assert decoded["first"] == RECORDS[0]
+    assert (decoded["count"], decoded["ratio"], decoded["values"]) == (3, None, [1, 2])
+    assert (decoded["when"], decoded["day"]) == ("2026-10-17T12:00:00", "2026-10-17")
+    assert decoded["settings"] == {"retries": 2}
+
+
+def test_top_level_frames_use_the_columnar_encoder():
+    assert json.loads(JSONSerializer().dumps(FRAME)) == RECORDS
+
+
+def test_bodies_are_gzipped_only_above_the_threshold():
+    serializer = JSONSerializer(compress_threshold=100)
+
+    small, small_headers = serializer.encode({"lead": 1})
+    large, large_headers = serializer.encode({"leads": list(range(100))})
+
+    assert "Content-Encoding" not in small_headers and json.loads(small) == {"lead": 1}
+    assert large_headers["Content-Encoding"] == "gzip"
+    assert json.loads(gzip.decompress(large)) == {"leads": list(range(100))}
+    assert "Content-Encoding" not in JSONSerializer(compress_threshold=None).encode({"leads": list(range(100))})[1]
+
+
+def test_webhooks_send_compressed_frames(n8n):
+    manager = WebhookManager(f"{n8n.url}/webhook", breakers=CircuitBreakerRegistry(),
+                             serializer=JSONSerializer(compress_threshold=10))
+    manager.create_webhook("clients", "1")
+
+    assert manager.send_webhook_data("clients", FRAME)["success"]
+    assert n8n.requests[0][2] == RECORDS
@@ -0,0 +1,75 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from utils.n8n_integration import CSVManager, DataFrameCache, LogRollup
+
+
+def logs(start, rows):
+    ids = np.arange(start, start + rows)
+    return pd.DataFrame({
+        "log_id": ids,
+        "workflow_name": [f"Workflow {i % 3}" for i in ids],
+        "execution_time": [f"2026-10-{1 + i % 5:02d} {i % 24:02d}:00:00" for i in ids],
+        "status": ["success" if i % 4 else "failed" for i in ids],
+        "records_processed": ids % 7,
+        "execution_duration": [np.nan if i % 9 == 0 else i / 10 for i in ids]
+    })
+
+
+def expected_summary(data):
+    grouped = data.groupby("workflow_name")
+    return pd.DataFrame({
+        "executions": grouped.size(),
+        "success_rate": grouped["status"].apply(lambda s: (s == "success").mean() * 100),
+        "avg_duration": grouped["execution_duration"].mean(),
+        "total_records": grouped["records_processed"].sum().astype("float64")
+    }).reset_index()
+
+
+def make_rollup(tmp_path, data):
+    manager = CSVManager(str(tmp_path / "data"), cache=DataFrameCache())
+    manager.save_csv(data, "automation_logs.csv", "automations")
+    return manager, LogRollup(manager, recent_limit=3)
+
+
+def test_summary_matches_a_full_groupby(tmp_path):
+    data = logs(1, 60)
+    _, rollup = make_rollup(tmp_path, data)
+
+    pd.testing.assert_frame_equal(rollup.workflow_summary(), expected_summary(data), check_dtype=False)
+    daily = rollup.daily_executions()
+    assert daily["executions"].sum() == 60
+    assert set(daily["day"]) == {f"2026-10-{d:02d}" for d in range(1, 6)}
+    assert rollup.recent()["execution_time"].tolist() == sorted(data["execution_time"], reverse=True)[:3]
+
+
+def test_appends_are_folded_in_incrementally(tmp_path, monkeypatch):
+    data = logs(1, 40)
+    manager, rollup = make_rollup(tmp_path, data)
+    rollup.frame()
+    rebuilds = []
+    original = rollup._rebuild
+    monkeypatch.setattr(rollup, "_rebuild", lambda: rebuilds.append(1) or original())
+
+    more = logs(41, 25)
+    manager.append_rows(more, "automation_logs.csv", "automations")
+
+    pd.testing.assert_frame_equal(rollup.workflow_summary(), expected_summary(pd.concat([data, more])), check_dtype=False)
+    assert rebuilds == []
+    assert not rollup.refresh()
+
+
+def test_rewrites_trigger_a_rebuild_and_state_survives_restarts(tmp_path):
+    manager, rollup = make_rollup(tmp_path, logs(1, 40))
+    rollup.frame()
+
+    replacement = logs(100, 10)
+    manager.save_csv(replacement, "automation_logs.csv", "automations")
+    pd.testing.assert_frame_equal(rollup.workflow_summary(), expected_summary(replacement), check_dtype=False)
+
+    assert os.path.exists(tmp_path / "data" / "automations" / ".rollups" / "automation_logs.json")
+    restarted = LogRollup(manager, recent_limit=3)
+    assert not restarted.refresh()
+    pd.testing.assert_frame_equal(restarted.frame(), rollup.frame())
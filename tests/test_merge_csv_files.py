@@ -0,0 +1,51 @@
+import pandas as pd
+import pytest
+
+from utils.n8n_integration import PYARROW_AVAILABLE, CSVManager, DataFrameCache
+
+FORMATS = ["csv"] + (["parquet", "feather"] if PYARROW_AVAILABLE else [])
+
+
+def make_manager(tmp_path, storage_format="csv"):
+    return CSVManager(str(tmp_path / "data"), cache=DataFrameCache(), storage_format=storage_format)
+
+
+def save_parts(manager):
+    manager.save_csv(pd.DataFrame({"execution_time": ["2026-01-01", "2026-01-03", "2026-01-05"],
+                                   "workflow_name": ["A", "B", "A"]}), "january_a.csv", "automations")
+    manager.save_csv(pd.DataFrame({"execution_time": ["2026-01-02", "2026-01-04"],
+                                   "workflow_name": ["C", "D"], "records_processed": [4, 7]}), "january_b.csv", "automations")
+
+
+@pytest.mark.parametrize("storage_format", FORMATS)
+def test_merge_aligns_columns_by_header_union(tmp_path, storage_format):
+    manager = make_manager(tmp_path, storage_format)
+    save_parts(manager)
+
+    assert manager.merge_csv_files(["january_a.csv", "january_b.csv"], "january.csv", "automations", chunksize=2)
+
+    merged = manager.load_csv("january.csv", "automations")
+    assert list(merged.columns) == ["execution_time", "workflow_name", "records_processed"]
+    assert merged["workflow_name"].tolist() == ["A", "B", "A", "C", "D"]
+    assert merged["records_processed"].isna().sum() == 3
+    assert "january.csv" in manager.list_csv_files("automations")
+
+
+def test_sorted_merge_interleaves_inputs(tmp_path):
+    manager = make_manager(tmp_path)
+    save_parts(manager)
+
+    assert manager.merge_csv_files(["january_a.csv", "january_b.csv"], "january.csv", "automations",
+                                   sort_by="execution_time", chunksize=2)
+
+    merged = manager.load_csv("january.csv", "automations")
+    assert merged["workflow_name"].tolist() == ["A", "C", "B", "D", "A"]
+
+
+def test_merge_rejects_unknown_sort_column_and_missing_inputs(tmp_path):
+    manager = make_manager(tmp_path)
+    save_parts(manager)
+
+    assert not manager.merge_csv_files(["january_a.csv"], "out.csv", "automations", sort_by="missing")
+    assert not manager.merge_csv_files(["nope.csv"], "out.csv", "automations")
+    assert manager.load_csv("out.csv", "automations") is None
@@ -0,0 +1,70 @@
+import pytest
+import requests
+
+from utils.n8n_integration import CircuitBreakerRegistry, N8NAgent
+
+
+def make_agent(n8n, **options):
+    return N8NAgent(n8n.url, max_retries=0, breakers=CircuitBreakerRegistry(), **options)
+
+
+def add_workflows(n8n, count):
+    for index in range(1, count + 1):
+        n8n.workflows[str(index)] = {"id": str(index), "name": f"Workflow {index}", "nodes": []}
+
+
+def test_list_workflows_is_served_from_cache_while_fresh(n8n):
+    add_workflows(n8n, 2)
+    agent = make_agent(n8n)
+
+    first = agent.list_workflows()
+    second = agent.list_workflows()
+
+    assert first["success"] and second["success"]
+    assert second["data"] == first["data"]
+    assert len(n8n.requests) == 1
+
+
+def test_stale_entry_is_revalidated_with_etag(n8n):
+    add_workflows(n8n, 2)
+    agent = make_agent(n8n, cache_ttls={"/api/v1/workflows": 0.0})
+
+    first = agent.list_workflows()
+    second = agent.list_workflows()
+
+    assert second["data"] == first["data"]
+    assert len(n8n.requests) == 2
+
+
+def test_error_replies_are_not_cached_or_reported_as_data(n8n):
+    add_workflows(n8n, 2)
+    n8n.status_codes = [503]
+    agent = make_agent(n8n)
+
+    failed = agent.list_workflows()
+    assert not failed["success"]
+    assert failed["error"] == "HTTP 503: stub error 503"
+
+    recovered = agent.list_workflows()
+    assert recovered["success"]
+    assert len(recovered["data"]["data"]) == 2
+
+
+def test_get_workflow_reports_missing_workflow(n8n):
+    result = make_agent(n8n).get_workflow("404")
+
+    assert not result["success"]
+    assert result["error"].startswith("HTTP 404")
+
+
+def test_iter_workflows_pages_lazily_and_raises_on_a_failed_page(n8n):
+    add_workflows(n8n, 5)
+    agent = make_agent(n8n)
+    assert [workflow["id"] for workflow in agent.iter_workflows(page_size=2)] == ["1", "2", "3", "4", "5"]
+
+    agent.invalidate_cache()
+    n8n.status_codes = [200, 503]
+    workflows = agent.iter_workflows(page_size=2)
+    assert [next(workflows)["id"], next(workflows)["id"]] == ["1", "2"]
+    with pytest.raises(requests.HTTPError):
+        next(workflows)
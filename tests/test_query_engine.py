@@ -0,0 +1,60 @@
+import threading
+
+import pandas as pd
+
+from utils.n8n_integration import CSVManager, CSVQueryEngine, DataFrameCache
+
+
+def make_engine(tmp_path, rows=30):
+    manager = CSVManager(str(tmp_path / "data"), cache=DataFrameCache())
+    manager.save_csv(pd.DataFrame({"client_id": range(1, rows + 1), "email": [f"c{i}@example.com" for i in range(rows)],
+                                   "monthly_amount": [i * 10 for i in range(rows)]}), "clients.csv", "clients")
+    return manager, CSVQueryEngine(manager, chunksize=7)
+
+
+def test_query_reads_the_file_and_picks_up_changes(tmp_path):
+    manager, engine = make_engine(tmp_path)
+    assert "clients_clients" in engine.list_tables()
+
+    result = engine.query("SELECT COUNT(*) AS n, SUM(monthly_amount) AS total FROM clients_clients")
+    assert result.to_dict("records") == [{"n": 30, "total": 4350}]
+
+    manager.save_csv(pd.DataFrame({"client_id": [1], "email": ["a@example.com"], "monthly_amount": [5]}),
+                     "clients.csv", "clients")
+    assert engine.query("SELECT monthly_amount FROM clients_clients")["monthly_amount"].tolist() == [5]
+
+
+def test_writes_are_rejected(tmp_path):
+    _, engine = make_engine(tmp_path)
+
+    assert engine.query("DELETE FROM clients_clients") is None
+    assert engine.query("ATTACH DATABASE ':memory:' AS other") is None
+    assert engine.query("SELECT COUNT(*) AS n FROM clients_clients")["n"].tolist() == [30]
+
+
+def test_dropped_table_is_reimported(tmp_path):
+    _, engine = make_engine(tmp_path)
+    engine.query("SELECT 1 FROM clients_clients")
+    engine._syncing = True
+    engine.connection.execute('DROP TABLE "clients_clients"')
+    engine._syncing = False
+
+    assert engine.query("SELECT COUNT(*) AS n FROM clients_clients") is None
+    assert engine.query("SELECT COUNT(*) AS n FROM clients_clients")["n"].tolist() == [30]
+
+
+def test_iter_query_releases_the_lock_between_chunks(tmp_path):
+    _, engine = make_engine(tmp_path)
+    chunks = engine.iter_query("SELECT client_id FROM clients_clients ORDER BY client_id", chunksize=10)
+    first = next(chunks)
+
+    other = {}
+    worker = threading.Thread(target=lambda: other.update(result=engine.query("SELECT COUNT(*) AS n FROM clients_clients")),
+                              daemon=True)
+    worker.start()
+    worker.join(timeout=5)
+
+    assert not worker.is_alive()
+    assert other["result"]["n"].tolist() == [30]
+    rest = pd.concat([first, *chunks], ignore_index=True)
+    assert rest["client_id"].tolist() == list(range(1, 31))
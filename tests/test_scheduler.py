@@ -0,0 +1,70 @@
+from datetime import datetime
+
+import pytest
+
+from utils.n8n_integration import CronSchedule, WorkflowScheduler
+
+
+def cron_workflow(name, parameters):
+    return {"name": name, "nodes": [{"name": "Every Morning", "type": "cron", "parameters": parameters}]}
+
+
+@pytest.mark.parametrize("weekdays, expected", [
+    ("1-7", [0, 1, 2, 3, 4, 5, 6]),
+    ("5-7", [0, 5, 6]),
+    ("mon-sun", [0, 1, 2, 3, 4, 5, 6]),
+    ("fri-sun", [0, 5, 6]),
+    ("7", [0]),
+    ("*/2", [0, 2, 4, 6])
+])
+def test_weekday_ranges_fold_sunday(weekdays, expected):
+    assert CronSchedule(f"0 9 * * {weekdays}").weekdays == expected
+
+
+def test_next_after_finds_the_next_matching_minute():
+    schedule = CronSchedule("30 9 * * mon-fri")
+    # 2026-10-17 is a Saturday
+    assert schedule.next_after(datetime(2026, 10, 17, 12, 0)) == datetime(2026, 10, 19, 9, 30)
+    assert schedule.next_after(datetime(2026, 10, 19, 9, 30)) == datetime(2026, 10, 20, 9, 30)
+
+
+def test_out_of_range_values_are_rejected():
+    with pytest.raises(ValueError):
+        CronSchedule("0 25 * * *")
+
+
+@pytest.mark.parametrize("rule, expression", [
+    ({"field": "cronExpression", "expression": "0 9 * * 1"}, "0 9 * * 1"),
+    ({"field": "minutes", "minutesInterval": 15}, "*/15 * * * *"),
+    ({"field": "hours", "hoursInterval": 2, "triggerAtMinute": 5}, "5 */2 * * *"),
+    ({"field": "weeks", "triggerAtDay": [1, 3], "triggerAtHour": 8}, "0 8 * * 1,3")
+])
+def test_schedule_trigger_interval_rules(rule, expression):
+    schedule = CronSchedule.from_trigger({"rule": {"interval": [rule]}})
+    assert schedule.expression == expression
+
+
+def test_add_definitions_skips_unschedulable_workflows():
+    scheduler = WorkflowScheduler(lambda workflow: {"success": True}, clock=lambda: datetime(2026, 10, 17, 12, 0))
+    definitions = {
+        "good": cron_workflow("Good", {"schedule": "0 9 * * *"}),
+        "bad_hour": cron_workflow("Bad Hour", {"schedule": "0 25 * * *"}),
+        "seconds": cron_workflow("Seconds", {"rule": {"interval": [{"field": "seconds"}]}}),
+        "webhook": {"name": "Webhook", "nodes": [{"name": "Hook", "type": "webhook", "parameters": {}}]}
+    }
+
+    assert scheduler.add_definitions(definitions) == ["Good"]
+    assert set(scheduler.errors) == {"Bad Hour", "Seconds"}
+    assert scheduler.get_status()["Good"]["next_run"] == datetime(2026, 10, 18, 9, 0)
+
+
+def test_run_now_records_the_outcome():
+    calls = []
+    scheduler = WorkflowScheduler(lambda workflow: calls.append(workflow["name"]) or {"success": True})
+    scheduler.add(cron_workflow("Good", {"schedule": "0 9 * * *"}))
+
+    scheduler.run_now("Good").result(timeout=5)
+
+    status = scheduler.get_status()["Good"]
+    assert calls == ["Good"]
+    assert (status["runs"], status["successes"], status["last_status"]) == (1, 1, "success")
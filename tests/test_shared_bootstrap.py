@@ -0,0 +1,53 @@
+import os
+import threading
+
+import pandas as pd
+
+from utils.n8n_integration import (CSVManager, DataFrameCache, get_shared_n8n_agent, get_shared_webhook_manager,
+                                   initialize_sample_data)
+
+SEEDED = {("clients", "clients.csv"), ("clients", "leads.csv"), ("automations", "automation_logs.csv")}
+
+
+def test_seeding_writes_only_missing_files(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("data/clients")
+    pd.DataFrame({"client_id": ["X1"], "name": ["Kept"]}).to_csv("data/clients/clients.csv", index=False)
+
+    initialize_sample_data()
+
+    assert all(os.path.exists(f"data/{category}/{filename}") for category, filename in SEEDED)
+    assert pd.read_csv("data/clients/clients.csv")["name"].tolist() == ["Kept"]
+    logs_mtime = os.stat("data/automations/automation_logs.csv").st_mtime_ns
+
+    initialize_sample_data()
+    assert os.stat("data/automations/automation_logs.csv").st_mtime_ns == logs_mtime
+
+    initialize_sample_data(overwrite=True)
+    assert len(pd.read_csv("data/clients/clients.csv")) == 5
+
+
+def test_concurrent_sessions_seed_once(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    saves = []
+    original = CSVManager.save_csv
+    monkeypatch.setattr(CSVManager, "save_csv", lambda self, *args: saves.append(args[1]) or original(self, *args))
+
+    threads = [threading.Thread(target=initialize_sample_data) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(saves) == sorted(filename for _, filename in SEEDED)
+    manager = CSVManager("data", cache=DataFrameCache())
+    assert manager.load_csv("leads.csv", "clients")["lead_id"].tolist() == ["L001", "L002", "L003", "L004", "L005"]
+
+
+def test_shared_clients_are_process_singletons():
+    try:
+        assert get_shared_n8n_agent() is get_shared_n8n_agent()
+        assert get_shared_webhook_manager() is get_shared_webhook_manager()
+    finally:
+        get_shared_n8n_agent.clear()
+        get_shared_webhook_manager.clear()
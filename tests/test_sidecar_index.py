@@ -0,0 +1,46 @@
+import os
+
+import pandas as pd
+
+from utils.n8n_integration import CSVManager, DataFrameCache
+
+
+def make_manager(tmp_path):
+    manager = CSVManager(str(tmp_path / "data"), cache=DataFrameCache())
+    leads = pd.DataFrame({"lead_id": range(1, 51), "name": [f"Lead {i}" for i in range(1, 51)],
+                          "notes": ["multi\nline, quoted" if i % 7 == 0 else "plain" for i in range(1, 51)]})
+    manager.save_csv(leads, "leads.csv", "clients")
+    return manager
+
+
+def test_get_rows_builds_an_index_and_seeks_to_the_rows(tmp_path):
+    manager = make_manager(tmp_path)
+
+    rows = manager.get_rows("leads.csv", [14, 3, 999], "clients")
+
+    assert rows["lead_id"].tolist() == [14, 3]
+    assert rows["notes"].tolist() == ["multi\nline, quoted", "plain"]
+    assert os.path.exists(tmp_path / "data" / "clients" / ".indexes" / "leads.lead_id.idx")
+    assert manager.get_row("leads.csv", 50, "clients")["name"] == "Lead 50"
+
+
+def test_appends_and_saves_keep_the_index_current(tmp_path):
+    manager = make_manager(tmp_path)
+    assert manager.create_index("leads.csv", "lead_id", "clients")
+
+    assert manager.append_rows([{"lead_id": 51, "name": "Lead 51", "notes": "new"}], "leads.csv", "clients")
+    assert manager.get_row("leads.csv", 51, "clients")["notes"] == "new"
+
+    manager.save_csv(pd.DataFrame({"lead_id": [7], "name": ["Rewritten"], "notes": ["x"]}), "leads.csv", "clients")
+    assert manager.get_row("leads.csv", 7, "clients")["name"] == "Rewritten"
+    assert manager.get_row("leads.csv", 8, "clients") is None
+
+
+def test_index_is_rebuilt_after_an_outside_edit(tmp_path):
+    manager = make_manager(tmp_path)
+    manager.get_rows("leads.csv", [1], "clients")
+
+    path = tmp_path / "data" / "clients" / "leads.csv"
+    path.write_text("lead_id,name,notes\n2,Edited,plain\n")
+
+    assert manager.get_row("leads.csv", 2, "clients")["name"] == "Edited"
@@ -0,0 +1,62 @@
+import time
+
+from utils.n8n_integration import CircuitBreakerRegistry, WebhookManager
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def make_manager(n8n, *names):
+    manager = WebhookManager(f"{n8n.url}/webhook", breakers=CircuitBreakerRegistry())
+    for name in names:
+        manager.create_webhook(name, name)
+    return manager
+
+
+def test_batches_for_one_webhook_arrive_in_order(n8n):
+    n8n.delay = 0.05
+    manager = make_manager(n8n, "leads")
+    batcher = manager.get_batcher(max_items=2, max_delay_ms=10_000)
+
+    for i in range(10):
+        assert batcher.add("leads", {"lead": i})
+    assert wait_for(lambda: batcher.outstanding == 0)
+    batcher.close()
+
+    assert [body for _, _, body in n8n.requests] == [[{"lead": i}, {"lead": i + 1}] for i in range(0, 10, 2)]
+    assert n8n.max_in_flight == 1
+
+
+def test_different_webhooks_still_send_concurrently(n8n):
+    n8n.delay = 0.2
+    manager = make_manager(n8n, "leads", "orders")
+    batcher = manager.get_batcher(max_items=1, max_delay_ms=10_000)
+
+    for name in ("leads", "orders"):
+        batcher.add(name, {"name": name})
+    assert wait_for(lambda: batcher.outstanding == 0)
+    batcher.close()
+
+    assert n8n.max_in_flight == 2
+
+
+def test_flush_sends_partial_batches_and_failures_do_not_stall_the_queue(n8n):
+    n8n.status_codes = [400]
+    manager = make_manager(n8n, "leads")
+    batcher = manager.get_batcher(max_items=100, max_delay_ms=10_000)
+
+    batcher.add("leads", {"lead": 1})
+    first = batcher.flush("leads")
+    batcher.add("leads", {"lead": 2})
+    second = batcher.flush("leads")
+
+    assert first[0].result(timeout=5)["success"] is False
+    assert second[0].result(timeout=5)["success"] is True
+    assert [body for _, _, body in n8n.requests] == [[{"lead": 1}], [{"lead": 2}]]
+    batcher.close()
@@ -0,0 +1,52 @@
+import time
+
+from utils.n8n_integration import CircuitBreakerRegistry, WebhookManager
+
+
+def make_manager(n8n, **options):
+    manager = WebhookManager(f"{n8n.url}/webhook", breakers=CircuitBreakerRegistry(), **options)
+    manager.create_webhook("leads", "1")
+    return manager
+
+
+def test_async_send_returns_before_the_round_trip(n8n):
+    n8n.delay = 0.3
+    manager = make_manager(n8n)
+
+    started = time.monotonic()
+    future = manager.send_webhook_data_async("leads", {"lead": 1})
+    assert time.monotonic() - started < 0.2
+    assert manager.get_webhook_stats()["leads"]["pending"] == 1
+
+    assert future.result(timeout=5) == {"success": True, "response": {"received": {"lead": 1}}}
+    stats = manager.get_webhook_stats()["leads"]
+    assert (stats["pending"], stats["calls"]) == (0, 1)
+    manager.shutdown()
+
+
+def test_counters_stay_exact_under_concurrent_sends(n8n):
+    n8n.status_codes = [200] * 15 + [400] * 5
+    manager = make_manager(n8n, max_workers=8)
+
+    futures = [manager.send_webhook_data_async("leads", {"lead": i}) for i in range(20)]
+    results = [future.result(timeout=5) for future in futures]
+
+    stats = manager.get_webhook_stats()["leads"]
+    assert (stats["calls"], stats["failures"], stats["pending"]) == (15, 5, 0)
+    assert n8n.max_in_flight <= 8
+    rejected = [result for result in results if not result["success"]]
+    assert all(result["status_code"] == 400 and not result["retryable"] for result in rejected)
+    manager.shutdown()
+
+
+def test_unknown_webhooks_and_shutdown(n8n):
+    manager = make_manager(n8n)
+
+    assert manager.send_webhook_data_async("missing", {}).result(timeout=5) == {"success": False,
+                                                                               "error": "Webhook not found"}
+    future = manager.send_webhook_data_async("leads", {"lead": 1})
+    manager.shutdown(wait=True)
+
+    assert future.done()
+    assert manager.send_webhook_data_async("leads", {"lead": 2}).result(timeout=5)["success"]
+    manager.shutdown()
@@ -0,0 +1,50 @@
+import json
+import time
+
+from utils.n8n_integration import CircuitBreakerRegistry, WebhookManager, WebhookOutbox
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_outbox_retries_server_errors_and_dead_letters_rejections(n8n, tmp_path):
+    n8n.status_codes = [500, 429, 200, 400]
+    manager = WebhookManager(f"{n8n.url}/webhook", breakers=CircuitBreakerRegistry())
+    manager.create_webhook("leads", "1")
+    outbox = manager.enable_outbox(str(tmp_path / "outbox"), base_backoff=0.01, max_per_second=0)
+
+    manager.send_webhook_data_durable("leads", {"lead": 1})
+    manager.send_webhook_data_durable("leads", {"lead": 2})
+    assert wait_for(lambda: outbox.stats()["delivered"] + outbox.stats()["dead_lettered"] == 2)
+    outbox.stop()
+
+    assert outbox.stats()["delivered"] == 1
+    assert outbox.stats()["dead_lettered"] == 1
+    assert [body for _, _, body in n8n.requests] == [{"lead": 1}] * 3 + [{"lead": 2}]
+    with open(tmp_path / "outbox" / "dead-letter.jsonl") as f:
+        dead = [json.loads(line) for line in f]
+    assert dead[0]["payload"] == {"lead": 2}
+    assert dead[0]["error"].startswith("HTTP 400")
+
+
+def test_undelivered_records_survive_a_restart(n8n, tmp_path):
+    directory = str(tmp_path / "outbox")
+    manager = WebhookManager(f"{n8n.url}/webhook", breakers=CircuitBreakerRegistry())
+    manager.create_webhook("leads", "1")
+    outbox = WebhookOutbox(manager, directory, base_backoff=0.01, max_per_second=0)
+    outbox.enqueue("leads", manager.active_webhooks["leads"]["url"], {"lead": 1})
+    outbox.enqueue("leads", manager.active_webhooks["leads"]["url"], {"lead": 2})
+    assert n8n.requests == []
+
+    reopened = WebhookOutbox(manager, directory, base_backoff=0.01, max_per_second=0)
+    reopened.start()
+    assert wait_for(lambda: reopened.stats()["delivered"] == 2)
+    reopened.stop()
+
+    assert [body for _, _, body in n8n.requests] == [{"lead": 1}, {"lead": 2}]
@@ -0,0 +1,67 @@
+from utils.n8n_integration import CircuitBreakerRegistry, N8NAgent, WorkflowDeployer
+
+DEFINITIONS = {
+    "Lead Intake": {
+        "name": "Lead Intake",
+        "description": "Capture leads",
+        "nodes": [
+            {"name": "Webhook Trigger", "type": "webhook", "parameters": {"path": "lead"}},
+            {"name": "Notify", "type": "email", "parameters": {"to": "sales@example.com"}}
+        ]
+    }
+}
+
+
+def make_deployer(n8n):
+    return WorkflowDeployer(N8NAgent(n8n.url, max_retries=0, breakers=CircuitBreakerRegistry()))
+
+
+def test_deploy_sends_n8n_payload_and_is_idempotent(n8n):
+    first = make_deployer(n8n).deploy_all(DEFINITIONS)
+    assert first["success"]
+    assert first["results"]["Lead Intake"]["action"] == "created"
+
+    created = n8n.workflows["1"]
+    assert set(created) == {"id", "name", "nodes", "connections", "settings"}
+    assert [node["type"] for node in created["nodes"]] == ["n8n-nodes-base.webhook", "n8n-nodes-base.emailSend"]
+    assert created["connections"] == {
+        "Webhook Trigger": {"main": [[{"node": "Notify", "type": "main", "index": 0}]]}
+    }
+
+    second = make_deployer(n8n).deploy_all(DEFINITIONS)
+    assert second["success"]
+    assert second["results"]["Lead Intake"]["action"] == "unchanged"
+    assert len(n8n.workflows) == 1
+
+
+def test_deploy_reports_http_errors(n8n):
+    n8n.status_codes = [200, 400]
+    result = make_deployer(n8n).deploy_all(DEFINITIONS)
+
+    assert not result["success"]
+    assert not result["results"]["Lead Intake"]["success"]
+    assert result["results"]["Lead Intake"]["error"] == "HTTP 400: stub error 400"
+    assert n8n.workflows == {}
+
+
+def test_deploy_stops_when_the_listing_fails(n8n):
+    assert make_deployer(n8n).deploy_all(DEFINITIONS)["success"]
+
+    n8n.status_codes = [503]
+    result = make_deployer(n8n).deploy_all(DEFINITIONS)
+
+    assert not result["success"]
+    assert "HTTP 503" in result["error"]
+    assert [workflow["name"] for workflow in n8n.workflows.values()] == ["Lead Intake"]
+    assert [method for method, _, _ in n8n.requests].count("POST") == 1
+
+
+def test_changed_definition_is_updated_in_place(n8n):
+    make_deployer(n8n).deploy_all(DEFINITIONS)
+    changed = {"Lead Intake": dict(DEFINITIONS["Lead Intake"], nodes=DEFINITIONS["Lead Intake"]["nodes"][:1])}
+
+    result = make_deployer(n8n).deploy_all(changed)
+
+    assert result["results"]["Lead Intake"]["action"] == "updated"
+    assert list(n8n.workflows) == ["1"]
+    assert [node["name"] for node in n8n.workflows["1"]["nodes"]] == ["Webhook Trigger"]
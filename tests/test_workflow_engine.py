@@ -0,0 +1,130 @@
+import pandas as pd
+import pytest
+
+from utils.n8n_integration import CSVManager, WorkflowEngine
+
+
+def node(name, node_type, **parameters):
+    return {"name": name, "type": node_type, "parameters": parameters}
+
+
+def invoice_workflow():
+    return {"name": "Billing", "nodes": [node("Start", "manualTrigger"), node("Generate Invoices", "function")]}
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = WorkflowEngine(CSVManager(str(tmp_path / "data")), max_workers=2)
+    yield engine
+    engine.close()
+
+
+CONTRACTS = [
+    {"client_id": 1, "monthly_amount": 100, "status": "active"},
+    {"client_id": 2, "monthly_amount": 200, "status": "paused"}
+]
+
+
+@pytest.mark.parametrize("batch", [False, True])
+def test_builtin_frame_function_runs_without_a_registered_handler(engine, batch):
+    result = engine.run(invoice_workflow(), CONTRACTS, batch=batch)
+
+    assert result["success"], result
+    output = result["output"]
+    rows = output.to_dict("records") if batch else [item["json"] for item in output]
+    assert [row["client_id"] for row in rows] == [1]
+
+
+@pytest.mark.parametrize("batch", [False, True])
+def test_registered_item_handler_overrides_the_builtin(engine, batch):
+    engine.register_function("Generate Invoices", lambda items, parameters: [{"custom": len(items)}])
+
+    result = engine.run(invoice_workflow(), CONTRACTS, batch=batch)
+
+    assert result["success"], result
+    assert [item["json"] for item in result["output"]] == [{"custom": 2}]
+
+
+def test_registered_frame_function_wins_in_batch_mode(engine):
+    engine.register_function("Generate Invoices", lambda items, parameters: [{"items": len(items)}])
+    engine.register_frame_function("Generate Invoices", lambda frame, parameters: frame[["client_id"]],
+                                   workflow_name="Billing")
+
+    batched = engine.run(invoice_workflow(), CONTRACTS, batch=True)
+    per_item = engine.run(invoice_workflow(), CONTRACTS)
+
+    pd.testing.assert_frame_equal(batched["output"], pd.DataFrame({"client_id": [1, 2]}))
+    assert [item["json"] for item in per_item["output"]] == [{"items": 2}]
+
+
+def test_branches_join_and_failures_are_reported(engine):
+    workflow = {
+        "name": "Fan Out",
+        "nodes": [node("Start", "manualTrigger"), node("Left", "function"), node("Right", "function"),
+                  node("Join", "function")],
+        "connections": {
+            "Start": {"main": [[{"node": "Left", "type": "main", "index": 0},
+                                {"node": "Right", "type": "main", "index": 0}]]},
+            "Left": {"main": [[{"node": "Join", "type": "main", "index": 0}]]},
+            "Right": {"main": [[{"node": "Join", "type": "main", "index": 0}]]}
+        }
+    }
+    engine.register_function("Left", lambda items, parameters: [{"side": "left"}])
+    engine.register_function("Right", lambda items, parameters: [{"side": "right"}])
+
+    result = engine.run(workflow, [{"id": 1}])
+    assert result["success"], result
+    assert sorted(item["json"]["side"] for item in result["output"]) == ["left", "right"]
+
+    engine.register_function("Right", lambda items, parameters: 1 / 0)
+    failed = engine.run(workflow, [{"id": 1}])
+    assert not failed["success"]
+    assert failed["error"].startswith("Right:")
+    assert "Join" not in failed["nodes"]
+
+
+def scoring_workflow():
+    return {
+        "name": "Lead Scoring",
+        "nodes": [node("Hook", "webhook"), node("Is Hot", "if", condition="score >= 50"),
+                  node("Save Hot", "csv", operation="append", fileName="clients/hot_leads.csv"),
+                  node("Notify", "emailSend", to="sales@example.com", subject="Hot lead")],
+        "connections": {
+            "Hook": {"main": [[{"node": "Is Hot", "type": "main", "index": 0}]]},
+            "Is Hot": {"main": [[{"node": "Save Hot", "type": "main", "index": 0}],
+                                [{"node": "Notify", "type": "main", "index": 0}]]}
+        }
+    }
+
+
+@pytest.mark.parametrize("batch", [False, True])
+def test_condition_routes_items_to_csv_and_email_nodes(engine, batch):
+    leads = [{"lead_id": 1, "score": 80}, {"lead_id": 2, "score": 10}, {"lead_id": 3, "score": 50}]
+
+    result = engine.run(scoring_workflow(), leads, batch=batch)
+
+    assert result["success"], result
+    saved = engine.csv_manager.load_csv("hot_leads.csv", "clients")
+    assert saved["lead_id"].tolist() == [1, 3]
+    assert [email["data"]["lead_id"] for email in engine.sent_emails] == [2]
+    assert result["nodes"]["Is Hot"]["items"] == 3
+
+
+def test_dry_run_skips_csv_writes_and_reads_see_files(engine):
+    engine.run(scoring_workflow(), [{"lead_id": 1, "score": 90}], dry_run=True)
+    assert engine.csv_manager.load_csv("hot_leads.csv", "clients") is None
+
+    engine.run(scoring_workflow(), [{"lead_id": 1, "score": 90}])
+    reader = {"name": "Report", "nodes": [node("Start", "manualTrigger"),
+                                          node("Load", "csv", operation="read", fileName="hot_leads.csv")]}
+    assert [item["json"]["lead_id"] for item in engine.run(reader)["output"]] == [1]
+
+
+def test_invalid_graphs_are_rejected(engine):
+    cyclic = {"name": "Loop", "nodes": [node("A", "function"), node("B", "function")],
+              "connections": {"A": {"main": [[{"node": "B", "type": "main", "index": 0}]]},
+                              "B": {"main": [[{"node": "A", "type": "main", "index": 0}]]}}}
+    unknown = {"name": "Odd", "nodes": [node("Start", "manualTrigger"), node("Go", "teleport")]}
+
+    assert "cycle" in engine.run(cyclic)["error"]
+    assert not engine.run(unknown)["success"]
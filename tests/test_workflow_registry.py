@@ -0,0 +1,58 @@
+import json
+import os
+
+import pytest
+
+from utils.n8n_integration import WorkflowRegistry
+
+
+def node(name, node_type, **parameters):
+    return {"name": name, "type": node_type, "parameters": parameters}
+
+
+def write_samples(data_dir, definitions):
+    path = os.path.join(data_dir, "sample_workflows.json")
+    with open(path, "w") as f:
+        json.dump(definitions, f)
+    return path
+
+
+def test_builtins_load_frozen_and_hashed(tmp_path):
+    registry = WorkflowRegistry(str(tmp_path))
+
+    assert registry.errors == {}
+    assert set(registry.builtin()) == set(WorkflowRegistry.BUILDERS)
+    definition = registry.get("Lead Generation Bot")
+    assert len(definition.content_hash) == 64
+    with pytest.raises(TypeError):
+        definition["nodes"][0]["parameters"]["path"] = "changed"
+    assert definition.to_dict()["name"] == "Lead Generation Bot"
+
+
+def test_invalid_samples_are_reported_and_skipped(tmp_path):
+    write_samples(str(tmp_path), {
+        "good": {"name": "Nightly", "nodes": [node("Nightly", "cron", schedule="0 2 * * *"), node("Log", "function")]},
+        "bad_hour": {"name": "Bad Hour", "nodes": [node("Tick", "cron", schedule="0 25 * * *")]},
+        "no_rule": {"name": "No Rule", "nodes": [node("Tick", "n8n-nodes-base.scheduleTrigger")]},
+        "unknown": {"name": "Unknown", "nodes": [node("Odd", "teleport")]},
+        "duplicate": {"name": "Lead Generation Bot", "nodes": [node("Hook", "webhook")]}
+    })
+    registry = WorkflowRegistry(str(tmp_path))
+
+    assert "Nightly" in registry.all()
+    errors = {key.split(":", 1)[1]: error for key, error in registry.errors.items()}
+    assert set(errors) == {"bad_hour", "no_rule", "unknown", "duplicate"}
+    assert errors["bad_hour"].startswith("Invalid schedule in Tick")
+    assert errors["no_rule"] == "Invalid schedule in Tick: Trigger has no schedule"
+
+
+def test_sample_file_is_reloaded_when_it_changes(tmp_path):
+    path = write_samples(str(tmp_path), {"a": {"name": "First", "nodes": [node("Hook", "webhook")]}})
+    registry = WorkflowRegistry(str(tmp_path))
+    assert "First" in registry.all()
+
+    write_samples(str(tmp_path), {"a": {"name": "Second", "nodes": [node("Hook", "webhook"), node("Step", "code")]}})
+    os.utime(path, ns=(os.stat(path).st_atime_ns, os.stat(path).st_mtime_ns + 1_000_000))
+
+    names = set(registry.all())
+    assert "Second" in names and "First" not in names
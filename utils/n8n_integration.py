@@ -1,30 +1,442 @@
 import requests
 import json
+import gzip
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import pandas as pd
-from datetime import datetime
+import numpy as np
+from datetime import date, datetime, timedelta
 import streamlit as st
 import os
-from typing import Dict, List, Any, Optional
+import asyncio
+import bisect
+import csv
+import hashlib
+import time
+import io
+import heapq
+import math
+import numbers
+import operator
+import random
+import re
+import sqlite3
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+from collections import OrderedDict, deque
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import Dict, List, Any, Optional, Callable, Tuple
+
+try:
+    import pyarrow
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+class JSONSerializer:
+    """Encodes request bodies with orjson when installed (stdlib json otherwise), gzipping large ones"""
+    
+    def __init__(self, compress_threshold: Optional[int] = 64 * 1024, compress_level: int = 5,
+                 use_orjson: Optional[bool] = None):
+        self.compress_threshold = compress_threshold
+        self.compress_level = compress_level
+        self.use_orjson = ORJSON_AVAILABLE if use_orjson is None else use_orjson and ORJSON_AVAILABLE
+    
+    @staticmethod
+    def _iso_columns(data: pd.DataFrame) -> pd.DataFrame:
+        """Datetime columns replaced by Timestamp.isoformat strings (None for NaT), keeping timezone and sub-seconds"""
+        converted = {
+            column: data[column].map(pd.Timestamp.isoformat, na_action="ignore").astype(object).where(data[column].notna(), None)
+            for column in data.columns if pd.api.types.is_datetime64_any_dtype(data[column].dtype)
+        }
+        if not converted:
+            return data
+        data = data.copy(deep=False)
+        for column, values in converted.items():
+            data[column] = values
+        return data
+    
+    @classmethod
+    def _frame_records(cls, data: pd.DataFrame) -> List[Dict]:
+        """Rows as plain dicts, with datetimes as ISO strings and missing floats as None"""
+        data = cls._iso_columns(data)
+        converted = {
+            column: data[column].astype(object).where(data[column].notna(), None)
+            for column in data.columns
+            if pd.api.types.is_float_dtype(data[column].dtype) and data[column].isna().any()
+        }
+        if converted:
+            data = data.copy(deep=False)
+            for column, values in converted.items():
+                data[column] = values
+        return data.to_dict("records")
+    
+    @classmethod
+    def _without_nan(cls, value: Any) -> Any:
+        """Copy of a dict/list tree with float NaN and infinities replaced by None"""
+        if isinstance(value, float):
+            return None if math.isnan(value) or math.isinf(value) else value
+        if isinstance(value, dict):
+            return {key: cls._without_nan(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [cls._without_nan(item) for item in value]
+        return value
+    
+    @classmethod
+    def default(cls, value: Any) -> Any:
+        """Fallback for values neither encoder handles natively"""
+        if isinstance(value, pd.DataFrame):
+            return cls._frame_records(value)
+        if isinstance(value, pd.Series):
+            # Keep the index as keys so a row like df.iloc[0] keeps its column names
+            series = value.to_frame(name=0).pipe(cls._iso_columns)[0]
+            return {
+                key.item() if isinstance(key, np.generic) else key: None if pd.api.types.is_scalar(item) and pd.isna(item) else item
+                for key, item in series.items()
+            }
+        if value is pd.NaT:
+            return None
+        if isinstance(value, Mapping):
+            return dict(value)
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        if isinstance(value, np.ndarray):
+            return value.tolist()
+        if isinstance(value, np.generic):
+            return value.item()
+        return str(value)
+    
+    def dumps(self, data: Any) -> bytes:
+        """Serialize to UTF-8 JSON bytes; NaN is written as null by every path"""
+        if isinstance(data, pd.DataFrame):
+            # pandas' C encoder writes the whole frame without building per-row dicts
+            return self._iso_columns(data).to_json(orient="records", double_precision=15).encode("utf-8")
+        if self.use_orjson:
+            return orjson.dumps(data, default=self.default,
+                                option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+        try:
+            return json.dumps(data, default=self.default, separators=(",", ":"), allow_nan=False).encode("utf-8")
+        except ValueError:
+            # stdlib json would write a bare NaN, so only pay for the cleaning walk when one is present
+            return json.dumps(self._without_nan(data), default=lambda value: self._without_nan(self.default(value)),
+                              separators=(",", ":"), allow_nan=False).encode("utf-8")
+    
+    def loads(self, body: bytes) -> Any:
+        """Parse JSON bytes"""
+        return orjson.loads(body) if self.use_orjson else json.loads(body)
+    
+    def encode(self, data: Any) -> Tuple[bytes, Dict[str, str]]:
+        """Request body plus the headers describing it, gzipped when above compress_threshold"""
+        body = self.dumps(data)
+        headers = {"Content-Type": "application/json"}
+        if self.compress_threshold is not None and len(body) >= self.compress_threshold:
+            body = gzip.compress(body, compresslevel=self.compress_level)
+            headers["Content-Encoding"] = "gzip"
+        return body, headers
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an endpoint whose circuit breaker is open"""
+
+class CircuitBreaker:
+    """Opens after repeated failures, then half-opens after a cooldown to let one probe through"""
+    
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.times_opened = 0
+        self.opened_at = None
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+    
+    def allow(self) -> bool:
+        """Whether a call may go out now"""
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = "half_open"
+                self._probe_in_flight = False
+            if self.state == "half_open" and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+    
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._probe_in_flight = False
+    
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    self.times_opened += 1
+                self.state = "open"
+                self.opened_at = time.monotonic()
+                self._probe_in_flight = False
+
+class CircuitBreakerRegistry:
+    """Circuit breakers, latency samples and hedging counters shared per endpoint"""
+    
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 latency_window: int = 200, min_hedge_samples: int = 20):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.latency_window = latency_window
+        self.min_hedge_samples = min_hedge_samples
+        self._breakers = {}
+        self._latencies = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+        self._hedge_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="n8n-hedge")
+    
+    def breaker(self, key: str) -> CircuitBreaker:
+        with self._lock:
+            if key not in self._breakers:
+                self._breakers[key] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+                self._latencies[key] = deque(maxlen=self.latency_window)
+                self._counters[key] = {"requests": 0, "failures": 0, "rejected": 0, "hedged": 0, "hedge_wins": 0}
+            return self._breakers[key]
+    
+    def _count(self, key: str, counter: str):
+        with self._lock:
+            self._counters[key][counter] += 1
+    
+    def percentile(self, key: str, pct: float) -> Optional[float]:
+        """Latency percentile in seconds over the recent window, or None without enough samples"""
+        with self._lock:
+            samples = sorted(self._latencies.get(key, ()))
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * pct / 100))]
+    
+    def call(self, key: str, send: Callable[[], requests.Response],
+             hedge_percentile: Optional[float] = None) -> requests.Response:
+        """Send through the endpoint's breaker, hedging with a second request once the latency percentile is exceeded"""
+        breaker = self.breaker(key)
+        if not breaker.allow():
+            self._count(key, "rejected")
+            raise CircuitOpenError(f"Circuit open for {key}")
+        self._count(key, "requests")
+        started = time.monotonic()
+        try:
+            if hedge_percentile is not None:
+                response = self._hedged(key, send, hedge_percentile)
+            else:
+                response = send()
+        except Exception:
+            self._count(key, "failures")
+            breaker.record_failure()
+            raise
+        with self._lock:
+            self._latencies[key].append(time.monotonic() - started)
+        if response.status_code >= 500:
+            self._count(key, "failures")
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        return response
+    
+    def _hedged(self, key: str, send: Callable[[], requests.Response], pct: float) -> requests.Response:
+        with self._lock:
+            enough = len(self._latencies[key]) >= self.min_hedge_samples
+        delay = self.percentile(key, pct) if enough else None
+        if delay is None:
+            return send()
+        primary = self._hedge_executor.submit(send)
+        try:
+            return primary.result(timeout=delay)
+        except FutureTimeoutError:
+            pass
+        self._count(key, "hedged")
+        backup = self._hedge_executor.submit(send)
+        done, _ = wait([primary, backup], return_when=FIRST_COMPLETED)
+        first = done.pop()
+        if first.exception() is None:
+            if first is backup:
+                self._count(key, "hedge_wins")
+            return first.result()
+        return (backup if first is primary else primary).result()
+    
+    def metrics(self) -> Dict[str, Dict]:
+        """Breaker state, counters and tail latency per endpoint"""
+        with self._lock:
+            keys = list(self._breakers)
+        metrics = {}
+        for key in keys:
+            breaker = self._breakers[key]
+            with self._lock:
+                counters = dict(self._counters[key])
+            metrics[key] = {
+                "state": breaker.state,
+                "consecutive_failures": breaker.failures,
+                "times_opened": breaker.times_opened,
+                **counters,
+                "p50": self.percentile(key, 50),
+                "p95": self.percentile(key, 95),
+                "p99": self.percentile(key, 99)
+            }
+        return metrics
+
+# Shared by every N8NAgent and WebhookManager so all sessions see the same endpoint health
+CIRCUIT_BREAKERS = CircuitBreakerRegistry()
 
 class N8NAgent:
     """N8N Workflow Agent for automation management"""
     
-    def __init__(self, base_url: str = "http://localhost:5678", api_key: str = None):
+    # Only these methods are retried on read errors and retryable statuses; POSTs are not idempotent
+    IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+    # Seconds a cached GET response stays fresh, by longest matching path prefix; unlisted paths are not cached
+    CACHE_TTLS = {"/api/v1/workflows": 60.0}
+    
+    def __init__(self, base_url: str = "http://localhost:5678", api_key: str = None,
+                 pool_size: int = 20, connect_timeout: float = 3.05, read_timeout: float = 30.0,
+                 max_retries: int = 3, backoff_factor: float = 0.3,
+                 cache_ttls: Optional[Dict[str, float]] = None,
+                 breakers: Optional[CircuitBreakerRegistry] = None, hedge_percentile: Optional[float] = None,
+                 serializer: Optional[JSONSerializer] = None):
         self.base_url = base_url
         self.api_key = api_key
         self.headers = {
             'Content-Type': 'application/json',
             'X-N8N-API-KEY': api_key if api_key else 'demo-api-key'
         }
+        self.timeout = (connect_timeout, read_timeout)
+        self._pool_lock = threading.Lock()
+        self.session = self._build_session(pool_size, max_retries, backoff_factor)
+        self.breakers = breakers if breakers is not None else CIRCUIT_BREAKERS
+        self.hedge_percentile = hedge_percentile
+        self.serializer = serializer if serializer is not None else JSONSerializer()
+        self.cache_ttls = {**self.CACHE_TTLS, **(cache_ttls or {})}
+        self._response_cache = {}
+        self._cache_lock = threading.Lock()
+    
+    def _build_session(self, pool_size: int, max_retries: int, backoff_factor: float) -> requests.Session:
+        """Keep-alive session with a bounded connection pool and jittered retries"""
+        retry_options = dict(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=self.RETRY_STATUSES,
+            allowed_methods=self.IDEMPOTENT_METHODS,
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        try:
+            self._retry = Retry(backoff_jitter=backoff_factor, **retry_options)
+        except TypeError:
+            # urllib3 < 2 has no backoff_jitter
+            self._retry = Retry(**retry_options)
+        session = requests.Session()
+        session.headers.update(self.headers)
+        self._mount_pool(session, pool_size)
+        return session
+    
+    def _mount_pool(self, session: requests.Session, pool_size: int):
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=self._retry)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        self.pool_size = pool_size
+    
+    def grow_pool(self, pool_size: int):
+        """Widen the connection pool so pool_size concurrent calls can each keep their connection"""
+        with self._pool_lock:
+            if pool_size > self.pool_size:
+                self._mount_pool(self.session, pool_size)
+    
+    def _request(self, method: str, path: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        if "json" in kwargs:
+            kwargs["data"], headers = self.serializer.encode(kwargs.pop("json"))
+            kwargs["headers"] = {**headers, **kwargs.get("headers", {})}
+        url = f"{self.base_url}{path}"
+        # IDs are folded out of the path so each endpoint shares one breaker
+        endpoint = re.sub(r'/(workflows|executions)/[^/?]+', r'/\1/{id}', path)
+        hedge = self.hedge_percentile if method in ("GET", "HEAD") else None
+        return self.breakers.call(f"{method} {self.base_url}{endpoint}",
+                                  lambda: self.session.request(method, url, **kwargs), hedge)
+    
+    @staticmethod
+    def _raise_for_status(response: requests.Response):
+        """Raise HTTPError with n8n's message for non-2xx replies"""
+        if response.ok:
+            return
+        try:
+            detail = response.json().get("message")
+        except Exception:
+            detail = None
+        raise requests.HTTPError(f"HTTP {response.status_code}: {detail or response.reason}", response=response)
+    
+    def get_metrics(self) -> Dict[str, Dict]:
+        """Circuit breaker state and latency percentiles for every endpoint called so far"""
+        return self.breakers.metrics()
+    
+    def _cache_ttl(self, path: str) -> Optional[float]:
+        matches = [prefix for prefix in self.cache_ttls if path.startswith(prefix)]
+        return self.cache_ttls[max(matches, key=len)] if matches else None
+    
+    def _cached_get(self, path: str, params: Optional[Dict] = None) -> Any:
+        """GET with a per-endpoint TTL, revalidating stale entries with ETag/If-Modified-Since; raises on non-2xx"""
+        ttl = self._cache_ttl(path)
+        if ttl is None:
+            response = self._request("GET", path, params=params)
+            self._raise_for_status(response)
+            return response.json()
+        key = (path, tuple(sorted((params or {}).items())))
+        now = time.monotonic()
+        with self._cache_lock:
+            entry = self._response_cache.get(key)
+        if entry is not None and entry["expires"] > now:
+            return entry["data"]
+        
+        headers = {}
+        if entry is not None and entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry is not None and entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+        response = self._request("GET", path, params=params, headers=headers)
+        if response.status_code == 304 and entry is not None:
+            with self._cache_lock:
+                entry["expires"] = now + ttl
+            return entry["data"]
+        # Error bodies are never cached or handed back as data
+        self._raise_for_status(response)
+        data = response.json()
+        # Cached payloads are shared between callers and must be treated as read-only
+        with self._cache_lock:
+            self._response_cache[key] = {
+                "data": data,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "expires": now + ttl
+            }
+        return data
+    
+    def invalidate_cache(self, path_prefix: str = ""):
+        """Drop cached responses whose path starts with path_prefix"""
+        with self._cache_lock:
+            for key in [k for k in self._response_cache if k[0].startswith(path_prefix)]:
+                del self._response_cache[key]
     
     def create_workflow(self, workflow_data: Dict) -> Dict:
         """Create a new n8n workflow"""
         try:
-            response = requests.post(
-                f"{self.base_url}/api/v1/workflows",
-                headers=self.headers,
-                json=workflow_data
-            )
+            response = self._request("POST", "/api/v1/workflows", json=workflow_data)
+            self._raise_for_status(response)
+            self.invalidate_cache("/api/v1/workflows")
             return {"success": True, "data": response.json()}
         except Exception as e:
             return {"success": False, "error": str(e)}
@@ -33,77 +445,1107 @@ class N8NAgent:
         """Execute an n8n workflow"""
         try:
             payload = {"input": input_data} if input_data else {}
-            response = requests.post(
-                f"{self.base_url}/api/v1/workflows/{workflow_id}/execute",
-                headers=self.headers,
-                json=payload
-            )
+            response = self._request("POST", f"/api/v1/workflows/{workflow_id}/execute", json=payload)
             return {"success": True, "data": response.json()}
         except Exception as e:
             return {"success": False, "error": str(e)}
     
     def get_workflow_status(self, execution_id: str) -> Dict:
-        """Get workflow execution status"""
+        """Get workflow execution status; failures carry the HTTP status_code when there was a reply"""
         try:
-            response = requests.get(
-                f"{self.base_url}/api/v1/executions/{execution_id}",
-                headers=self.headers
-            )
+            response = self._request("GET", f"/api/v1/executions/{execution_id}")
+            self._raise_for_status(response)
             return {"success": True, "data": response.json()}
+        except requests.HTTPError as e:
+            return {"success": False, "error": str(e), "status_code": e.response.status_code}
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+    
+    def list_executions(self, workflow_id: Optional[str] = None, status: Optional[str] = None,
+                        limit: int = 100, cursor: Optional[str] = None) -> Dict:
+        """List recent executions, optionally filtered by workflow or status"""
+        try:
+            params = {"limit": limit, "includeData": "false"}
+            if workflow_id:
+                params["workflowId"] = workflow_id
+            if status:
+                params["status"] = status
+            if cursor:
+                params["cursor"] = cursor
+            response = self._request("GET", "/api/v1/executions", params=params)
+            self._raise_for_status(response)
+            return {"success": True, "data": response.json()}
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+    
+    def update_workflow(self, workflow_id: str, workflow_data: Dict) -> Dict:
+        """Replace an existing n8n workflow definition"""
+        try:
+            response = self._request("PUT", f"/api/v1/workflows/{workflow_id}", json=workflow_data)
+            self._raise_for_status(response)
+            self.invalidate_cache("/api/v1/workflows")
+            return {"success": True, "data": response.json()}
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+    
+    def get_workflow(self, workflow_id: str) -> Dict:
+        """Get a single workflow definition"""
+        try:
+            return {"success": True, "data": self._cached_get(f"/api/v1/workflows/{workflow_id}")}
         except Exception as e:
             return {"success": False, "error": str(e)}
     
     def list_workflows(self) -> Dict:
         """List all available workflows"""
         try:
-            response = requests.get(
-                f"{self.base_url}/api/v1/workflows",
-                headers=self.headers
-            )
-            return {"success": True, "data": response.json()}
+            return {"success": True, "data": self._cached_get("/api/v1/workflows")}
         except Exception as e:
             return {"success": False, "error": str(e)}
+    
+    def iter_workflows(self, page_size: int = 100):
+        """Yield every workflow, fetching further pages only as the caller consumes them; raises HTTPError on a failed page"""
+        cursor = None
+        while True:
+            params = {"limit": page_size}
+            if cursor:
+                params["cursor"] = cursor
+            page = self._cached_get("/api/v1/workflows", params=params)
+            if not isinstance(page, dict):
+                yield from page
+                return
+            yield from page.get("data", [])
+            cursor = page.get("nextCursor")
+            if not cursor:
+                return
+    
+    def close(self):
+        """Close pooled connections"""
+        self.session.close()
+
+class AsyncN8NAgent:
+    """Asyncio counterpart of N8NAgent for bulk calls, sharing its pooled session"""
+    
+    def __init__(self, agent: Optional[N8NAgent] = None, max_workers: int = 32, **agent_options):
+        self.agent = agent if agent is not None else N8NAgent(pool_size=max_workers, **agent_options)
+        self.max_workers = max_workers
+        # requests is blocking, so calls run on a bounded thread pool and are awaited from the loop
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="n8n-async")
+    
+    async def _call(self, method: Callable, *args, executor: Optional[ThreadPoolExecutor] = None) -> Dict:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor or self._executor, method, *args)
+    
+    async def create_workflow(self, workflow_data: Dict) -> Dict:
+        """Create a new n8n workflow"""
+        return await self._call(self.agent.create_workflow, workflow_data)
+    
+    async def execute_workflow(self, workflow_id: str, input_data: Dict = None) -> Dict:
+        """Execute an n8n workflow"""
+        return await self._call(self.agent.execute_workflow, workflow_id, input_data)
+    
+    async def get_workflow_status(self, execution_id: str) -> Dict:
+        """Get workflow execution status"""
+        return await self._call(self.agent.get_workflow_status, execution_id)
+    
+    async def list_workflows(self) -> Dict:
+        """List all available workflows"""
+        return await self._call(self.agent.list_workflows)
+    
+    async def execute_many(self, workflow_id: str, inputs, concurrency: int = 10):
+        """Execute a workflow once per input with at most `concurrency` calls in flight, yielding results as they finish"""
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        executor = self._executor
+        if concurrency > self.max_workers:
+            # The shared pool would silently cap calls in flight at max_workers, so size one for this batch
+            executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="n8n-async")
+        # Without enough pooled connections the extra ones are opened per call and thrown away
+        self.agent.grow_pool(concurrency)
+        
+        async def run(index, input_data):
+            started = time.perf_counter()
+            result = await self._call(self.agent.execute_workflow, workflow_id, input_data, executor=executor)
+            return {"index": index, "input": input_data, "result": result,
+                    "elapsed": time.perf_counter() - started}
+        
+        pending = set()
+        try:
+            for index, input_data in enumerate(inputs):
+                if len(pending) >= concurrency:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        yield task.result()
+                pending.add(asyncio.ensure_future(run(index, input_data)))
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+            if executor is not self._executor:
+                executor.shutdown(wait=False)
+    
+    def execute_many_sync(self, workflow_id: str, inputs, concurrency: int = 10) -> List[Dict]:
+        """Blocking wrapper around execute_many for callers without an event loop"""
+        async def collect():
+            return [result async for result in self.execute_many(workflow_id, inputs, concurrency)]
+        return asyncio.run(collect())
+    
+    def close(self):
+        """Shut down the worker threads"""
+        self._executor.shutdown(wait=False)
+
+class ExecutionTracker:
+    """Watches many n8n executions with batched polling that backs off as each execution ages"""
+    
+    FINISHED_STATUSES = {"success", "error", "crashed", "canceled", "failed"}
+    # Set by the tracker itself: n8n answered 404, or every poll failed max_errors times in a row
+    UNRESOLVED_STATUSES = {"not_found", "unreachable"}
+    
+    def __init__(self, agent: N8NAgent, min_interval: float = 1.0, max_interval: float = 30.0,
+                 age_factor: float = 0.1, batch_size: int = 100, max_errors: int = 5):
+        self.agent = agent
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.age_factor = age_factor
+        self.batch_size = batch_size
+        self.max_errors = max_errors
+        self.executions = {}
+        self._subscribers = []
+        self._lock = threading.RLock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._running = False
+    
+    @classmethod
+    def execution_status(cls, execution: Dict) -> str:
+        status = execution.get("status")
+        if status:
+            return status
+        return "success" if execution.get("finished") else "running"
+    
+    def register(self, execution_id: str, workflow_id: Optional[str] = None):
+        """Start watching an execution"""
+        now = time.monotonic()
+        with self._lock:
+            self.executions.setdefault(str(execution_id), {
+                "workflow_id": workflow_id,
+                "status": "unknown",
+                "registered_at": now,
+                "next_poll": now,
+                "errors": 0
+            })
+        self._wakeup.set()
+    
+    def subscribe(self, callback: Callable[[str, str, str, Dict], None]) -> Callable[[], None]:
+        """Call callback(execution_id, old_status, new_status, execution) on every state change; returns an unsubscribe function"""
+        with self._lock:
+            self._subscribers.append(callback)
+        return lambda: self._subscribers.remove(callback) if callback in self._subscribers else None
+    
+    def _interval(self, age: float) -> float:
+        return max(self.min_interval, min(self.max_interval, age * self.age_factor))
+    
+    def _fetch(self, due: Dict[str, Dict]) -> Tuple[Dict[str, Dict], Dict[str, Dict]]:
+        """Fetch due executions with one listing per workflow, falling back to single GETs for stragglers;
+        returns the executions found and the failed lookups by ID"""
+        found, failed = {}, {}
+        for workflow_id in {info["workflow_id"] for info in due.values()}:
+            result = self.agent.list_executions(workflow_id=workflow_id, limit=self.batch_size)
+            if not result["success"]:
+                continue
+            data = result["data"]
+            for execution in (data.get("data", []) if isinstance(data, dict) else data):
+                execution_id = str(execution.get("id"))
+                if execution_id in due:
+                    found[execution_id] = execution
+        for execution_id in due:
+            if execution_id not in found:
+                result = self.agent.get_workflow_status(execution_id)
+                if result["success"] and isinstance(result["data"], dict):
+                    found[execution_id] = result["data"]
+                else:
+                    failed[execution_id] = result
+        return found, failed
+    
+    def poll_once(self) -> float:
+        """Poll every due execution once; returns seconds until the next one is due"""
+        now = time.monotonic()
+        with self._lock:
+            due = {eid: dict(info) for eid, info in self.executions.items() if info["next_poll"] <= now}
+        fetched, failed = self._fetch(due) if due else ({}, {})
+        
+        changes = []
+        with self._lock:
+            for execution_id, info in due.items():
+                state = self.executions.get(execution_id)
+                if state is None:
+                    continue
+                execution = fetched.get(execution_id)
+                failure = failed.get(execution_id)
+                if execution is None and failure is not None:
+                    state["errors"] += 1
+                    if failure.get("status_code") == 404 or state["errors"] >= self.max_errors:
+                        # Deleted, unknown or persistently failing: resolve it instead of polling forever
+                        status = "not_found" if failure.get("status_code") == 404 else "unreachable"
+                        execution = {"id": execution_id, "status": status, "error": failure.get("error")}
+                elif execution is not None:
+                    state["errors"] = 0
+                if execution is not None:
+                    status = self.execution_status(execution)
+                    if status != state["status"]:
+                        changes.append((execution_id, state["status"], status, execution))
+                        state["status"] = status
+                    if status in self.FINISHED_STATUSES or status in self.UNRESOLVED_STATUSES:
+                        del self.executions[execution_id]
+                        continue
+                # Consecutive errors double the wait, still capped at max_interval
+                interval = self._interval(now - state["registered_at"]) * 2 ** state["errors"]
+                state["next_poll"] = now + min(self.max_interval, interval)
+            subscribers = list(self._subscribers)
+            next_due = min((info["next_poll"] for info in self.executions.values()), default=now + self.max_interval)
+        
+        for change in changes:
+            for callback in subscribers:
+                try:
+                    callback(*change)
+                except Exception:
+                    pass
+        return max(0.0, next_due - time.monotonic())
+    
+    def _run(self):
+        while self._running:
+            delay = self.poll_once()
+            self._wakeup.wait(delay)
+            self._wakeup.clear()
+    
+    def start(self):
+        """Poll in a background thread until stop() is called"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="n8n-execution-tracker", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Stop the background poller"""
+        self._running = False
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+    
+    def get_status(self) -> Dict[str, Dict]:
+        """Snapshot of the executions still being watched"""
+        with self._lock:
+            return {eid: {"workflow_id": info["workflow_id"], "status": info["status"]}
+                    for eid, info in self.executions.items()}
 
 class WebhookManager:
     """Webhook management for n8n integration"""
     
-    def __init__(self, webhook_base_url: str = "http://localhost:5678/webhook"):
+    def __init__(self, webhook_base_url: str = "http://localhost:5678/webhook",
+                 timeout: Tuple[float, float] = (3.05, 30.0), breakers: Optional[CircuitBreakerRegistry] = None,
+                 max_workers: int = 8, serializer: Optional[JSONSerializer] = None):
         self.webhook_base_url = webhook_base_url
+        self.timeout = timeout
+        self.serializer = serializer if serializer is not None else JSONSerializer()
+        self.breakers = breakers if breakers is not None else CIRCUIT_BREAKERS
+        self.max_workers = max_workers
         self.active_webhooks = {}
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._lock = threading.Lock()
+        self._executor = None
+        self._batcher = None
+        self._outbox = None
     
     def create_webhook(self, webhook_name: str, workflow_id: str) -> str:
         """Create a webhook endpoint"""
         webhook_url = f"{self.webhook_base_url}/{webhook_name}"
-        self.active_webhooks[webhook_name] = {
-            "url": webhook_url,
-            "workflow_id": workflow_id,
-            "created_at": datetime.now(),
-            "calls": 0
-        }
+        with self._lock:
+            self.active_webhooks[webhook_name] = {
+                "url": webhook_url,
+                "workflow_id": workflow_id,
+                "created_at": datetime.now(),
+                "calls": 0,
+                "failures": 0,
+                "pending": 0
+            }
         return webhook_url
     
-    def send_webhook_data(self, webhook_name: str, data: Dict) -> Dict:
+    def _bump(self, webhook_name: str, counter: str, amount: int = 1):
+        with self._lock:
+            if webhook_name in self.active_webhooks:
+                self.active_webhooks[webhook_name][counter] += amount
+    
+    def send_webhook_data(self, webhook_name: str, data: Any) -> Dict:
         """Send data to a webhook"""
-        if webhook_name not in self.active_webhooks:
+        with self._lock:
+            webhook = self.active_webhooks.get(webhook_name)
+        if webhook is None:
             return {"success": False, "error": "Webhook not found"}
+        return self._post(webhook_name, webhook["url"], data)
+    
+    def _post(self, webhook_name: str, webhook_url: str, data: Any) -> Dict:
+        """POST data; failures carry `retryable`, which is False only for 4xx replies other than 408/429"""
+        try:
+            body, headers = self.serializer.encode(data)
+            response = self.breakers.call(
+                f"POST {webhook_url}",
+                lambda: self.session.post(webhook_url, data=body, headers=headers, timeout=self.timeout)
+            )
+        except Exception as e:
+            # Connection errors, timeouts and open circuits are all worth retrying
+            self._bump(webhook_name, "failures")
+            return {"success": False, "error": str(e), "retryable": True}
+        if not response.ok:
+            self._bump(webhook_name, "failures")
+            status = response.status_code
+            return {"success": False, "error": f"HTTP {status}: {response.reason}", "status_code": status,
+                    "retryable": status >= 500 or status in (408, 429)}
+        self._bump(webhook_name, "calls")
+        try:
+            payload = response.json()
+        except ValueError:
+            payload = response.text
+        return {"success": True, "response": payload}
+    
+    def send_webhook_data_async(self, webhook_name: str, data: Any) -> Future:
+        """Queue a send on the worker pool and return a Future resolving to send_webhook_data's result"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="webhook")
+            executor = self._executor
+        self._bump(webhook_name, "pending")
+        
+        def deliver():
+            try:
+                return self.send_webhook_data(webhook_name, data)
+            finally:
+                self._bump(webhook_name, "pending", -1)
         
+        return executor.submit(deliver)
+    
+    def get_batcher(self, **options) -> "WebhookBatcher":
+        """Shared WebhookBatcher for this manager; options apply only when it is first created"""
+        with self._lock:
+            if self._batcher is None:
+                self._batcher = WebhookBatcher(self, **options)
+            return self._batcher
+    
+    def send_webhook_data_batched(self, webhook_name: str, data: Any, timeout: Optional[float] = None) -> bool:
+        """Buffer data to be sent with other payloads for the same webhook as one JSON array"""
+        with self._lock:
+            known = webhook_name in self.active_webhooks
+        if not known:
+            return False
+        return self.get_batcher().add(webhook_name, data, timeout)
+    
+    def enable_outbox(self, directory: str = "data/outbox", **options) -> "WebhookOutbox":
+        """Record sends on disk before delivery and start the outbox drainer; options apply only on first call"""
+        with self._lock:
+            if self._outbox is None:
+                self._outbox = WebhookOutbox(self, directory, **options)
+                self._outbox.start()
+            return self._outbox
+    
+    def send_webhook_data_durable(self, webhook_name: str, data: Any) -> Dict:
+        """Persist data to the outbox; the drainer delivers it, retrying until n8n accepts it"""
+        with self._lock:
+            webhook = self.active_webhooks.get(webhook_name)
+        if webhook is None:
+            return {"success": False, "error": "Webhook not found"}
         try:
-            webhook_url = self.active_webhooks[webhook_name]["url"]
-            response = requests.post(webhook_url, json=data)
-            self.active_webhooks[webhook_name]["calls"] += 1
-            return {"success": True, "response": response.json()}
+            record_id = self.enable_outbox().enqueue(webhook_name, webhook["url"], data)
+            return {"success": True, "queued": True, "id": record_id}
         except Exception as e:
             return {"success": False, "error": str(e)}
     
     def get_webhook_stats(self) -> Dict:
         """Get webhook statistics"""
-        return self.active_webhooks
+        with self._lock:
+            return {name: dict(stats) for name, stats in self.active_webhooks.items()}
+    
+    def shutdown(self, wait: bool = True):
+        """Flush batches and stop the dispatch workers, optionally waiting for queued sends"""
+        with self._lock:
+            batcher, self._batcher = self._batcher, None
+        if batcher is not None:
+            batcher.close()
+        with self._lock:
+            outbox, self._outbox = self._outbox, None
+        if outbox is not None:
+            outbox.stop()
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+class WebhookBatcher:
+    """Buffers payloads per webhook and sends them as one JSON array once a count, size or age threshold is hit"""
+    
+    def __init__(self, webhook_manager: "WebhookManager", max_items: int = 100, max_bytes: int = 256 * 1024,
+                 max_delay_ms: float = 200, max_outstanding: int = 10_000):
+        self.webhook_manager = webhook_manager
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.max_delay = max_delay_ms / 1000.0
+        self.max_outstanding = max_outstanding
+        self.outstanding = 0
+        self._buffers = {}
+        self._tails = {}
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._flush_expired, name="webhook-batcher", daemon=True)
+        self._thread.start()
+    
+    def add(self, webhook_name: str, payload: Any, timeout: Optional[float] = None) -> bool:
+        """Buffer a payload, blocking while max_outstanding items are buffered or in flight; False on timeout"""
+        size = len(self.webhook_manager.serializer.dumps(payload)) + 1
+        with self._condition:
+            if not self._condition.wait_for(lambda: self.outstanding < self.max_outstanding, timeout):
+                return False
+            buffer = self._buffers.get(webhook_name)
+            if buffer is None:
+                buffer = self._buffers[webhook_name] = {"items": [], "bytes": 2, "started": time.monotonic()}
+            buffer["items"].append(payload)
+            buffer["bytes"] += size
+            self.outstanding += 1
+            if len(buffer["items"]) >= self.max_items or buffer["bytes"] >= self.max_bytes:
+                self._send(webhook_name, self._buffers.pop(webhook_name)["items"])
+            self._condition.notify_all()
+        return True
+    
+    def _send(self, webhook_name: str, batch: List[Any]) -> Future:
+        """Send a batch once the webhook's previous batch has finished; call with the lock held"""
+        future = Future()
+        previous = self._tails.get(webhook_name)
+        self._tails[webhook_name] = future
+        
+        def start(_=None):
+            try:
+                sent = self.webhook_manager.send_webhook_data_async(webhook_name, batch)
+            except Exception as e:
+                sent = Future()
+                sent.set_exception(e)
+            sent.add_done_callback(finish)
+        
+        def finish(sent: Future):
+            with self._condition:
+                self.outstanding -= len(batch)
+                if self._tails.get(webhook_name) is future:
+                    del self._tails[webhook_name]
+                self._condition.notify_all()
+            if sent.exception() is not None:
+                future.set_exception(sent.exception())
+            else:
+                future.set_result(sent.result())
+        
+        # Different webhooks still send concurrently; one webhook's batches go out one at a time
+        if previous is None:
+            start()
+        else:
+            previous.add_done_callback(start)
+        return future
+    
+    def flush(self, webhook_name: Optional[str] = None) -> List[Future]:
+        """Send buffered payloads now, for one webhook or all of them"""
+        with self._condition:
+            names = [webhook_name] if webhook_name is not None else list(self._buffers)
+            return [self._send(name, self._buffers.pop(name)["items"]) for name in names if name in self._buffers]
+    
+    def _flush_expired(self):
+        while True:
+            with self._condition:
+                if self._closed:
+                    return
+                now = time.monotonic()
+                expired = [name for name, buffer in self._buffers.items() if now - buffer["started"] >= self.max_delay]
+                for name in expired:
+                    self._send(name, self._buffers.pop(name)["items"])
+                if not expired:
+                    oldest = min((b["started"] for b in self._buffers.values()), default=None)
+                    wait_for = self.max_delay if oldest is None else max(0.0, oldest + self.max_delay - now)
+                    self._condition.wait(wait_for)
+    
+    def close(self) -> List[Future]:
+        """Flush everything and stop the background flusher"""
+        futures = self.flush()
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        return futures
+
+class WebhookOutbox:
+    """Append-only on-disk log of webhook payloads, replayed in order by a rate-limited background drainer"""
+    
+    SEGMENT_PATTERN = re.compile(r"^segment-(\d{8})\.jsonl$")
+    
+    def __init__(self, webhook_manager: "WebhookManager", directory: str = "data/outbox",
+                 segment_max_bytes: int = 4 * 1024 * 1024, max_per_second: float = 20.0,
+                 max_attempts: Optional[int] = None, base_backoff: float = 0.5, max_backoff: float = 60.0,
+                 fsync: bool = True):
+        self.webhook_manager = webhook_manager
+        self.directory = directory
+        self.segment_max_bytes = segment_max_bytes
+        self.max_per_second = max_per_second
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.fsync = fsync
+        self.delivered = 0
+        self.dead_lettered = 0
+        self._condition = threading.Condition()
+        self._running = False
+        self._thread = None
+        os.makedirs(directory, exist_ok=True)
+        self._recover()
+    
+    def _segment_path(self, segment: int) -> str:
+        return os.path.join(self.directory, f"segment-{segment:08d}.jsonl")
+    
+    def _ack_path(self, segment: int) -> str:
+        return os.path.join(self.directory, f"segment-{segment:08d}.ack")
+    
+    def _recover(self):
+        """Rebuild sequence numbers, record counts and acknowledgements from the files on disk"""
+        segments = sorted(int(m.group(1)) for m in map(self.SEGMENT_PATTERN.match, os.listdir(self.directory)) if m)
+        self._counts = {}
+        self._acked = {}
+        self._next_id = 1
+        if segments:
+            self._truncate_torn_tail(self._segment_path(segments[-1]))
+        for segment in segments:
+            count = 0
+            with open(self._segment_path(segment), "rb") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    count += 1
+                    self._next_id = max(self._next_id, record["id"] + 1)
+            acked = set()
+            if os.path.exists(self._ack_path(segment)):
+                with open(self._ack_path(segment)) as f:
+                    acked = {int(line) for line in f if line.strip()}
+            self._counts[segment] = count
+            self._acked[segment] = acked
+        self._write_segment = segments[-1] if segments else 1
+        self._counts.setdefault(self._write_segment, 0)
+        self._acked.setdefault(self._write_segment, set())
+        self._read_segment = segments[0] if segments else 1
+        self._read_offset = 0
+        for segment in segments[:-1]:
+            self._compact(segment)
+    
+    @staticmethod
+    def _truncate_torn_tail(path: str):
+        """Cut a partial final line left by a crash mid-append so new records start on a fresh line"""
+        with open(path, "rb+") as f:
+            size = f.seek(0, os.SEEK_END)
+            if size == 0:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b"\n":
+                return
+            f.seek(0)
+            f.truncate(f.read().rfind(b"\n") + 1)
+    
+    def enqueue(self, webhook_name: str, webhook_url: str, payload: Any) -> int:
+        """Durably append a payload and return its sequence number"""
+        with self._condition:
+            record_id = self._next_id
+            record = {"id": record_id, "webhook": webhook_name, "url": webhook_url,
+                      "payload": payload, "queued_at": datetime.now().isoformat()}
+            line = self.webhook_manager.serializer.dumps(record) + b"\n"
+            path = self._segment_path(self._write_segment)
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            if size and size + len(line) > self.segment_max_bytes:
+                self._write_segment += 1
+                self._counts[self._write_segment] = 0
+                self._acked[self._write_segment] = set()
+                path = self._segment_path(self._write_segment)
+            with open(path, "ab") as f:
+                f.write(line)
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+            self._next_id += 1
+            self._counts[self._write_segment] += 1
+            self._condition.notify_all()
+        return record_id
+    
+    def _next_record(self) -> Optional[Tuple[int, Dict]]:
+        """Return the oldest unacknowledged record after the read cursor, advancing across segments"""
+        with self._condition:
+            while True:
+                segment = self._read_segment
+                path = self._segment_path(segment)
+                if os.path.exists(path):
+                    with open(path, "rb") as f:
+                        f.seek(self._read_offset)
+                        for line in f:
+                            if not line.endswith(b"\n"):
+                                break
+                            self._read_offset += len(line)
+                            try:
+                                record = json.loads(line)
+                            except ValueError:
+                                continue
+                            if record["id"] not in self._acked.get(segment, ()):
+                                return segment, record
+                if segment >= self._write_segment:
+                    return None
+                self._compact(segment)
+                self._read_segment += 1
+                self._read_offset = 0
+    
+    def _ack(self, segment: int, record_id: int):
+        with self._condition:
+            with open(self._ack_path(segment), "a") as f:
+                f.write(f"{record_id}\n")
+            self._acked.setdefault(segment, set()).add(record_id)
+            if segment != self._write_segment:
+                self._compact(segment)
+    
+    def _compact(self, segment: int):
+        """Delete a closed segment once every record in it has been acknowledged"""
+        if segment == self._write_segment or len(self._acked.get(segment, ())) < self._counts.get(segment, 0):
+            return
+        for path in (self._segment_path(segment), self._ack_path(segment)):
+            if os.path.exists(path):
+                os.remove(path)
+        self._counts.pop(segment, None)
+        self._acked.pop(segment, None)
+    
+    def _dead_letter(self, record: Dict, error: str):
+        with open(os.path.join(self.directory, "dead-letter.jsonl"), "a", encoding="utf-8") as f:
+            f.write(json.dumps({**record, "error": error, "failed_at": datetime.now().isoformat()}, default=str) + "\n")
+        self.dead_lettered += 1
+    
+    def _deliver(self, record: Dict) -> Dict:
+        manager = self.webhook_manager
+        with manager._lock:
+            webhook = manager.active_webhooks.get(record["webhook"])
+        # Records outlive the in-memory webhook registry across restarts, so fall back to the stored URL
+        url = webhook["url"] if webhook is not None else record["url"]
+        return manager._post(record["webhook"], url, record["payload"])
+    
+    def _run(self):
+        interval = 1.0 / self.max_per_second if self.max_per_second else 0.0
+        next_send = time.monotonic()
+        while self._running:
+            item = self._next_record()
+            if item is None:
+                with self._condition:
+                    if self._running:
+                        self._condition.wait(1.0)
+                continue
+            segment, record = item
+            attempts = 0
+            while self._running:
+                delay = next_send - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                next_send = max(next_send, time.monotonic()) + interval
+                result = self._deliver(record)
+                attempts += 1
+                if result.get("success"):
+                    self.delivered += 1
+                    self._ack(segment, record["id"])
+                    break
+                # Rejected payloads (4xx) are dead-lettered at once; server errors, 429s and connection
+                # failures keep retrying, up to max_attempts when one is set
+                exhausted = self.max_attempts is not None and attempts >= self.max_attempts
+                if not result.get("retryable", True) or exhausted:
+                    self._dead_letter(record, result.get("error", ""))
+                    self._ack(segment, record["id"])
+                    break
+                backoff = min(self.max_backoff, self.base_backoff * 2 ** (attempts - 1))
+                with self._condition:
+                    if self._running:
+                        self._condition.wait(backoff * (0.5 + random.random() / 2))
+            else:
+                # Stopped mid-retry: rewind so the record is picked up again on the next start
+                with self._condition:
+                    self._read_segment = segment
+                    self._read_offset = 0
+    
+    def start(self):
+        """Drain the outbox in a background thread until stop() is called"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="webhook-outbox", daemon=True)
+        self._thread.start()
+    
+    def stop(self, timeout: float = 5.0):
+        """Stop the drainer; undelivered records stay on disk for the next start"""
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+    
+    def stats(self) -> Dict[str, int]:
+        """Pending record count, segment count and delivery totals"""
+        with self._condition:
+            pending = sum(self._counts[s] - len(self._acked.get(s, ())) for s in self._counts)
+            return {"pending": pending, "segments": len(self._counts),
+                    "delivered": self.delivered, "dead_lettered": self.dead_lettered}
+
+class DataFrameCache:
+    """Process-wide LRU cache of loaded DataFrames, validated by file mtime and size"""
+    
+    @staticmethod
+    def _hand_out(data: pd.DataFrame) -> pd.DataFrame:
+        """Copy of a cached frame that callers may modify without touching the cache"""
+        # Shallow copies share the cached arrays, which is only safe under copy-on-write
+        # (always on from pandas 3, opt-in before that); otherwise pay for a real copy
+        if int(pd.__version__.split('.')[0]) >= 3 or pd.get_option('mode.copy_on_write') is True:
+            return data.copy(deep=False)
+        return data.copy(deep=True)
+    
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+    
+    @staticmethod
+    def file_signature(filepath: str) -> Optional[Tuple[int, int]]:
+        """Return the (mtime_ns, size) pair used to validate cache entries"""
+        try:
+            stat = os.stat(filepath)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+    
+    def configure(self, max_bytes: int):
+        """Change the memory budget, evicting entries that no longer fit"""
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+    
+    def get(self, filepath: str, variant: Any = None) -> Optional[pd.DataFrame]:
+        """Return a private copy of a cached frame if the file is unchanged"""
+        key = (os.path.abspath(filepath), variant)
+        signature = self.file_signature(filepath)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or signature is None or entry["signature"] != signature:
+                if entry is not None:
+                    self._drop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._hand_out(entry["data"])
+    
+    def put(self, filepath: str, data: pd.DataFrame, signature: Tuple[int, int], variant: Any = None):
+        """Store a frame read from a file with the given signature"""
+        nbytes = int(data.memory_usage(deep=True).sum())
+        if nbytes > self.max_bytes:
+            return
+        key = (os.path.abspath(filepath), variant)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = {"data": data, "signature": signature, "bytes": nbytes}
+            self.current_bytes += nbytes
+            self._evict()
+    
+    def load(self, filepath: str, loader: Callable[[str], pd.DataFrame], variant: Any = None) -> pd.DataFrame:
+        """Return the cached frame for a file, calling loader on a miss"""
+        cached = self.get(filepath, variant)
+        if cached is not None:
+            return cached
+        # Take the signature before reading so a concurrent write is never
+        # cached under the newer mtime.
+        signature = self.file_signature(filepath)
+        data = loader(filepath)
+        if signature is not None:
+            self.put(filepath, data, signature, variant)
+        return self._hand_out(data)
+    
+    def invalidate(self, filepath: str):
+        """Drop every cached variant of a file"""
+        path = os.path.abspath(filepath)
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == path]:
+                self._drop(key)
+    
+    def clear(self):
+        """Drop all cached frames"""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+    
+    def stats(self) -> Dict:
+        """Get cache statistics"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+    
+    def _drop(self, key):
+        entry = self._entries.pop(key)
+        self.current_bytes -= entry["bytes"]
+    
+    def _evict(self):
+        while self._entries and self.current_bytes > self.max_bytes:
+            key = next(iter(self._entries))
+            self._drop(key)
+
+# Shared by every CSVManager in the process so all Streamlit sessions reuse the same frames
+DATAFRAME_CACHE = DataFrameCache()
+
+class SidecarIndex:
+    """Primary-key index mapping each key of a CSV file to the byte offset of its row"""
+    
+    def __init__(self, index_path: str, column: str):
+        self.index_path = index_path
+        self.meta_path = f"{index_path}.meta"
+        self.column = column
+        self.position = None
+        self.signature = None
+        self.offsets = {}
+    
+    @staticmethod
+    def iter_records(f, start: int = 0):
+        """Yield (offset, raw bytes) for each CSV record from start, keeping quoted newlines together"""
+        f.seek(start)
+        offset = start
+        record_start = start
+        record = b""
+        for line in f:
+            if not record:
+                record_start = offset
+            record += line
+            offset += len(line)
+            if record.count(b'"') % 2 == 0:
+                yield record_start, record
+                record = b""
+        if record:
+            yield record_start, record
+    
+    @staticmethod
+    def parse_record(record: bytes) -> List[str]:
+        return next(csv.reader([record.decode('utf-8')]), [])
+    
+    @classmethod
+    def open(cls, index_path: str, column: str) -> Optional["SidecarIndex"]:
+        """Load a persisted index, or None if it does not exist"""
+        if not os.path.exists(index_path) or not os.path.exists(f"{index_path}.meta"):
+            return None
+        index = cls(index_path, column)
+        with open(index.meta_path) as f:
+            meta = json.load(f)
+        index.position = meta["position"]
+        index.signature = tuple(meta["signature"])
+        with open(index_path) as f:
+            for line in f:
+                key, offset = json.loads(line)
+                index.offsets[key] = offset
+        return index
+    
+    def _write_meta(self):
+        tmp_path = f"{self.meta_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({"column": self.column, "position": self.position, "signature": list(self.signature)}, f)
+        os.replace(tmp_path, self.meta_path)
+    
+    def _scan(self, f, start: int) -> List[Tuple[str, int]]:
+        entries = []
+        for offset, record in self.iter_records(f, start):
+            if not record.strip():
+                continue
+            fields = self.parse_record(record)
+            if self.position < len(fields):
+                entries.append((fields[self.position], offset))
+        return entries
+    
+    def rebuild(self, filepath: str):
+        """Index every row of the file from scratch"""
+        signature = DataFrameCache.file_signature(filepath)
+        with open(filepath, 'rb') as f:
+            records = self.iter_records(f)
+            header = next(records, None)
+            columns = self.parse_record(header[1]) if header else []
+            if self.column not in columns:
+                raise KeyError(f"Column '{self.column}' not found in {os.path.basename(filepath)}")
+            self.position = columns.index(self.column)
+            entries = self._scan(f, header[0] + len(header[1]))
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            for key, offset in entries:
+                f.write(json.dumps([key, offset]) + "\n")
+        os.replace(tmp_path, self.index_path)
+        self.offsets = dict(entries)
+        self.signature = signature
+        self._write_meta()
+    
+    def extend(self, filepath: str, start: int, previous_signature: Optional[Tuple[int, int]]):
+        """Index rows appended at start, rebuilding if the file changed behind our back"""
+        if start == 0 or self.signature != previous_signature:
+            self.rebuild(filepath)
+            return
+        signature = DataFrameCache.file_signature(filepath)
+        with open(filepath, 'rb') as f:
+            entries = self._scan(f, start)
+        with open(self.index_path, 'a') as f:
+            for key, offset in entries:
+                f.write(json.dumps([key, offset]) + "\n")
+        self.offsets.update(entries)
+        self.signature = signature
+        self._write_meta()
+    
+    def is_current(self, filepath: str) -> bool:
+        return self.signature == DataFrameCache.file_signature(filepath)
+    
+    def remove(self):
+        for path in (self.index_path, self.meta_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+# Open indexes are shared process-wide so lookups never re-read the sidecar
+_OPEN_INDEXES = {}
+
+class FileCatalog:
+    """Per-category file listing and metadata, refreshed incrementally from stat checks"""
+    
+    def __init__(self, csv_manager: "CSVManager"):
+        self.csv_manager = csv_manager
+        self._categories = {}
+        self._lock = threading.RLock()
+    
+    def list_files(self, category: str) -> List[str]:
+        """Logical file names in a category, re-scanned only when the directory changes"""
+        category_path = f"{self.csv_manager.data_dir}/{category}"
+        try:
+            dir_mtime = os.stat(category_path).st_mtime_ns
+        except OSError:
+            return []
+        with self._lock:
+            state = self._categories.get(category)
+            if state is None or state["dir_mtime"] != dir_mtime:
+                files = self.csv_manager._scan_category(category)
+                entries = state["entries"] if state else {}
+                state = {
+                    "dir_mtime": dir_mtime,
+                    "files": files,
+                    "entries": {name: entries[name] for name in files if name in entries}
+                }
+                self._categories[category] = state
+            return list(state["files"])
+    
+    def get_info(self, filename: str, category: str) -> Optional[Dict]:
+        """Row count, columns, size, mtime and schema of a file, recomputed only if it changed"""
+        filename = self.csv_manager._logical_name(filename)
+        filepath = self.csv_manager._resolve_read_path(filename, category)
+        if filepath is None:
+            return None
+        signature = DataFrameCache.file_signature(filepath)
+        with self._lock:
+            state = self._categories.setdefault(category, {"dir_mtime": None, "files": [], "entries": {}})
+            entry = state["entries"].get(filename)
+            if entry is not None and entry["path"] == filepath and entry["signature"] == signature:
+                return dict(entry["info"])
+        
+        info = {
+            "rows": self.csv_manager._count_rows(filepath),
+            "columns": self.csv_manager._read_columns(filepath),
+            "schema": self.csv_manager._read_schema(filepath),
+            "size": signature[1],
+            "mtime": datetime.fromtimestamp(signature[0] / 1e9)
+        }
+        with self._lock:
+            state["entries"][filename] = {"path": filepath, "signature": signature, "info": info}
+        return dict(info)
+    
+    def record_append(self, filename: str, category: str, filepath: str, rows_added: int,
+                      previous_signature: Optional[Tuple[int, int]]):
+        """Bump the cached row count after an append instead of recounting the file"""
+        with self._lock:
+            state = self._categories.get(category)
+            entry = state["entries"].get(filename) if state else None
+            if entry is None or entry["path"] != filepath or entry["signature"] != previous_signature:
+                return
+            signature = DataFrameCache.file_signature(filepath)
+            entry["info"] = {**entry["info"], "rows": entry["info"]["rows"] + rows_added,
+                             "size": signature[1], "mtime": datetime.fromtimestamp(signature[0] / 1e9)}
+            entry["signature"] = signature
+    
+    def invalidate(self, category: str, filename: Optional[str] = None):
+        """Forget a category's listing, or a single file's metadata"""
+        with self._lock:
+            state = self._categories.get(category)
+            if state is None:
+                return
+            if filename is None:
+                state["dir_mtime"] = None
+            else:
+                state["entries"].pop(filename, None)
+
+# One catalog per data directory and storage format, shared by every manager in the process
+_CATALOGS = {}
+_CATALOGS_GUARD = threading.Lock()
+
+# Serializes appends to the same file across threads and manager instances
+_FILE_LOCKS = {}
+_FILE_LOCKS_GUARD = threading.Lock()
 
 class CSVManager:
     """Comprehensive CSV data management system"""
     
-    def __init__(self, data_dir: str = "data"):
+    # Files are always addressed by their logical ".csv" name; the storage
+    # format only decides what sits on disk.
+    STORAGE_EXTENSIONS = {"csv": ".csv", "parquet": ".parquet", "feather": ".feather"}
+    KEY_COLUMNS = ("client_id", "lead_id", "log_id")
+    
+    # Per-category dtype hints applied when compact_dtypes is enabled
+    SCHEMA_HINTS = {
+        "clients": {
+            "status": "category",
+            "service_type": "category",
+            "lead_source": "category",
+            "created_at": "datetime64[ns]"
+        },
+        "automations": {
+            "workflow_name": "category",
+            "status": "category",
+            "execution_time": "datetime64[ns]"
+        }
+    }
+    # Text columns whose distinct values make up at most this share of rows load as categoricals
+    CATEGORY_MAX_RATIO = 0.5
+    
+    def __init__(self, data_dir: str = "data", cache: Optional[DataFrameCache] = None, storage_format: str = "csv",
+                 compact_dtypes: bool = False, schema_hints: Optional[Dict[str, Dict[str, str]]] = None):
+        if storage_format not in self.STORAGE_EXTENSIONS:
+            raise ValueError(f"Unknown storage format: {storage_format}")
+        if storage_format != "csv" and not PYARROW_AVAILABLE:
+            st.warning(f"pyarrow is not installed, falling back to CSV storage instead of {storage_format}")
+            storage_format = "csv"
         self.data_dir = data_dir
+        self.cache = cache if cache is not None else DATAFRAME_CACHE
+        self.storage_format = storage_format
+        self.compact_dtypes = compact_dtypes
+        self.schema_hints = schema_hints or {}
+        self._stream_schemas = {}
+        with _CATALOGS_GUARD:
+            self.catalog = _CATALOGS.setdefault((os.path.abspath(data_dir), storage_format), FileCatalog(self))
         self.ensure_data_directory()
     
     def ensure_data_directory(self):
@@ -114,91 +1556,1110 @@ class CSVManager:
         os.makedirs(f"{self.data_dir}/automations", exist_ok=True)
         os.makedirs(f"{self.data_dir}/reports", exist_ok=True)
     
+    def _logical_name(self, filename: str) -> str:
+        for extension in self.STORAGE_EXTENSIONS.values():
+            if filename.endswith(extension):
+                return filename[:-len(extension)] + ".csv"
+        return filename
+    
+    def _variant_paths(self, filename: str, category: str) -> Dict[str, str]:
+        stem = self._logical_name(filename)[:-len(".csv")]
+        return {fmt: f"{self.data_dir}/{category}/{stem}{ext}" for fmt, ext in self.STORAGE_EXTENSIONS.items()}
+    
+    def _path_format(self, filepath: str) -> str:
+        return next(fmt for fmt, ext in self.STORAGE_EXTENSIONS.items() if filepath.endswith(ext))
+    
+    def _storage_path(self, filename: str, category: str) -> str:
+        """Path a logical file is written to: the configured format, unless it was already migrated off CSV"""
+        paths = self._variant_paths(filename, category)
+        storage_path = paths[self.storage_format]
+        if self.storage_format == "csv" and not os.path.exists(storage_path):
+            # A fresh CSV next to a migrated file would shadow its rows and be converted over them
+            migrated = [path for fmt, path in paths.items() if fmt != "csv" and os.path.exists(path)]
+            if migrated:
+                return max(migrated, key=os.path.getmtime)
+        return storage_path
+    
+    def _resolve_read_path(self, filename: str, category: str) -> Optional[str]:
+        """Path to read a logical file from, migrating a newer CSV to the columnar format"""
+        paths = self._variant_paths(filename, category)
+        storage_path = paths[self.storage_format]
+        csv_path = paths["csv"]
+        if self.storage_format != "csv" and os.path.exists(csv_path):
+            with self._file_lock(storage_path):
+                self._migrate_csv(csv_path, storage_path)
+        if os.path.exists(storage_path):
+            return storage_path
+        existing = [path for path in paths.values() if os.path.exists(path)]
+        if existing:
+            return max(existing, key=os.path.getmtime)
+        return None
+    
+    def _migrate_csv(self, csv_path: str, storage_path: str):
+        """Convert a CSV newer than its columnar copy, then retire it as .csv.migrated so the copy is authoritative"""
+        if not os.path.exists(csv_path):
+            return
+        if not os.path.exists(storage_path) or os.path.getmtime(csv_path) > os.path.getmtime(storage_path):
+            # Readers only ever see the old file or the complete new one
+            tmp_path = f"{storage_path}.tmp"
+            try:
+                self._write_file(pd.read_csv(csv_path), tmp_path, self.storage_format)
+                os.replace(tmp_path, storage_path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            self.cache.invalidate(storage_path)
+        os.replace(csv_path, f"{csv_path}.migrated")
+        self.cache.invalidate(csv_path)
+        self._drop_schema(csv_path)
+    
+    def _read_file(self, filepath: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        if filepath.endswith(".csv"):
+            if columns is None:
+                return pd.read_csv(filepath)
+            wanted = set(columns)
+            return pd.read_csv(filepath, usecols=lambda column: column in wanted)
+        if columns is not None:
+            available = set(self._read_columns(filepath))
+            columns = [column for column in columns if column in available]
+        if filepath.endswith(".parquet"):
+            return pd.read_parquet(filepath, columns=columns)
+        return pd.read_feather(filepath, columns=columns)
+    
+    def _read_columns(self, filepath: str) -> List[str]:
+        """Column names of a stored file without reading its rows"""
+        if filepath.endswith(".csv"):
+            return list(pd.read_csv(filepath, nrows=0).columns)
+        if filepath.endswith(".parquet"):
+            import pyarrow.parquet
+            return pyarrow.parquet.read_schema(filepath).names
+        import pyarrow.ipc
+        with pyarrow.ipc.open_file(filepath) as reader:
+            return reader.schema.names
+    
+    def _schema_path(self, filepath: str) -> str:
+        return f"{os.path.dirname(filepath)}/.schemas/{os.path.basename(filepath)}.json"
+    
+    def _drop_schema(self, filepath: str):
+        schema_path = self._schema_path(filepath)
+        if os.path.exists(schema_path):
+            os.remove(schema_path)
+    
+    @staticmethod
+    def _downcast(values: pd.Series) -> Optional[pd.Series]:
+        """Narrowest numeric dtype that holds the values exactly, or None if it cannot shrink"""
+        if pd.api.types.is_bool_dtype(values):
+            return None
+        if pd.api.types.is_integer_dtype(values):
+            # Ids get new values derived with arithmetic (max() + 1), so they keep their width
+            if values.name in CSVManager.KEY_COLUMNS or str(values.name).endswith("_id"):
+                return None
+            # No narrower than int32 so counters do not wrap when added up or incremented
+            if values.dtype.itemsize <= 4:
+                return None
+            compacted = pd.to_numeric(values, downcast='integer')
+            if compacted.dtype.itemsize < 4:
+                compacted = values.astype(np.int32 if compacted.dtype.kind == 'i' else np.uint32)
+        elif pd.api.types.is_float_dtype(values):
+            compacted = pd.to_numeric(values, downcast='float')
+            if not (compacted.astype(values.dtype) == values).where(values.notna(), True).all():
+                return None
+        else:
+            return None
+        return compacted if compacted.dtype != values.dtype else None
+    
+    def _compact_frame(self, df: pd.DataFrame, category: str) -> Tuple[pd.DataFrame, Dict]:
+        """Shrink a frame's dtypes, returning it with the schema that reproduces them"""
+        hints = {**self.SCHEMA_HINTS.get(category, {}), **self.schema_hints.get(category, {})}
+        schema = {"columns": list(df.columns), "dtypes": {}, "parse_dates": [], "downcast": []}
+        df = df.copy(deep=False)
+        for column in df.columns:
+            values = df[column]
+            hint = hints.get(column)
+            if hint is not None and hint.startswith("datetime"):
+                df[column] = pd.to_datetime(values, errors='coerce')
+                schema["parse_dates"].append(column)
+            elif hint is not None:
+                df[column] = values.astype(hint)
+                schema["dtypes"][column] = hint
+            elif pd.api.types.is_numeric_dtype(values):
+                compacted = self._downcast(values)
+                if compacted is not None:
+                    df[column] = compacted
+                    schema["downcast"].append(column)
+            elif (pd.api.types.is_object_dtype(values) or pd.api.types.is_string_dtype(values)) and len(values) \
+                    and values.nunique(dropna=True) <= self.CATEGORY_MAX_RATIO * len(values):
+                df[column] = values.astype('category')
+                schema["dtypes"][column] = 'category'
+        return df, schema
+    
+    def _read_compact(self, filepath: str, category: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Read with compact dtypes, reusing the sidecar schema for CSV files to skip inference"""
+        schema_path = self._schema_path(filepath)
+        if filepath.endswith(".csv") and os.path.exists(schema_path):
+            with open(schema_path) as f:
+                schema = json.load(f)
+            if schema.get("columns") == self._read_columns(filepath):
+                wanted = set(columns) if columns is not None else set(schema["columns"])
+                try:
+                    df = pd.read_csv(
+                        filepath,
+                        usecols=lambda column: column in wanted,
+                        dtype={c: t for c, t in schema["dtypes"].items() if c in wanted},
+                        parse_dates=[c for c in schema["parse_dates"] if c in wanted]
+                    )
+                    # Downcasting after the read keeps values that outgrew the stored width intact
+                    for column in schema["downcast"]:
+                        if column in df.columns:
+                            compacted = self._downcast(df[column])
+                            if compacted is not None:
+                                df[column] = compacted
+                    return df
+                except Exception:
+                    pass
+        
+        df, schema = self._compact_frame(self._read_file(filepath, columns), category)
+        if filepath.endswith(".csv") and columns is None:
+            os.makedirs(os.path.dirname(schema_path), exist_ok=True)
+            with open(schema_path, 'w') as f:
+                json.dump(schema, f)
+        return df
+    
+    def _write_file(self, data: pd.DataFrame, filepath: str, storage_format: Optional[str] = None):
+        if storage_format is None:
+            storage_format = self._path_format(filepath)
+        if storage_format == "csv":
+            data.to_csv(filepath, index=False)
+        elif storage_format == "parquet":
+            data.to_parquet(filepath, index=False)
+        else:
+            data.reset_index(drop=True).to_feather(filepath)
+    
     def save_csv(self, data: pd.DataFrame, filename: str, category: str = "general") -> bool:
         """Save DataFrame to CSV"""
         try:
-            filepath = f"{self.data_dir}/{category}/{filename}"
-            data.to_csv(filepath, index=False)
+            filepath = self._storage_path(filename, category)
+            with self._file_lock(filepath):
+                self._write_file(data, filepath)
+                self.cache.invalidate(filepath)
+                self._drop_schema(filepath)
+                self._refresh_indexes(filename, category)
+            self.catalog.invalidate(category)
             return True
         except Exception as e:
             st.error(f"Error saving CSV: {str(e)}")
             return False
     
-    def load_csv(self, filename: str, category: str = "general") -> Optional[pd.DataFrame]:
-        """Load CSV file as DataFrame"""
+    def load_csv(self, filename: str, category: str = "general", columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+        """Load CSV file as DataFrame, optionally projecting only the given columns"""
         try:
-            filepath = f"{self.data_dir}/{category}/{filename}"
-            if os.path.exists(filepath):
-                return pd.read_csv(filepath)
+            filepath = self._resolve_read_path(filename, category)
+            if filepath is not None:
+                variant = (tuple(columns) if columns is not None else None, self.compact_dtypes)
+                if self.compact_dtypes:
+                    loader = lambda path: self._read_compact(path, category, columns)
+                else:
+                    loader = lambda path: self._read_file(path, columns)
+                return self.cache.load(filepath, loader, variant)
             return None
         except Exception as e:
             st.error(f"Error loading CSV: {str(e)}")
             return None
     
+    def _scan_category(self, category: str) -> List[str]:
+        category_path = f"{self.data_dir}/{category}"
+        if not os.path.exists(category_path):
+            return []
+        extensions = tuple(self.STORAGE_EXTENSIONS.values())
+        names = [self._logical_name(f) for f in os.listdir(category_path) if f.endswith(extensions)]
+        return list(dict.fromkeys(names))
+    
     def list_csv_files(self, category: str = "general") -> List[str]:
         """List all CSV files in a category"""
         try:
-            category_path = f"{self.data_dir}/{category}"
-            if os.path.exists(category_path):
-                return [f for f in os.listdir(category_path) if f.endswith('.csv')]
-            return []
+            return self.catalog.list_files(category)
         except Exception as e:
             st.error(f"Error listing CSV files: {str(e)}")
             return []
     
+    def get_file_info(self, filename: str, category: str = "general") -> Optional[Dict]:
+        """Get catalog metadata (rows, columns, size, mtime, schema) without loading the file"""
+        try:
+            return self.catalog.get_info(filename, category)
+        except Exception as e:
+            st.error(f"Error reading file info: {str(e)}")
+            return None
+    
+    def _count_rows(self, filepath: str) -> int:
+        if filepath.endswith(".parquet"):
+            import pyarrow.parquet
+            return pyarrow.parquet.ParquetFile(filepath).metadata.num_rows
+        if not filepath.endswith(".csv"):
+            import pyarrow.ipc
+            with pyarrow.ipc.open_file(filepath) as reader:
+                return sum(reader.get_batch(i).num_rows for i in range(reader.num_record_batches))
+        
+        newlines = 0
+        quoted = False
+        last = b""
+        with open(filepath, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                newlines += block.count(b"\n")
+                quoted = quoted or b'"' in block
+                last = block[-1:]
+        if quoted:
+            # Quoted fields may span lines, so fall back to counting whole records
+            with open(filepath, 'rb') as f:
+                records = sum(1 for _, record in SidecarIndex.iter_records(f) if record.strip())
+            return max(records - 1, 0)
+        if last and last != b"\n":
+            newlines += 1
+        return max(newlines - 1, 0)
+    
+    def _read_schema(self, filepath: str) -> Dict[str, str]:
+        if filepath.endswith(".csv"):
+            sample = pd.read_csv(filepath, nrows=1000)
+            return {column: str(dtype) for column, dtype in sample.dtypes.items()}
+        if filepath.endswith(".parquet"):
+            import pyarrow.parquet
+            schema = pyarrow.parquet.read_schema(filepath)
+        else:
+            import pyarrow.ipc
+            with pyarrow.ipc.open_file(filepath) as reader:
+                schema = reader.schema
+        return {field.name: str(field.type) for field in schema}
+    
     def delete_csv(self, filename: str, category: str = "general") -> bool:
-        """Delete a CSV file"""
+        """Delete a CSV file and any columnar copy of it"""
         try:
-            filepath = f"{self.data_dir}/{category}/{filename}"
-            if os.path.exists(filepath):
-                os.remove(filepath)
+            deleted = False
+            for filepath in self._variant_paths(filename, category).values():
+                if os.path.exists(filepath):
+                    os.remove(filepath)
+                    self.cache.invalidate(filepath)
+                    self._drop_schema(filepath)
+                    deleted = True
+            self._refresh_indexes(filename, category)
+            self.catalog.invalidate(category)
+            return deleted
+        except Exception as e:
+            st.error(f"Error deleting CSV: {str(e)}")
+            return False
+    
+    def _file_lock(self, filepath: str) -> threading.Lock:
+        key = os.path.abspath(filepath)
+        with _FILE_LOCKS_GUARD:
+            return _FILE_LOCKS.setdefault(key, threading.Lock())
+    
+    @staticmethod
+    def _rows_to_frame(rows: Any) -> pd.DataFrame:
+        if isinstance(rows, pd.DataFrame):
+            return rows
+        if isinstance(rows, dict):
+            rows = [rows]
+        return pd.DataFrame(list(rows))
+    
+    def _read_header(self, filepath: str) -> List[str]:
+        with open(filepath, newline='', encoding='utf-8') as f:
+            first_line = f.readline()
+        return next(csv.reader([first_line]), [])
+    
+    def _encode_rows(self, data: pd.DataFrame, filepath: str) -> Optional[bytes]:
+        """Encode rows for appending, aligned to the existing header; None on schema mismatch"""
+        if not os.path.exists(filepath) or os.path.getsize(filepath) == 0:
+            return data.to_csv(index=False).encode('utf-8')
+        header = self._read_header(filepath)
+        unknown = [column for column in data.columns if column not in header]
+        if unknown:
+            st.error(f"Error appending rows: columns {unknown} are not in the header of {os.path.basename(filepath)}")
+            return None
+        return data.reindex(columns=header).to_csv(index=False, header=False).encode('utf-8')
+    
+    def _append_bytes(self, filepath: str, payload: bytes, fsync: bool = True) -> int:
+        """Append payload in one write, truncating back on failure; returns the offset it was written at"""
+        fd = os.open(filepath, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            start = os.fstat(fd).st_size
+            if start > 0:
+                with open(filepath, 'rb') as f:
+                    f.seek(start - 1)
+                    if f.read(1) != b"\n":
+                        payload = b"\n" + payload
+            try:
+                view = memoryview(payload)
+                while view:
+                    written = os.write(fd, view)
+                    view = view[written:]
+                if fsync:
+                    os.fsync(fd)
+            except BaseException:
+                os.ftruncate(fd, start)
+                raise
+            return start
+        finally:
+            os.close(fd)
+    
+    def append_rows(self, rows: Any, filename: str, category: str = "general", fsync: bool = True) -> bool:
+        """Append rows to the end of a file without rewriting it"""
+        try:
+            data = self._rows_to_frame(rows)
+            if data.empty:
                 return True
+            filepath = self._storage_path(filename, category)
+            if not filepath.endswith(".csv"):
+                # Columnar files cannot be appended in place
+                existing = self.load_csv(filename, category)
+                if existing is not None:
+                    unknown = [column for column in data.columns if column not in existing.columns]
+                    if unknown:
+                        st.error(f"Error appending rows: columns {unknown} are not in {filename}")
+                        return False
+                    data = pd.concat([existing, data.reindex(columns=existing.columns)], ignore_index=True)
+                return self.save_csv(data, filename, category)
+            with self._file_lock(filepath):
+                payload = self._encode_rows(data, filepath)
+                if payload is None:
+                    return False
+                previous_signature = DataFrameCache.file_signature(filepath)
+                start = self._append_bytes(filepath, payload, fsync)
+                self.cache.invalidate(filepath)
+                self._refresh_indexes(filename, category, start, previous_signature)
+                if start == 0:
+                    self.catalog.invalidate(category)
+                else:
+                    self.catalog.record_append(self._logical_name(filename), category, filepath, len(data), previous_signature)
+            return True
+        except Exception as e:
+            st.error(f"Error appending to CSV: {str(e)}")
             return False
+    
+    def _index_path(self, filename: str, category: str, column: str) -> str:
+        stem = self._logical_name(filename)[:-len(".csv")]
+        return f"{self.data_dir}/{category}/.indexes/{stem}.{column}.idx"
+    
+    def _get_index(self, filename: str, category: str, column: str) -> Optional[SidecarIndex]:
+        index_path = self._index_path(filename, category, column)
+        key = os.path.abspath(index_path)
+        index = _OPEN_INDEXES.get(key)
+        if index is None:
+            index = SidecarIndex.open(index_path, column)
+            if index is not None:
+                _OPEN_INDEXES[key] = index
+        return index
+    
+    def _indexed_columns(self, filename: str, category: str) -> List[str]:
+        index_dir = f"{self.data_dir}/{category}/.indexes"
+        if not os.path.isdir(index_dir):
+            return []
+        prefix = self._logical_name(filename)[:-len(".csv")] + "."
+        return [f[len(prefix):-len(".idx")] for f in os.listdir(index_dir)
+                if f.startswith(prefix) and f.endswith(".idx")]
+    
+    def _refresh_indexes(self, filename: str, category: str, start: int = 0,
+                         previous_signature: Optional[Tuple[int, int]] = None):
+        """Bring every existing index of a file up to date after a write"""
+        filepath = self._storage_path(filename, category)
+        for column in self._indexed_columns(filename, category):
+            index = self._get_index(filename, category, column)
+            if index is None:
+                continue
+            if not filepath.endswith(".csv") or not os.path.exists(filepath):
+                index.remove()
+                _OPEN_INDEXES.pop(os.path.abspath(index.index_path), None)
+            else:
+                index.extend(filepath, start, previous_signature)
+    
+    def create_index(self, filename: str, column: str, category: str = "general") -> bool:
+        """Build a sidecar index on a key column, kept up to date by later saves and appends"""
+        try:
+            filepath = self._storage_path(filename, category)
+            if not filepath.endswith(".csv") or not os.path.exists(filepath):
+                return False
+            index_path = self._index_path(filename, category, column)
+            with self._file_lock(filepath):
+                index = SidecarIndex(index_path, column)
+                index.rebuild(filepath)
+                _OPEN_INDEXES[os.path.abspath(index_path)] = index
+            return True
         except Exception as e:
-            st.error(f"Error deleting CSV: {str(e)}")
+            st.error(f"Error creating index: {str(e)}")
             return False
     
-    def merge_csv_files(self, filenames: List[str], output_filename: str, category: str = "general") -> bool:
-        """Merge multiple CSV files"""
+    def get_rows(self, filename: str, keys: List[Any], category: str = "general",
+                 key_column: Optional[str] = None) -> Optional[pd.DataFrame]:
+        """Fetch rows by primary key, seeking straight to them through a sidecar index"""
         try:
-            dataframes = []
-            for filename in filenames:
+            filepath = self._resolve_read_path(filename, category)
+            if filepath is None:
+                return None
+            if key_column is None:
+                columns = self._read_columns(filepath)
+                key_column = next((c for c in self.KEY_COLUMNS if c in columns), columns[0] if columns else None)
+            if not filepath.endswith(".csv"):
                 df = self.load_csv(filename, category)
-                if df is not None:
-                    dataframes.append(df)
+                return df[df[key_column].astype(str).isin([str(k) for k in keys])]
             
-            if dataframes:
-                merged_df = pd.concat(dataframes, ignore_index=True)
-                return self.save_csv(merged_df, output_filename, category)
-            return False
+            index = self._get_index(filename, category, key_column)
+            if index is None or not index.is_current(filepath):
+                if not self.create_index(filename, key_column, category):
+                    return None
+                index = self._get_index(filename, category, key_column)
+            
+            offsets = [index.offsets[str(k)] for k in keys if str(k) in index.offsets]
+            with open(filepath, 'rb') as f:
+                header = next(SidecarIndex.iter_records(f), (0, b""))[1]
+                records = []
+                for offset in offsets:
+                    record = next(SidecarIndex.iter_records(f, offset), (offset, b""))[1]
+                    records.append(record if record.endswith(b"\n") else record + b"\n")
+            return pd.read_csv(io.BytesIO(header + b"".join(records)))
+        except Exception as e:
+            st.error(f"Error looking up rows: {str(e)}")
+            return None
+    
+    def get_row(self, filename: str, key: Any, category: str = "general",
+                key_column: Optional[str] = None) -> Optional[Dict]:
+        """Fetch a single row by primary key as a dict"""
+        rows = self.get_rows(filename, [key], category, key_column)
+        if rows is None or rows.empty:
+            return None
+        return rows.iloc[0].to_dict()
+    
+    @contextmanager
+    def append_batch(self):
+        """Collect appends and write each file once, with a single fsync, on exit"""
+        batch = AppendBatch(self)
+        yield batch
+        batch.flush()
+    
+    def migrate_storage(self, category: Optional[str] = None) -> int:
+        """Convert CSV files to the configured columnar format, returning the number converted"""
+        if self.storage_format == "csv":
+            return 0
+        categories = [category] if category else [d for d in os.listdir(self.data_dir) if os.path.isdir(f"{self.data_dir}/{d}")]
+        converted = 0
+        for cat in categories:
+            for filename in self.list_csv_files(cat):
+                paths = self._variant_paths(filename, cat)
+                before = DataFrameCache.file_signature(paths[self.storage_format])
+                try:
+                    self._resolve_read_path(filename, cat)
+                except Exception as e:
+                    st.error(f"Error converting {cat}/{filename}: {str(e)}")
+                    continue
+                if DataFrameCache.file_signature(paths[self.storage_format]) != before:
+                    converted += 1
+        return converted
+    
+    def merge_csv_files(self, filenames: List[str], output_filename: str, category: str = "general",
+                        sort_by: Optional[str] = None, chunksize: int = 100_000) -> bool:
+        """Merge multiple CSV files chunk by chunk, k-way merging on sort_by if inputs are sorted by it"""
+        try:
+            paths = [self._resolve_read_path(filename, category) for filename in filenames]
+            paths = [path for path in paths if path is not None]
+            if not paths:
+                return False
+            columns = list(dict.fromkeys(column for path in paths for column in self._read_columns(path)))
+            
+            if sort_by is None:
+                chunks = (chunk.reindex(columns=columns) for path in paths for chunk in self._iter_chunks(path, chunksize))
+            else:
+                if sort_by not in columns:
+                    st.error(f"Error merging CSV files: sort column '{sort_by}' not found")
+                    return False
+                chunks = self._sorted_merge_chunks(paths, columns, sort_by, chunksize)
+            
+            output_path = self._storage_path(output_filename, category)
+            tmp_path = f"{output_path}.tmp"
+            try:
+                schema = None
+                if not output_path.endswith(".csv"):
+                    schema = self._merge_schema(paths, columns, chunksize)
+                self._write_chunks(chunks, tmp_path, columns, schema, self._path_format(output_path))
+                with self._file_lock(output_path):
+                    os.replace(tmp_path, output_path)
+                    self.cache.invalidate(output_path)
+                    self._refresh_indexes(output_filename, category)
+                self.catalog.invalidate(category)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            return True
         except Exception as e:
             st.error(f"Error merging CSV files: {str(e)}")
             return False
     
-    def filter_csv_data(self, filename: str, filters: Dict, category: str = "general") -> Optional[pd.DataFrame]:
-        """Filter CSV data based on conditions"""
+    @staticmethod
+    def _merge_key(value: Any) -> Tuple:
+        # Numbers sort before strings and missing values sort last, so mixed columns never compare across types
+        if value is None or (isinstance(value, float) and math.isnan(value)):
+            return (2, 0)
+        if isinstance(value, numbers.Number):
+            return (0, value)
+        return (1, str(value))
+    
+    def _sorted_merge_chunks(self, paths: List[str], columns: List[str], sort_by: str, chunksize: int):
+        """K-way merge of inputs that are each sorted on sort_by, holding one chunk per input"""
+        position = columns.index(sort_by)
+        
+        def rows(path):
+            for chunk in self._iter_chunks(path, chunksize):
+                yield from chunk.reindex(columns=columns).itertuples(index=False, name=None)
+        
+        batch = []
+        for row in heapq.merge(*(rows(path) for path in paths), key=lambda row: self._merge_key(row[position])):
+            batch.append(row)
+            if len(batch) >= chunksize:
+                yield pd.DataFrame.from_records(batch, columns=columns)
+                batch = []
+        if batch:
+            yield pd.DataFrame.from_records(batch, columns=columns)
+    
+    def _write_chunks(self, chunks, filepath: str, columns: List[str], schema=None, storage_format: Optional[str] = None):
+        """Write a stream of chunks in the given storage format (the configured one by default)"""
+        if storage_format is None:
+            storage_format = self.storage_format
+        if storage_format == "csv":
+            with open(filepath, 'w', newline='', encoding='utf-8') as f:
+                header = True
+                for chunk in chunks:
+                    chunk.to_csv(f, index=False, header=header)
+                    header = False
+            if header:
+                self._write_file(pd.DataFrame(columns=columns), filepath, "csv")
+            return
+        
+        import pyarrow.ipc
+        import pyarrow.parquet
+        if storage_format == "parquet":
+            writer = pyarrow.parquet.ParquetWriter(filepath, schema)
+        else:
+            writer = pyarrow.ipc.new_file(filepath, schema)
+        with writer:
+            for chunk in chunks:
+                writer.write_table(self._chunk_to_table(chunk, schema))
+    
+    def _merge_schema(self, paths: List[str], columns: List[str], chunksize: int):
+        """Arrow schema wide enough for every input, so chunks can be streamed into one columnar file"""
+        types = {}
+        for path in paths:
+            if path.endswith(".csv"):
+                sample = next(self._iter_chunks(path, chunksize), pd.DataFrame())
+                schema = pyarrow.Table.from_pandas(sample, preserve_index=False).schema
+            elif path.endswith(".parquet"):
+                import pyarrow.parquet
+                schema = pyarrow.parquet.read_schema(path)
+            else:
+                import pyarrow.ipc
+                with pyarrow.ipc.open_file(path) as reader:
+                    schema = reader.schema
+            for field in schema:
+                if not pyarrow.types.is_null(field.type):
+                    types.setdefault(field.name, []).append(field.type)
+        
+        fields = []
+        for column in columns:
+            candidates = types.get(column) or [pyarrow.string()]
+            try:
+                unified = pyarrow.unify_schemas([pyarrow.schema([(column, t)]) for t in candidates],
+                                                promote_options="permissive")
+                fields.append(unified.field(column))
+            except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError):
+                fields.append(pyarrow.field(column, pyarrow.string()))
+        return pyarrow.schema(fields)
+    
+    @staticmethod
+    def _chunk_to_table(chunk: pd.DataFrame, schema):
+        arrays = []
+        for field in schema:
+            values = chunk[field.name]
+            if values.isna().all():
+                arrays.append(pyarrow.nulls(len(values), field.type))
+                continue
+            array = pyarrow.Array.from_pandas(values)
+            if array.type != field.type:
+                if pyarrow.types.is_string(field.type) or pyarrow.types.is_large_string(field.type):
+                    array = pyarrow.Array.from_pandas(values.astype("string"))
+                array = array.cast(field.type)
+            arrays.append(array)
+        return pyarrow.Table.from_arrays(arrays, schema=schema)
+    
+    def _iter_chunks(self, filepath: str, chunksize: int, columns: Optional[List[str]] = None):
+        """Yield a stored file as DataFrame chunks of roughly chunksize rows"""
+        if filepath.endswith(".csv"):
+            usecols = None
+            if columns is not None:
+                wanted = set(columns)
+                usecols = lambda column: column in wanted
+            with pd.read_csv(filepath, chunksize=chunksize, usecols=usecols) as reader:
+                for chunk in reader:
+                    yield chunk
+            return
+        if columns is not None:
+            available = set(self._read_columns(filepath))
+            columns = [column for column in columns if column in available]
+        # Row positions carry on across chunks, as they do for read_csv chunks
+        start = 0
+        if filepath.endswith(".parquet"):
+            import pyarrow.parquet
+            for batch in pyarrow.parquet.ParquetFile(filepath).iter_batches(batch_size=chunksize, columns=columns):
+                chunk = batch.to_pandas()
+                chunk.index = pd.RangeIndex(start, start + len(chunk))
+                start += len(chunk)
+                yield chunk
+            return
+        import pyarrow.ipc
+        with pyarrow.ipc.open_file(filepath) as reader:
+            for i in range(reader.num_record_batches):
+                batch = reader.get_batch(i)
+                if columns is not None:
+                    batch = batch.select(columns)
+                for offset in range(0, batch.num_rows, chunksize):
+                    chunk = batch.slice(offset, chunksize).to_pandas()
+                    chunk.index = pd.RangeIndex(start, start + len(chunk))
+                    start += len(chunk)
+                    yield chunk
+    
+    def _stream_schema(self, filepath: str, category: str, chunksize: int) -> Dict:
+        """Dtype hints and categories a compact load_csv gives the whole file, found in one projected pass
+        so every streamed chunk can be cast to the same dtypes"""
+        key = os.path.abspath(filepath)
+        signature = DataFrameCache.file_signature(filepath)
+        cached = self._stream_schemas.get(key)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        
+        hints = {**self.SCHEMA_HINTS.get(category, {}), **self.schema_hints.get(category, {})}
+        first = next(self._iter_chunks(filepath, chunksize), None)
+        candidates = [] if first is None else [
+            column for column in first.columns
+            if hints.get(column) == "category" or (column not in hints and (
+                pd.api.types.is_object_dtype(first[column]) or pd.api.types.is_string_dtype(first[column])))
+        ]
+        distinct = {column: set() for column in candidates}
+        rows = 0
+        if candidates:
+            for chunk in self._iter_chunks(filepath, chunksize, candidates):
+                rows += len(chunk)
+                for column in candidates:
+                    distinct[column].update(chunk[column].dropna().unique())
+        categories = {}
+        for column, values in distinct.items():
+            # Same rule as _compact_frame, applied to the whole file rather than one chunk
+            if hints.get(column) == "category" or (rows and len(values) <= self.CATEGORY_MAX_RATIO * rows):
+                try:
+                    categories[column] = sorted(values)
+                except TypeError:
+                    categories[column] = list(values)
+        schema = {"hints": hints, "categories": categories}
+        self._stream_schemas[key] = (signature, schema)
+        return schema
+    
+    def _compact_chunk(self, chunk: pd.DataFrame, schema: Dict) -> pd.DataFrame:
+        """Cast one streamed chunk to the whole-file compact dtypes from _stream_schema"""
+        chunk = chunk.copy(deep=False)
+        for column in chunk.columns:
+            hint = schema["hints"].get(column)
+            if column in schema["categories"]:
+                chunk[column] = chunk[column].astype(pd.CategoricalDtype(schema["categories"][column]))
+            elif hint is not None and hint.startswith("datetime"):
+                chunk[column] = pd.to_datetime(chunk[column], errors='coerce')
+            elif hint is not None:
+                chunk[column] = chunk[column].astype(hint)
+            elif pd.api.types.is_numeric_dtype(chunk[column]):
+                # Chunks that cannot shrink keep the wider dtype, which concat then applies to all of them
+                compacted = self._downcast(chunk[column])
+                if compacted is not None:
+                    chunk[column] = compacted
+        return chunk
+    
+    @staticmethod
+    def _filter_mask(df: pd.DataFrame, filters: Dict) -> pd.Series:
+        """Combine every filter condition into a single boolean mask"""
+        mask = pd.Series(True, index=df.index)
+        for column, condition in filters.items():
+            if column in df.columns and isinstance(condition, dict):
+                values = df[column]
+                if 'min' in condition:
+                    mask &= values >= condition['min']
+                if 'max' in condition:
+                    mask &= values <= condition['max']
+                if 'equals' in condition:
+                    mask &= values == condition['equals']
+                if 'contains' in condition:
+                    if not pd.api.types.is_string_dtype(values):
+                        values = values.astype("string")
+                    mask &= values.str.contains(condition['contains'], na=False).astype(bool)
+        return mask
+    
+    def iter_filtered_csv(self, filename: str, filters: Dict, category: str = "general",
+                          chunksize: int = 100_000, limit: Optional[int] = None,
+                          columns: Optional[List[str]] = None):
+        """Stream the rows matching filters chunk by chunk, stopping after limit rows; dtypes and row
+        index match load_csv's"""
         try:
-            df = self.load_csv(filename, category)
-            if df is None:
-                return None
-            
-            for column, condition in filters.items():
-                if column in df.columns:
-                    if isinstance(condition, dict):
-                        if 'min' in condition:
-                            df = df[df[column] >= condition['min']]
-                        if 'max' in condition:
-                            df = df[df[column] <= condition['max']]
-                        if 'equals' in condition:
-                            df = df[df[column] == condition['equals']]
-                        if 'contains' in condition:
-                            df = df[df[column].str.contains(condition['contains'], na=False)]
+            filepath = self._resolve_read_path(filename, category)
+            if filepath is None:
+                return
+            read_columns = None
+            if columns is not None:
+                read_columns = list(dict.fromkeys(list(columns) + list(filters)))
+            schema = self._stream_schema(filepath, category, chunksize) if self.compact_dtypes else None
+            remaining = limit
+            for chunk in self._iter_chunks(filepath, chunksize, read_columns):
+                if schema is not None:
+                    chunk = self._compact_chunk(chunk, schema)
+                matched = chunk[self._filter_mask(chunk, filters)]
+                if columns is not None:
+                    matched = matched[[column for column in columns if column in matched.columns]]
+                if remaining is not None:
+                    matched = matched.head(remaining)
+                    remaining -= len(matched)
+                yield matched
+                if remaining is not None and remaining <= 0:
+                    return
+        except Exception as e:
+            st.error(f"Error filtering CSV data: {str(e)}")
+    
+    def filter_csv_data(self, filename: str, filters: Dict, category: str = "general",
+                        chunksize: Optional[int] = None, limit: Optional[int] = None) -> Optional[pd.DataFrame]:
+        """Filter CSV data based on conditions, streaming in chunks when chunksize or limit is given"""
+        try:
+            if chunksize is None and limit is None:
+                df = self.load_csv(filename, category)
+                if df is None:
+                    return None
+                return df[self._filter_mask(df, filters)]
             
-            return df
+            filepath = self._resolve_read_path(filename, category)
+            if filepath is None:
+                return None
+            chunks = list(self.iter_filtered_csv(filename, filters, category, chunksize or 100_000, limit))
+            if not chunks:
+                return pd.DataFrame(columns=self._read_columns(filepath))
+            # Keep each row's position in the file as its index, like the in-memory path
+            return pd.concat(chunks)
         except Exception as e:
             st.error(f"Error filtering CSV data: {str(e)}")
             return None
 
+class AppendBatch:
+    """Buffers many small appends so each file receives one write and one fsync"""
+    
+    def __init__(self, csv_manager: CSVManager):
+        self.csv_manager = csv_manager
+        self.pending = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def append_rows(self, rows: Any, filename: str, category: str = "general"):
+        """Queue rows to be appended on the next flush"""
+        data = self.csv_manager._rows_to_frame(rows)
+        with self._lock:
+            self.pending.setdefault((filename, category), []).append(data)
+    
+    def flush(self) -> bool:
+        """Append all queued rows, one file at a time"""
+        with self._lock:
+            pending, self.pending = self.pending, OrderedDict()
+        success = True
+        for (filename, category), frames in pending.items():
+            data = pd.concat(frames, ignore_index=True)
+            success = self.csv_manager.append_rows(data, filename, category, fsync=True) and success
+        return success
+
+class CSVQueryEngine:
+    """Embedded, read-only SQLite query layer over the data/<category>/<file> layout"""
+    
+    # Everything a SELECT needs; writes, DDL, ATTACH and PRAGMA are only allowed while importing files
+    READ_ACTIONS = frozenset({sqlite3.SQLITE_SELECT, sqlite3.SQLITE_READ, sqlite3.SQLITE_FUNCTION,
+                              sqlite3.SQLITE_RECURSIVE})
+    
+    def __init__(self, csv_manager: CSVManager, database: str = ":memory:", chunksize: int = 50_000):
+        self.csv_manager = csv_manager
+        self.chunksize = chunksize
+        self.connection = sqlite3.connect(database, check_same_thread=False)
+        self.connection.set_authorizer(self._authorize)
+        self._synced = {}
+        self._syncing = False
+        self._lock = threading.RLock()
+    
+    def _authorize(self, action: int, *args) -> int:
+        if self._syncing or action in self.READ_ACTIONS:
+            return sqlite3.SQLITE_OK
+        return sqlite3.SQLITE_DENY
+    
+    @staticmethod
+    def table_name(filename: str, category: str) -> str:
+        """SQL table name for a file, e.g. clients/leads.csv -> clients_leads"""
+        stem = os.path.splitext(filename)[0]
+        return re.sub(r'\W', '_', f"{category}_{stem}")
+    
+    def list_tables(self) -> Dict[str, Tuple[str, str]]:
+        """Map every queryable table name to its (filename, category)"""
+        tables = {}
+        data_dir = self.csv_manager.data_dir
+        for category in sorted(os.listdir(data_dir)):
+            if category.startswith('.') or not os.path.isdir(f"{data_dir}/{category}"):
+                continue
+            for filename in self.csv_manager.list_csv_files(category):
+                tables[self.table_name(filename, category)] = (filename, category)
+        return tables
+    
+    def _sync_table(self, table: str, filename: str, category: str):
+        """(Re)import a file into SQLite in chunks if it changed since the last import"""
+        filepath = self.csv_manager._resolve_read_path(filename, category)
+        if filepath is None:
+            return
+        state = (filepath, DataFrameCache.file_signature(filepath))
+        if self._synced.get(table) == state:
+            return
+        
+        self._synced.pop(table, None)
+        self._syncing = True
+        try:
+            self.connection.execute(f'DROP TABLE IF EXISTS "{table}"')
+            columns = self.csv_manager._read_columns(filepath)
+            # The first chunk decides the column affinities, so numbers stay numeric in SQLite
+            created = False
+            for chunk in self.csv_manager._iter_chunks(filepath, self.chunksize):
+                chunk.to_sql(table, self.connection, if_exists='append', index=False)
+                created = True
+            if not created:
+                pd.DataFrame(columns=columns).to_sql(table, self.connection, index=False)
+            for column in columns:
+                if column in CSVManager.KEY_COLUMNS or column == 'email':
+                    self.connection.execute(f'CREATE INDEX "{table}__{column}" ON "{table}" ("{column}")')
+            self.connection.commit()
+        except Exception:
+            self.connection.rollback()
+            raise
+        finally:
+            self._syncing = False
+        self._synced[table] = state
+    
+    def _sync_referenced(self, sql: str):
+        tokens = set(re.findall(r'[A-Za-z_][A-Za-z0-9_]*', sql))
+        for table, (filename, category) in self.list_tables().items():
+            if table in tokens:
+                self._sync_table(table, filename, category)
+    
+    def _forget_missing(self):
+        """Drop sync state for tables that are no longer in SQLite so the next query re-imports them"""
+        existing = {row[0] for row in self.connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        for table in [table for table in self._synced if table not in existing]:
+            del self._synced[table]
+    
+    def iter_query(self, sql: str, params: Optional[Any] = None, chunksize: int = 10_000):
+        """Run read-only SQL against the data directory, yielding the result as DataFrame chunks"""
+        # Chunks are fetched under the lock and yielded after it is released, so a slow or
+        # abandoned consumer never blocks other queries or the re-import of changed files
+        with self._lock:
+            self._sync_referenced(sql)
+            try:
+                chunks = list(pd.read_sql_query(sql, self.connection, params=params, chunksize=chunksize))
+            except Exception:
+                self._forget_missing()
+                raise
+        yield from chunks
+    
+    def query(self, sql: str, params: Optional[Any] = None) -> Optional[pd.DataFrame]:
+        """Run read-only SQL against the data directory and return the full result"""
+        try:
+            with self._lock:
+                self._sync_referenced(sql)
+                return pd.read_sql_query(sql, self.connection, params=params)
+        except Exception as e:
+            with self._lock:
+                self._forget_missing()
+            st.error(f"Error running query: {str(e)}")
+            return None
+
+class LogRollup:
+    """Per-(day, workflow) aggregates of an automation log, advanced incrementally from the last byte offset read"""
+    
+    COLUMNS = ["executions", "successes", "duration_sum", "duration_count", "records_sum"]
+    RECENT_COLUMNS = ["workflow_name", "execution_time", "status", "records_processed", "execution_duration"]
+    BLOCK_BYTES = 8 * 1024 * 1024
+    FINGERPRINT_BYTES = 4096
+    
+    def __init__(self, csv_manager: "CSVManager", filename: str = "automation_logs.csv",
+                 category: str = "automations", recent_limit: int = 10):
+        self.csv_manager = csv_manager
+        self.filename = filename
+        self.category = category
+        self.recent_limit = recent_limit
+        stem = csv_manager._logical_name(filename)[:-len(".csv")]
+        self.rollup_path = f"{csv_manager.data_dir}/{category}/.rollups/{stem}.json"
+        self._lock = threading.Lock()
+        self._reset()
+        self._load()
+    
+    def _reset(self):
+        self.table = pd.DataFrame(columns=self.COLUMNS, index=pd.MultiIndex.from_tuples([], names=["day", "workflow_name"]),
+                                  dtype="float64")
+        self.recent_rows = pd.DataFrame(columns=self.RECENT_COLUMNS)
+        self.source = None
+        self.offset = 0
+        self.signature = None
+        self.fingerprint = None
+    
+    def _load(self):
+        if not os.path.exists(self.rollup_path):
+            return
+        try:
+            with open(self.rollup_path) as f:
+                state = json.load(f)
+            rows = pd.DataFrame(state["rows"], columns=["day", "workflow_name"] + self.COLUMNS)
+            self.table = rows.set_index(["day", "workflow_name"]).astype("float64")
+            self.recent_rows = pd.DataFrame(state["recent"], columns=self.RECENT_COLUMNS)
+            self.source = state["source"]
+            self.offset = state["offset"]
+            self.signature = tuple(state["signature"]) if state["signature"] else None
+            self.fingerprint = state["fingerprint"]
+        except (OSError, ValueError, KeyError):
+            self._reset()
+    
+    def _save(self):
+        os.makedirs(os.path.dirname(self.rollup_path), exist_ok=True)
+        state = {
+            "source": self.source,
+            "offset": self.offset,
+            "signature": list(self.signature) if self.signature else None,
+            "fingerprint": self.fingerprint,
+            "rows": self.table.reset_index().to_dict("records"),
+            "recent": self.recent_rows.to_dict("records")
+        }
+        tmp_path = f"{self.rollup_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f, default=JSONSerializer.default)
+        os.replace(tmp_path, self.rollup_path)
+    
+    def _fingerprint(self, filepath: str, offset: int) -> str:
+        """Hash of the file's head and of the bytes just before offset, to tell an append from a rewrite"""
+        digest = hashlib.sha256()
+        with open(filepath, "rb") as f:
+            digest.update(f.read(min(offset, self.FINGERPRINT_BYTES)))
+            f.seek(max(0, offset - 256))
+            digest.update(f.read(min(offset, 256)))
+        return digest.hexdigest()
+    
+    def _aggregate(self, logs: pd.DataFrame):
+        """Fold a frame of raw log rows into the rollup table and the recent-activity window"""
+        if logs.empty:
+            return
+        logs = logs.reindex(columns=self.RECENT_COLUMNS)
+        days = pd.to_datetime(logs["execution_time"], errors="coerce").dt.strftime("%Y-%m-%d")
+        durations = pd.to_numeric(logs["execution_duration"], errors="coerce")
+        parts = pd.DataFrame({
+            "day": days.fillna("unknown"),
+            "workflow_name": logs["workflow_name"].astype(str),
+            "executions": 1.0,
+            "successes": (logs["status"] == "success").astype("float64"),
+            "duration_sum": durations.fillna(0.0),
+            "duration_count": durations.notna().astype("float64"),
+            "records_sum": pd.to_numeric(logs["records_processed"], errors="coerce").fillna(0.0)
+        })
+        # Integer record counts would otherwise leave a fresh table int64 while a reloaded one is float64
+        totals = parts.groupby(["day", "workflow_name"]).sum().astype("float64")
+        self.table = totals if self.table.empty else self.table.add(totals, fill_value=0.0)
+        recent = logs if self.recent_rows.empty else pd.concat([self.recent_rows, logs], ignore_index=True)
+        self.recent_rows = recent.sort_values("execution_time", ascending=False, kind="stable").head(self.recent_limit)
+    
+    def _consume(self, filepath: str, start: int, end: int, header: bytes) -> int:
+        """Aggregate the whole records in [start, end) block by block; returns the offset after the last one"""
+        consumed = start
+        pending = b""
+        with open(filepath, "rb") as f:
+            f.seek(start)
+            remaining = end - start
+            while remaining > 0:
+                chunk = f.read(min(self.BLOCK_BYTES, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                block = pending + chunk
+                cut = block.rfind(b"\n") + 1
+                # Never split inside a quoted field that contains a newline
+                while cut > 0 and block.count(b'"', 0, cut) % 2:
+                    cut = block.rfind(b"\n", 0, cut - 1) + 1
+                if cut:
+                    self._aggregate(pd.read_csv(io.BytesIO(header + block[:cut]), dtype={"execution_time": str}))
+                    consumed += cut
+                pending = block[cut:]
+        return consumed
+    
+    def rebuild(self):
+        """Recompute every aggregate from the full log"""
+        with self._lock:
+            self._rebuild()
+    
+    def _rebuild(self):
+        self._reset()
+        filepath = self.csv_manager._resolve_read_path(self.filename, self.category)
+        if filepath is not None:
+            self._read_from(filepath, 0)
+        self._save()
+    
+    def _read_from(self, filepath: str, offset: int):
+        signature = DataFrameCache.file_signature(filepath)
+        if filepath.endswith(".csv"):
+            with open(filepath, "rb") as f:
+                header = f.readline()
+            start = max(offset, len(header))
+            self.offset = self._consume(filepath, start, signature[1], header)
+            self.fingerprint = self._fingerprint(filepath, self.offset)
+        else:
+            # Columnar files are rewritten on every change, so they are always read in full
+            self._aggregate(self.csv_manager.load_csv(self.filename, self.category, columns=self.RECENT_COLUMNS))
+            self.offset = signature[1]
+        self.source = filepath
+        self.signature = signature
+    
+    def refresh(self) -> bool:
+        """Fold in rows appended since the last refresh, rebuilding if the file shrank or was rewritten"""
+        with self._lock:
+            filepath = self.csv_manager._resolve_read_path(self.filename, self.category)
+            signature = DataFrameCache.file_signature(filepath) if filepath is not None else None
+            if filepath == self.source and signature == self.signature:
+                return False
+            appended = (
+                filepath is not None and filepath == self.source and filepath.endswith(".csv")
+                and signature[1] >= self.offset and self.fingerprint == self._fingerprint(filepath, self.offset)
+            )
+            if appended:
+                self._read_from(filepath, self.offset)
+                self._save()
+            else:
+                self._rebuild()
+            return True
+    
+    def frame(self) -> pd.DataFrame:
+        """The rollup table: one row per (day, workflow_name)"""
+        self.refresh()
+        with self._lock:
+            return self.table.reset_index()
+    
+    def daily_executions(self) -> pd.DataFrame:
+        """Executions per day and workflow"""
+        data = self.frame()
+        return data[["day", "workflow_name", "executions"]].astype({"executions": "int64"})
+    
+    def workflow_summary(self) -> pd.DataFrame:
+        """Executions, success rate, average duration and total records per workflow"""
+        totals = self.frame().groupby("workflow_name")[self.COLUMNS].sum()
+        return pd.DataFrame({
+            "executions": totals["executions"].astype("int64"),
+            "success_rate": totals["successes"] / totals["executions"] * 100,
+            "avg_duration": totals["duration_sum"] / totals["duration_count"].where(totals["duration_count"] > 0),
+            "total_records": totals["records_sum"]
+        }).reset_index()
+    
+    def recent(self) -> pd.DataFrame:
+        """The most recent log rows by execution_time"""
+        self.refresh()
+        with self._lock:
+            return self.recent_rows.copy()
+
 class AutomationWorkflows:
     """Pre-built automation workflows for cleaning businesses"""
     
@@ -414,47 +2875,1132 @@ class AutomationWorkflows:
                 }
             ]
         }
+    
+    @staticmethod
+    def _column(data: pd.DataFrame, column: str) -> pd.Series:
+        """A column of data, or an all-missing one when the file does not have it"""
+        if column in data.columns:
+            return data[column]
+        return pd.Series(pd.NA, index=data.index, dtype="object")
+    
+    @staticmethod
+    def _invoice_numbers(client_ids: pd.Series) -> pd.Series:
+        return f"INV-{int(time.time() * 1000)}-" + client_ids.astype(str)
+    
+    @staticmethod
+    def generate_invoices(contracts: pd.DataFrame, parameters: Dict) -> pd.DataFrame:
+        """Vectorized Generate Invoices: one invoice per active monthly contract, due on the 30th"""
+        column = AutomationWorkflows._column
+        # clients.csv has monthly_amount but no billing_cycle; treat a missing cycle as monthly
+        cycle = column(contracts, "billing_cycle").fillna("monthly")
+        active = contracts[(cycle == "monthly") & (column(contracts, "status") == "active")]
+        now = pd.Timestamp.now()
+        due = now.replace(day=min(30, now.days_in_month))
+        return pd.DataFrame({
+            "client_id": active["client_id"],
+            "amount": column(active, "monthly_amount"),
+            "due_date": due.isoformat(),
+            "invoice_number": AutomationWorkflows._invoice_numbers(active["client_id"]),
+            "created_at": now.isoformat()
+        }).reset_index(drop=True)
+    
+    @staticmethod
+    def generate_invoice_data(contracts: pd.DataFrame, parameters: Dict) -> pd.DataFrame:
+        """Vectorized Generate Invoice Data: one invoice per active contract, due in 30 days"""
+        active = contracts[AutomationWorkflows._column(contracts, "status") == "active"]
+        now = pd.Timestamp.now()
+        return pd.DataFrame({
+            "client_id": active["client_id"],
+            "amount": AutomationWorkflows._column(active, "monthly_amount"),
+            "invoice_number": AutomationWorkflows._invoice_numbers(active["client_id"]),
+            "due_date": (now + pd.Timedelta(days=30)).isoformat(),
+            "created_at": now.isoformat()
+        }).reset_index(drop=True)
+    
+    @staticmethod
+    def appointments_on(appointments: pd.DataFrame, day: pd.Timestamp) -> pd.DataFrame:
+        """Appointments whose date falls on the given day"""
+        dates = pd.to_datetime(AutomationWorkflows._column(appointments, "date"), errors="coerce")
+        return appointments[dates.dt.normalize() == day.normalize()]
+    
+    @staticmethod
+    def send_reminders(appointments: pd.DataFrame, parameters: Dict) -> pd.DataFrame:
+        """Vectorized Send Reminders: tomorrow's appointments reduced to the reminder fields"""
+        due = AutomationWorkflows.appointments_on(appointments, pd.Timestamp.now() + pd.Timedelta(days=1))
+        column = AutomationWorkflows._column
+        return pd.DataFrame({
+            "client_email": column(due, "client_email"),
+            "appointment_time": column(due, "time"),
+            "service_type": column(due, "service_type")
+        }).reset_index(drop=True)
+    
+    @staticmethod
+    def filter_todays_appointments(appointments: pd.DataFrame, parameters: Dict) -> pd.DataFrame:
+        """Vectorized Filter Today's Appointments"""
+        return AutomationWorkflows.appointments_on(appointments, pd.Timestamp.now()).reset_index(drop=True)
+    
+    @staticmethod
+    def filter_recent_completions(services: pd.DataFrame, parameters: Dict) -> pd.DataFrame:
+        """Vectorized Filter Recent Completions: finished in the last three days with no follow-up sent"""
+        column = AutomationWorkflows._column
+        completed = pd.to_datetime(column(services, "completed_date"), errors="coerce")
+        sent = column(services, "follow_up_sent").fillna(False).astype(str).str.lower().isin(["true", "1", "yes"])
+        recent = completed >= pd.Timestamp.now() - pd.Timedelta(days=3)
+        return services[recent & ~sent].reset_index(drop=True)
+    
+    @staticmethod
+    def frame_functions() -> Dict[str, Callable[[pd.DataFrame, Dict], pd.DataFrame]]:
+        """DataFrame equivalents of the built-in and sample function nodes, keyed by node name"""
+        return {
+            "Generate Invoices": AutomationWorkflows.generate_invoices,
+            "Generate Invoice Data": AutomationWorkflows.generate_invoice_data,
+            "Send Reminders": AutomationWorkflows.send_reminders,
+            "Filter Today's Appointments": AutomationWorkflows.filter_todays_appointments,
+            "Filter Recent Completions": AutomationWorkflows.filter_recent_completions
+        }
 
-def initialize_sample_data():
-    """Initialize sample CSV data for the system"""
-    csv_manager = CSVManager()
-    
-    # Sample client data
-    clients_data = pd.DataFrame({
-        'client_id': ['C001', 'C002', 'C003', 'C004', 'C005'],
-        'name': ['ABC Office Complex', 'Downtown Restaurant', 'Medical Center', 'Retail Store', 'Manufacturing Plant'],
-        'email': ['contact@abcoffice.com', 'manager@downtown.com', 'admin@medcenter.com', 'info@retailstore.com', 'ops@manufacturing.com'],
-        'phone': ['555-0101', '555-0102', '555-0103', '555-0104', '555-0105'],
-        'service_type': ['Commercial', 'Restaurant', 'Healthcare', 'Retail', 'Industrial'],
-        'monthly_amount': [3500, 2200, 4800, 6200, 8500],
-        'status': ['active', 'active', 'active', 'renewal', 'active'],
-        'created_at': pd.date_range('2024-01-01', periods=5, freq='M')
-    })
-    csv_manager.save_csv(clients_data, 'clients.csv', 'clients')
-    
-    # Sample leads data
-    leads_data = pd.DataFrame({
-        'lead_id': ['L001', 'L002', 'L003', 'L004', 'L005'],
-        'name': ['John Smith', 'Sarah Johnson', 'Mike Wilson', 'Lisa Brown', 'David Lee'],
-        'email': ['john@email.com', 'sarah@email.com', 'mike@email.com', 'lisa@email.com', 'david@email.com'],
-        'phone': ['555-1001', '555-1002', '555-1003', '555-1004', '555-1005'],
-        'service_type': ['Residential', 'Commercial', 'Deep Cleaning', 'Carpet Cleaning', 'Window Cleaning'],
-        'lead_source': ['Website', 'Referral', 'Google Ads', 'Social Media', 'Cold Call'],
-        'status': ['new', 'contacted', 'quoted', 'converted', 'lost'],
-        'created_at': pd.date_range('2024-12-01', periods=5, freq='D')
-    })
-    csv_manager.save_csv(leads_data, 'leads.csv', 'clients')
-    
-    # Sample automation logs
-    automation_logs = pd.DataFrame({
-        'log_id': range(1, 11),
-        'workflow_name': ['Lead Generation Bot'] * 3 + ['Appointment Scheduler'] * 3 + ['Follow-up Assistant'] * 2 + ['Invoice Generator'] * 2,
-        'execution_time': pd.date_range('2024-12-01', periods=10, freq='H'),
-        'status': ['success'] * 8 + ['failed', 'success'],
-        'records_processed': [5, 3, 7, 12, 8, 15, 6, 4, 0, 25],
-        'execution_duration': [2.5, 1.8, 3.2, 4.1, 2.9, 5.5, 1.2, 0.8, 0.0, 8.7]
-    })
-    csv_manager.save_csv(automation_logs, 'automation_logs.csv', 'automations')
+class WorkflowDeployer:
+    """Idempotent bulk deployment that only creates or updates workflows whose definition changed"""
+    
+    NODE_TYPE_ALIASES = {"email": "emailSend", "conditional": "if", "condition": "if"}
+    
+    def __init__(self, agent: N8NAgent, max_workers: int = 8, registry: Optional["WorkflowRegistry"] = None):
+        self.agent = agent
+        self.max_workers = max_workers
+        self.registry = registry
+    
+    @staticmethod
+    def definition_hash(workflow: Dict) -> str:
+        """Content hash over the parts of a workflow n8n round-trips (name, node types/parameters, connections)"""
+        canonical = {
+            "name": workflow.get("name"),
+            "nodes": [
+                {"name": node.get("name"), "type": node.get("type"), "parameters": node.get("parameters", {})}
+                for node in workflow.get("nodes", [])
+            ],
+            "connections": workflow.get("connections", {})
+        }
+        encoded = json.dumps(canonical, sort_keys=True, separators=(",", ":"), default=JSONSerializer.default)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+    
+    @staticmethod
+    def local_definitions(data_dir: str = "data") -> Dict[str, Dict]:
+        """Every valid built-in and sample workflow definition as a mutable dict, keyed by workflow name"""
+        return {name: definition.to_dict() for name, definition in WorkflowRegistry(data_dir).all().items()}
+    
+    def remote_workflows(self) -> List[Dict]:
+        """Workflows currently on the n8n instance; raises if any page of the listing fails"""
+        return list(self.agent.iter_workflows())
+    
+    @staticmethod
+    def deploy_payload(workflow: Mapping) -> Dict:
+        """The body n8n's public API accepts: qualified node types, positions, connections and settings only"""
+        nodes = []
+        for index, node in enumerate(workflow.get("nodes", [])):
+            node_type = node.get("type", "")
+            if "." not in node_type:
+                node_type = "n8n-nodes-base." + WorkflowDeployer.NODE_TYPE_ALIASES.get(node_type, node_type)
+            payload = {
+                "name": node["name"],
+                "type": node_type,
+                "typeVersion": node.get("typeVersion", 1),
+                "position": list(node.get("position", (250 + 200 * index, 300))),
+                "parameters": thaw(node.get("parameters", {}))
+            }
+            if "id" in node:
+                payload["id"] = node["id"]
+            nodes.append(payload)
+        connections = thaw(workflow.get("connections") or {})
+        if not connections:
+            # Definitions without connections run top to bottom, so chain the nodes in list order
+            for source, target in zip(nodes, nodes[1:]):
+                connections[source["name"]] = {"main": [[{"node": target["name"], "type": "main", "index": 0}]]}
+        return {
+            "name": workflow["name"],
+            "nodes": nodes,
+            "connections": connections,
+            "settings": thaw(workflow.get("settings") or {"executionOrder": "v1"})
+        }
+    
+    def plan(self, definitions: Dict[str, Mapping], remote: List[Dict]) -> Dict[str, List]:
+        """Split definitions into creates, updates and unchanged by comparing content hashes of their deploy payloads"""
+        remote_by_name = {}
+        for workflow in remote:
+            remote_by_name.setdefault(workflow.get("name"), workflow)
+        plan = {"create": [], "update": [], "unchanged": []}
+        for name, definition in definitions.items():
+            workflow = self.deploy_payload(definition)
+            existing = remote_by_name.get(name)
+            if existing is None:
+                plan["create"].append(workflow)
+            elif self.definition_hash(existing) != self.definition_hash(workflow):
+                plan["update"].append((existing["id"], workflow))
+            else:
+                plan["unchanged"].append(name)
+        return plan
+    
+    def deploy_all(self, definitions: Optional[Dict[str, Mapping]] = None) -> Dict:
+        """Create or update every changed workflow in one round of concurrent requests"""
+        if definitions is None:
+            definitions = self.registry.all() if self.registry is not None else self.local_definitions()
+        try:
+            remote = self.remote_workflows()
+        except Exception as e:
+            # Planning against a partial listing would create duplicates of every workflow it missed
+            return {"success": False, "error": f"Could not list workflows on the n8n instance: {str(e)}"}
+        plan = self.plan(definitions, remote)
+        
+        jobs = [(workflow["name"], "created", self.agent.create_workflow, (workflow,)) for workflow in plan["create"]]
+        jobs += [(workflow["name"], "updated", self.agent.update_workflow, (workflow_id, workflow))
+                 for workflow_id, workflow in plan["update"]]
+        results = {name: {"action": "unchanged", "success": True} for name in plan["unchanged"]}
+        if jobs:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(jobs))) as executor:
+                futures = {executor.submit(call, *args): (name, action) for name, action, call, args in jobs}
+                for future, (name, action) in futures.items():
+                    result = future.result()
+                    results[name] = {"action": action, "success": result["success"], "error": result.get("error")}
+        return {"success": all(r["success"] for r in results.values()), "results": results}
+
+class CompiledWorkflow:
+    """A workflow definition resolved into a DAG: nodes by name, child edges per output and a topological order"""
+    
+    def __init__(self, name: str, nodes: Dict[str, Dict], kinds: Dict[str, str],
+                 edges: Dict[str, List[Tuple[int, str]]], order: List[str]):
+        self.name = name
+        self.nodes = nodes
+        self.kinds = kinds
+        self.edges = edges
+        self.order = order
+        self.parents = {node: [] for node in nodes}
+        for parent, children in edges.items():
+            for _, child in children:
+                self.parents[child].append(parent)
+        self.roots = [node for node in order if not self.parents[node]]
+        self.leaves = [node for node in order if not edges[node]]
+        self.conditions = {}
+
+class WorkflowEngine:
+    """Runs workflow definitions in-process as DAGs, executing independent branches on a thread pool"""
+    
+    NODE_KINDS = {
+        "webhook": "trigger", "cron": "trigger", "scheduletrigger": "trigger", "manualtrigger": "trigger",
+        "function": "function", "code": "function",
+        "csv": "csv", "spreadsheetfile": "csv",
+        "email": "email", "emailsend": "email",
+        "httprequest": "http",
+        "conditional": "condition", "condition": "condition", "if": "condition"
+    }
+    CONDITION_PATTERN = re.compile(r"^\s*([\w.]+)\s*(===|!==|==|!=|>=|<=|>|<)\s*(.+?)\s*$")
+    CONDITION_OPERATORS = {
+        "===": operator.eq, "==": operator.eq, "!==": operator.ne, "!=": operator.ne,
+        ">": operator.gt, "<": operator.lt, ">=": operator.ge, "<=": operator.le
+    }
+    
+    def __init__(self, csv_manager: Optional["CSVManager"] = None, max_workers: int = 8,
+                 email_sender: Optional[Callable[[Dict, Dict], Any]] = None,
+                 http_client: Optional[Callable[[Dict, Dict], Any]] = None,
+                 default_category: str = "clients"):
+        self.csv_manager = csv_manager if csv_manager is not None else CSVManager()
+        self.email_sender = email_sender if email_sender is not None else self.record_email
+        self.http_client = http_client if http_client is not None else self.record_http
+        self.default_category = default_category
+        self.sent_emails = deque(maxlen=1000)
+        self.http_requests = deque(maxlen=1000)
+        self._functions = {}
+        self._frame_functions = {}
+        # Built-in vectorized nodes; only used when no handler of either kind was registered for the node
+        self._default_frame_functions = AutomationWorkflows.frame_functions()
+        self._compiled = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="workflow-engine")
+    
+    def record_email(self, parameters: Dict, data: Dict) -> Dict:
+        """Default email stand-in: keep the message in sent_emails instead of sending it"""
+        message = {"to": parameters.get("to", data.get("email")), "subject": parameters.get("subject"),
+                   "template": parameters.get("template"), "data": data}
+        self.sent_emails.append(message)
+        return message
+    
+    def record_http(self, parameters: Dict, data: Dict) -> Dict:
+        """Default HTTP stand-in: keep the request in http_requests and echo the item back"""
+        request = {"method": parameters.get("method", "GET"), "url": parameters.get("url"), "data": data}
+        self.http_requests.append(request)
+        return data
+    
+    def register_function(self, node_name: str, handler: Callable[[List[Dict], Dict], List[Any]],
+                          workflow_name: Optional[str] = None):
+        """Run handler(items, parameters) in place of a node's JavaScript; condition handlers return (true_items, false_items)"""
+        self._functions[(workflow_name, node_name)] = handler
+    
+    def register_frame_function(self, node_name: str, handler: Callable[[pd.DataFrame, Dict], pd.DataFrame],
+                                workflow_name: Optional[str] = None):
+        """Run handler(frame, parameters) on the whole batch in place of a function node's JavaScript"""
+        self._frame_functions[(workflow_name, node_name)] = handler
+    
+    def _function_for(self, workflow_name: str, node_name: str) -> Optional[Callable]:
+        return self._functions.get((workflow_name, node_name)) or self._functions.get((None, node_name))
+    
+    def _frame_function_for(self, workflow_name: str, node_name: str) -> Optional[Callable]:
+        return self._frame_functions.get((workflow_name, node_name)) or self._frame_functions.get((None, node_name))
+    
+    def compile(self, workflow: Any) -> CompiledWorkflow:
+        """Build the DAG for a definition (dict or registry WorkflowDefinition), cached by content hash"""
+        if isinstance(workflow, WorkflowDefinition):
+            key, workflow = workflow.content_hash, workflow.definition
+        else:
+            key = WorkflowDeployer.definition_hash(workflow)
+        with self._lock:
+            compiled = self._compiled.get(key)
+        if compiled is not None:
+            return compiled
+        
+        compiled = self.build_graph(workflow)
+        for name, kind in compiled.kinds.items():
+            if kind == "condition" and self._function_for(compiled.name, name) is None:
+                compiled.conditions[name] = self._compile_condition(compiled.nodes[name].get("parameters", {}).get("condition", ""))
+        with self._lock:
+            self._compiled[key] = compiled
+        return compiled
+    
+    @classmethod
+    def build_graph(cls, workflow: Mapping) -> CompiledWorkflow:
+        """Resolve nodes and edges into a DAG; nodes without connections run as a linear chain"""
+        nodes, kinds = {}, {}
+        for node in workflow.get("nodes", []):
+            name = node["name"]
+            if name in nodes:
+                raise ValueError(f"Duplicate node name: {name}")
+            kind = cls.NODE_KINDS.get(node.get("type", "").rsplit(".", 1)[-1].lower())
+            if kind is None:
+                raise ValueError(f"Unsupported node type {node.get('type')} in {name}")
+            nodes[name] = node
+            kinds[name] = kind
+        
+        edges = {name: [] for name in nodes}
+        connections = workflow.get("connections")
+        if connections:
+            for source, outputs in connections.items():
+                for index, targets in enumerate(outputs.get("main", [])):
+                    for target in targets or []:
+                        if source not in nodes or target["node"] not in nodes:
+                            raise ValueError(f"Connection {source} -> {target['node']} references an unknown node")
+                        edges[source].append((index, target["node"]))
+        else:
+            names = list(nodes)
+            for source, target in zip(names, names[1:]):
+                edges[source].append((0, target))
+        
+        in_degree = {name: 0 for name in nodes}
+        for children in edges.values():
+            for _, child in children:
+                in_degree[child] += 1
+        ready = deque(name for name in nodes if in_degree[name] == 0)
+        order = []
+        while ready:
+            name = ready.popleft()
+            order.append(name)
+            for _, child in edges[name]:
+                in_degree[child] -= 1
+                if in_degree[child] == 0:
+                    ready.append(child)
+        if len(order) != len(nodes):
+            raise ValueError(f"Workflow {workflow.get('name')} contains a cycle")
+        return CompiledWorkflow(workflow.get("name", ""), nodes, kinds, edges, order)
+    
+    @classmethod
+    def _compile_condition(cls, expression: str) -> Tuple[List[str], str, Any]:
+        """Parse a simple `field op literal` expression into (field path, operator, value)"""
+        match = cls.CONDITION_PATTERN.match(expression or "")
+        if match is None:
+            raise ValueError(f"Unsupported condition: {expression!r}")
+        field, op, literal = match.groups()
+        if literal[:1] in ("'", '"') and literal[-1:] == literal[:1]:
+            value = literal[1:-1]
+        elif literal in ("true", "false", "null"):
+            value = {"true": True, "false": False, "null": None}[literal]
+        else:
+            try:
+                value = float(literal) if any(c in literal for c in ".eE") else int(literal)
+            except ValueError:
+                raise ValueError(f"Unsupported condition value: {literal!r}")
+        return field.split("."), op, value
+    
+    @classmethod
+    def _matches(cls, condition: Tuple[List[str], str, Any], data: Dict) -> bool:
+        path, op, value = condition
+        for part in path:
+            data = data.get(part) if isinstance(data, dict) else None
+        if data is None and op in (">", "<", ">=", "<="):
+            return False
+        try:
+            return bool(cls.CONDITION_OPERATORS[op](data, value))
+        except TypeError:
+            return False
+    
+    @classmethod
+    def _mask(cls, condition: Tuple[List[str], str, Any], data: pd.DataFrame) -> pd.Series:
+        """Vectorized form of _matches over a whole frame"""
+        path, op, value = condition
+        if len(path) > 1:
+            return pd.Series([cls._matches(condition, row) for row in data.to_dict("records")],
+                             index=data.index, dtype=bool)
+        column = AutomationWorkflows._column(data, path[0])
+        if value is None:
+            if op in ("===", "=="):
+                return column.isna()
+            if op in ("!==", "!="):
+                return column.notna()
+            return pd.Series(False, index=data.index)
+        try:
+            return cls.CONDITION_OPERATORS[op](column, value).fillna(False).astype(bool)
+        except TypeError:
+            return pd.Series(False, index=data.index)
+    
+    def _csv_target(self, parameters: Dict) -> Tuple[str, str]:
+        """Resolve a node's file/fileName parameter to a (filename, category) pair"""
+        parts = os.path.normpath(parameters.get("file") or parameters.get("fileName", "")).split(os.sep)
+        filename = parts[-1]
+        if parameters.get("category"):
+            return filename, parameters["category"]
+        if len(parts) >= 2:
+            return filename, parts[-2]
+        data_dir = self.csv_manager.data_dir
+        if os.path.isdir(data_dir):
+            for category in sorted(os.listdir(data_dir)):
+                if os.path.isdir(os.path.join(data_dir, category)) and self.csv_manager._resolve_read_path(filename, category):
+                    return filename, category
+        return filename, self.default_category
+    
+    @staticmethod
+    def _wrap(items: List[Any]) -> List[Dict]:
+        return [item if isinstance(item, dict) and isinstance(item.get("json"), dict) else {"json": item}
+                for item in items]
+    
+    @staticmethod
+    def _as_items(data: Any) -> List[Dict]:
+        """Materialize a batch as n8n items; item lists pass through"""
+        if isinstance(data, pd.DataFrame):
+            return [{"json": row} for row in data.to_dict("records")]
+        return data
+    
+    @staticmethod
+    def _as_frame(data: Any) -> pd.DataFrame:
+        """Columnar view of items; frames pass through"""
+        if isinstance(data, pd.DataFrame):
+            return data
+        return pd.DataFrame([item["json"] for item in data])
+    
+    @staticmethod
+    def _combine(parts: List[Any]) -> Any:
+        """Concatenate the outputs feeding one node, staying columnar when every part is a frame"""
+        if len(parts) == 1:
+            return parts[0]
+        if all(isinstance(part, pd.DataFrame) for part in parts):
+            return pd.concat(parts, ignore_index=True)
+        return [item for part in parts for item in WorkflowEngine._as_items(part)]
+    
+    def _run_node(self, compiled: CompiledWorkflow, name: str, data: Any, dry_run: bool, batch: bool) -> List[Any]:
+        """Execute one node and return its outputs, each an item list or (in batch mode) a DataFrame"""
+        node = compiled.nodes[name]
+        kind = compiled.kinds[name]
+        parameters = node.get("parameters", {})
+        handler = self._function_for(compiled.name, name)
+        
+        if kind == "trigger":
+            if len(data):
+                return [data]
+            return [[{"json": {"timestamp": datetime.now().isoformat()}}]]
+        
+        if kind == "function":
+            frame_handler = self._frame_function_for(compiled.name, name)
+            if frame_handler is None and handler is None:
+                frame_handler = self._default_frame_functions.get(name)
+            if frame_handler is not None and (batch or handler is None):
+                result = frame_handler(self._as_frame(data), parameters)
+                return [result if batch else self._as_items(result)]
+            if handler is None:
+                # No Python handler for this node's JavaScript: pass items through unchanged
+                return [data]
+            return [self._wrap(handler(self._as_items(data), parameters))]
+        
+        if kind == "condition":
+            if handler is not None:
+                return [self._wrap(output) for output in handler(self._as_items(data), parameters)]
+            condition = compiled.conditions[name]
+            if isinstance(data, pd.DataFrame):
+                mask = self._mask(condition, data)
+                return [data[mask].reset_index(drop=True), data[~mask].reset_index(drop=True)]
+            passed, failed = [], []
+            for item in data:
+                (passed if self._matches(condition, item["json"]) else failed).append(item)
+            return [passed, failed]
+        
+        if kind == "csv":
+            filename, category = self._csv_target(parameters)
+            if parameters.get("operation", "read") == "read":
+                frame = self.csv_manager.load_csv(filename, category)
+                if frame is None:
+                    return [[]]
+                return [frame if batch else self._as_items(frame)]
+            # "write" and "append" both add the incoming items as rows; rewriting a whole
+            # file from one execution's items is never what these workflows mean
+            if not dry_run and len(data):
+                rows = data if isinstance(data, pd.DataFrame) else [item["json"] for item in data]
+                if not self.csv_manager.append_rows(rows, filename, category):
+                    raise RuntimeError(f"Could not write {filename}")
+            return [data]
+        
+        # Email and HTTP nodes act per item, so batches are materialized here
+        items = self._as_items(data)
+        if kind == "email":
+            for item in items:
+                self.email_sender(parameters, item["json"])
+            return [items]
+        
+        if kind == "http":
+            return [[{"json": self.http_client(parameters, item["json"])} for item in items]]
+        
+        raise ValueError(f"Unsupported node kind: {kind}")
+    
+    def run(self, workflow: Mapping, items: Optional[List[Any]] = None, dry_run: bool = False, batch: bool = False) -> Dict:
+        """Execute a workflow with the given trigger payloads; dry_run skips csv writes"""
+        # In batch mode csv, function and condition nodes pass whole DataFrames; rows are only
+        # materialized for per-item nodes (email, HTTP, item handlers), and output stays a
+        # DataFrame when the final nodes produced one.
+        started = time.perf_counter()
+        try:
+            compiled = self.compile(workflow)
+        except (KeyError, ValueError) as e:
+            return {"success": False, "error": str(e)}
+        
+        trigger_items = self._wrap(items or [])
+        inputs = {name: [] for name in compiled.nodes}
+        remaining = {name: len(parents) for name, parents in compiled.parents.items()}
+        outputs = {}
+        nodes = {}
+        pending = {}
+        
+        def submit(name: str, data: Any):
+            future = self._executor.submit(self._timed, compiled, name, data, dry_run, batch)
+            pending[future] = name
+        
+        def finish(name: str, node_outputs: List[Any]):
+            outputs[name] = node_outputs
+            for index, child in compiled.edges[name]:
+                if index < len(node_outputs) and len(node_outputs[index]):
+                    inputs[child].append(node_outputs[index])
+                remaining[child] -= 1
+                if remaining[child] == 0:
+                    if inputs[child]:
+                        submit(child, self._combine(inputs.pop(child)))
+                    else:
+                        # Like n8n, a node that receives no items does not run
+                        nodes[child] = {"status": "skipped", "items": 0, "duration": 0.0}
+                        finish(child, [])
+        
+        for root in compiled.roots:
+            submit(root, trigger_items)
+        error = None
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = pending.pop(future)
+                try:
+                    node_outputs, elapsed = future.result()
+                except Exception as e:
+                    nodes[name] = {"status": "error", "error": str(e)}
+                    error = error or f"{name}: {e}"
+                    continue
+                nodes[name] = {"status": "success", "items": sum(len(output) for output in node_outputs),
+                               "duration": elapsed}
+                if error is None:
+                    finish(name, node_outputs)
+        
+        leaf_outputs = [outputs[leaf][0] for leaf in compiled.leaves if outputs.get(leaf) and len(outputs[leaf][0])]
+        result = {
+            "success": error is None,
+            "workflow": compiled.name,
+            "nodes": nodes,
+            "output": self._combine(leaf_outputs) if leaf_outputs else [],
+            "duration": time.perf_counter() - started
+        }
+        if error is not None:
+            result["error"] = error
+        return result
+    
+    def _timed(self, compiled: CompiledWorkflow, name: str, data: Any, dry_run: bool, batch: bool) -> Tuple[List[Any], float]:
+        started = time.perf_counter()
+        node_outputs = self._run_node(compiled, name, data, dry_run, batch)
+        return node_outputs, time.perf_counter() - started
+    
+    def close(self):
+        """Shut down the node worker pool"""
+        self._executor.shutdown(wait=True)
+
+def freeze(value: Any) -> Any:
+    """Recursively turn dicts into read-only mappings and lists into tuples"""
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+def thaw(value: Any) -> Any:
+    """Mutable deep copy of a frozen value"""
+    if isinstance(value, Mapping):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(item) for item in value]
+    return value
+
+class WorkflowDefinition(Mapping):
+    """Validated, immutable workflow definition with a content hash; reads like the original dict"""
+    
+    def __init__(self, key: str, definition: Dict, source: str):
+        self.key = key
+        self.source = source
+        self.definition = freeze(definition)
+        self.name = definition["name"]
+        self.content_hash = WorkflowDeployer.definition_hash(definition)
+        # Rendered once so the UI can hand st.json a ready string on every rerun
+        self.json = json.dumps(definition, indent=2, default=str)
+    
+    def __getitem__(self, key: str) -> Any:
+        return self.definition[key]
+    
+    def __iter__(self):
+        return iter(self.definition)
+    
+    def __len__(self) -> int:
+        return len(self.definition)
+    
+    def to_dict(self) -> Dict:
+        """Mutable copy of the definition"""
+        return thaw(self.definition)
+
+class WorkflowRegistry:
+    """Loads the built-in and sample workflow definitions once, validated and frozen, reloading on file change"""
+    
+    BUILDERS = (
+        "lead_generation_workflow",
+        "appointment_scheduling_workflow",
+        "customer_follow_up_workflow",
+        "invoice_generation_workflow"
+    )
+    
+    def __init__(self, data_dir: str = "data"):
+        self.sample_path = os.path.join(data_dir, "sample_workflows.json")
+        self.errors = {}
+        self._lock = threading.Lock()
+        self._sample_signature = None
+        self._sample = {}
+        self._builtin = {}
+        names = set()
+        for key in self.BUILDERS:
+            definition = self._load(key, getattr(AutomationWorkflows, key)(), "builtin", self.errors, names)
+            if definition is not None:
+                self._builtin[key] = definition
+        self.refresh()
+    
+    @staticmethod
+    def validate(definition: Dict) -> CompiledWorkflow:
+        """Check node IDs and names are unique, node types are known, schedules parse and every node is reachable from a trigger"""
+        ids = [node["id"] for node in definition.get("nodes", []) if "id" in node]
+        if len(ids) != len(set(ids)):
+            raise ValueError("Duplicate node id")
+        graph = WorkflowEngine.build_graph(definition)
+        for name, node in graph.nodes.items():
+            if node.get("type", "").rsplit(".", 1)[-1].lower() in ("cron", "scheduletrigger"):
+                try:
+                    CronSchedule.from_trigger(node.get("parameters", {})).next_after(datetime.now())
+                except (TypeError, ValueError) as e:
+                    raise ValueError(f"Invalid schedule in {name}: {e}")
+        triggers = [name for name in graph.order if graph.kinds[name] == "trigger"]
+        reached, frontier = set(), deque(triggers or graph.roots)
+        while frontier:
+            name = frontier.popleft()
+            if name not in reached:
+                reached.add(name)
+                frontier.extend(child for _, child in graph.edges[name])
+        unreachable = [name for name in graph.order if name not in reached]
+        if unreachable:
+            raise ValueError(f"Unreachable nodes: {', '.join(unreachable)}")
+        return graph
+    
+    def _load(self, key: str, definition: Dict, source: str, errors: Dict[str, str],
+              names: set) -> Optional[WorkflowDefinition]:
+        """Validate and freeze one definition, recording why it was rejected in errors"""
+        label = key if source == "builtin" else f"{os.path.basename(source)}:{key}"
+        try:
+            self.validate(definition)
+            if definition["name"] in names:
+                raise ValueError(f"Duplicate workflow name: {definition['name']}")
+            names.add(definition["name"])
+            return WorkflowDefinition(key, definition, source)
+        except KeyError as e:
+            errors[label] = f"Missing field {e}"
+        except (TypeError, ValueError) as e:
+            errors[label] = str(e)
+        return None
+    
+    def refresh(self) -> bool:
+        """Reload sample_workflows.json if its mtime or size changed; True when a reload happened"""
+        signature = DataFrameCache.file_signature(self.sample_path)
+        if signature == self._sample_signature:
+            return False
+        with self._lock:
+            if signature == self._sample_signature:
+                return False
+            errors = {key: error for key, error in self.errors.items() if key in self.BUILDERS}
+            names = {definition.name for definition in self._builtin.values()}
+            sample = {}
+            if signature is not None:
+                try:
+                    with open(self.sample_path) as f:
+                        raw = json.load(f)
+                except (OSError, ValueError) as e:
+                    raw = {}
+                    errors[self.sample_path] = str(e)
+                for key, definition in raw.items():
+                    loaded = self._load(key, definition, self.sample_path, errors, names)
+                    if loaded is not None:
+                        sample[key] = loaded
+            self._sample = sample
+            self.errors = errors
+            self._sample_signature = signature
+            return True
+    
+    def builtin(self) -> Dict[str, WorkflowDefinition]:
+        """The AutomationWorkflows definitions, keyed by builder name"""
+        return dict(self._builtin)
+    
+    def all(self) -> Dict[str, WorkflowDefinition]:
+        """Every valid definition keyed by workflow name, reloading the sample file if it changed"""
+        self.refresh()
+        return {definition.name: definition for definition in list(self._builtin.values()) + list(self._sample.values())}
+    
+    def get(self, name: str) -> Optional[WorkflowDefinition]:
+        """Definition by workflow name"""
+        return self.all().get(name)
+
+class CronSchedule:
+    """Five-field cron expression (minute hour day-of-month month day-of-week) with next-fire lookup"""
+    
+    FIELD_RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 6))
+    NAMES = {
+        3: {name: i + 1 for i, name in enumerate(["jan", "feb", "mar", "apr", "may", "jun",
+                                                   "jul", "aug", "sep", "oct", "nov", "dec"])},
+        4: {name: i for i, name in enumerate(["sun", "mon", "tue", "wed", "thu", "fri", "sat"])}
+    }
+    
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expression!r}")
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, self.weekdays = [
+            sorted(self._parse_field(field, position)) for position, field in enumerate(fields)
+        ]
+        # Standard cron: when both day fields are restricted a day matching either one fires
+        self.day_restricted = not fields[2].startswith("*")
+        self.weekday_restricted = not fields[4].startswith("*")
+        self._minute_set, self._hour_set = set(self.minutes), set(self.hours)
+        self._day_set, self._month_set, self._weekday_set = set(self.days), set(self.months), set(self.weekdays)
+    
+    @classmethod
+    def _parse_field(cls, field: str, position: int) -> set:
+        low, high = cls.FIELD_RANGES[position]
+        names = cls.NAMES.get(position, {})
+        # Weekday 7 is Sunday again; accept it (and sun as a range end) so 1-7 and mon-sun expand, then fold it into 0
+        limit = 7 if position == 4 else high
+        
+        def value(token: str) -> int:
+            number = names[token.lower()] if token.lower() in names else int(token)
+            if not low <= number <= limit:
+                raise ValueError(f"Cron value {token} out of range {low}-{limit}")
+            return number
+        
+        values = set()
+        for part in field.split(","):
+            base, _, step = part.partition("/")
+            step = int(step) if step else 1
+            if step < 1:
+                raise ValueError(f"Invalid cron step in {part!r}")
+            if base == "*":
+                start, end = low, high
+            elif "-" in base:
+                start, end = (value(token) for token in base.split("-", 1))
+                if position == 4 and end == 0 and start > 0:
+                    end = 7
+            else:
+                start = value(base)
+                end = high if step > 1 else start
+            values.update(range(start, end + 1, step))
+        if position == 4 and 7 in values:
+            values.discard(7)
+            values.add(0)
+        return values
+    
+    @classmethod
+    def from_trigger(cls, parameters: Dict) -> "CronSchedule":
+        """Schedule from a trigger node's `schedule`/`cronExpression` string, n8n `triggerTimes` or `rule.interval`"""
+        expression = parameters.get("schedule") or parameters.get("cronExpression")
+        if isinstance(expression, str):
+            return cls(expression)
+        rule = parameters.get("rule")
+        if isinstance(rule, Mapping) and "interval" in rule:
+            return cls(cls._interval_expression(rule["interval"]))
+        times = parameters.get("triggerTimes")
+        if not isinstance(times, Mapping):
+            raise ValueError("Trigger has no schedule")
+        if isinstance(times.get("item"), (list, tuple)) and times["item"]:
+            times = times["item"][0]
+        mode = times.get("mode")
+        if mode == "everyMinute":
+            return cls("* * * * *")
+        if mode == "everyHour":
+            return cls(f"{times.get('minute', 0)} * * * *")
+        fields = [times.get("minute", 0), times.get("hour", 0), times.get("day", times.get("dayOfMonth", "*")),
+                  times.get("month", "*"), times.get("weekday", "*")]
+        return cls(" ".join(str(field) for field in fields))
+    
+    @staticmethod
+    def _interval_expression(intervals: Any) -> str:
+        """Cron expression for a scheduleTrigger `rule.interval` list holding a single rule"""
+        if not isinstance(intervals, (list, tuple)) or len(intervals) != 1 or not isinstance(intervals[0], Mapping):
+            raise ValueError("Schedule trigger needs exactly one interval rule")
+        rule = intervals[0]
+        field = rule.get("field", "days")
+        minute, hour = rule.get("triggerAtMinute", 0), rule.get("triggerAtHour", 0)
+        if field == "cronExpression":
+            return str(rule.get("expression", ""))
+        if field == "minutes":
+            return f"*/{rule.get('minutesInterval', 5)} * * * *"
+        if field == "hours":
+            return f"{minute} */{rule.get('hoursInterval', 1)} * * *"
+        if field == "days":
+            return f"{minute} {hour} */{rule.get('daysInterval', 1)} * *"
+        if field == "weeks" and rule.get("weeksInterval", 1) == 1:
+            weekdays = rule.get("triggerAtDay") or [0]
+            return f"{minute} {hour} * * {','.join(str(day) for day in weekdays)}"
+        if field == "months":
+            return f"{minute} {hour} {rule.get('triggerAtDayOfMonth', 1)} */{rule.get('monthsInterval', 1)} *"
+        raise ValueError(f"Unsupported schedule interval: {field}")
+    
+    def _day_matches(self, moment: datetime) -> bool:
+        day_ok = moment.day in self._day_set
+        weekday_ok = (moment.weekday() + 1) % 7 in self._weekday_set
+        if self.day_restricted and self.weekday_restricted:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+    
+    def next_after(self, moment: datetime) -> datetime:
+        """First fire time strictly after moment"""
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate.year + 5
+        while candidate.year <= limit:
+            if candidate.month not in self._month_set:
+                candidate = (candidate.replace(day=1) + timedelta(days=32)).replace(day=1, hour=0, minute=0)
+                continue
+            if not self._day_matches(candidate):
+                candidate = (candidate + timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+            if candidate.hour not in self._hour_set:
+                index = bisect.bisect_right(self.hours, candidate.hour)
+                if index == len(self.hours):
+                    candidate = (candidate + timedelta(days=1)).replace(hour=0, minute=0)
+                else:
+                    candidate = candidate.replace(hour=self.hours[index], minute=0)
+                continue
+            if candidate.minute not in self._minute_set:
+                index = bisect.bisect_right(self.minutes, candidate.minute)
+                if index == len(self.minutes):
+                    candidate = candidate.replace(minute=0) + timedelta(hours=1)
+                    continue
+                candidate = candidate.replace(minute=self.minutes[index])
+            return candidate
+        raise ValueError(f"Cron expression never fires: {self.expression!r}")
+
+class WorkflowScheduler:
+    """Fires cron-triggered workflows from a min-heap of next run times onto a bounded worker pool"""
+    
+    MISFIRE_POLICIES = ("run_once", "skip")
+    OVERLAP_POLICIES = ("skip", "queue", "allow")
+    
+    def __init__(self, runner: Callable[[Dict], Dict], max_workers: int = 4, misfire_grace: float = 60.0,
+                 misfire_policy: str = "run_once", overlap_policy: str = "skip",
+                 clock: Callable[[], datetime] = datetime.now):
+        if misfire_policy not in self.MISFIRE_POLICIES:
+            raise ValueError(f"Unknown misfire policy: {misfire_policy}")
+        if overlap_policy not in self.OVERLAP_POLICIES:
+            raise ValueError(f"Unknown overlap policy: {overlap_policy}")
+        self.runner = runner
+        self.misfire_grace = misfire_grace
+        self.misfire_policy = misfire_policy
+        self.overlap_policy = overlap_policy
+        self.clock = clock
+        self.jobs = {}
+        # Definitions that could not be scheduled, by workflow name, with the reason
+        self.errors = {}
+        self._heap = []
+        self._sequence = 0
+        self._condition = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="workflow-scheduler")
+        self._running = False
+        self._thread = None
+    
+    @staticmethod
+    def trigger_schedule(workflow: Dict) -> Optional[CronSchedule]:
+        """Schedule of a workflow's cron trigger node, or None if it is not cron-triggered"""
+        for node in workflow.get("nodes", []):
+            if node.get("type", "").rsplit(".", 1)[-1].lower() in ("cron", "scheduletrigger"):
+                return CronSchedule.from_trigger(node.get("parameters", {}))
+        return None
+    
+    def _push(self, job: Dict):
+        # Entries carry the job's version; rescheduled or removed jobs leave stale entries that are skipped
+        self._sequence += 1
+        heapq.heappush(self._heap, (job["next_run"], self._sequence, job["name"], job["version"]))
+    
+    def add(self, workflow: Dict, schedule: Optional[CronSchedule] = None) -> bool:
+        """Schedule a workflow by its cron trigger (or an explicit schedule); False if it has none"""
+        schedule = schedule if schedule is not None else self.trigger_schedule(workflow)
+        if schedule is None:
+            return False
+        name = workflow["name"]
+        with self._condition:
+            previous = self.jobs.get(name, {})
+            job = {
+                "name": name, "workflow": workflow, "schedule": schedule,
+                "next_run": schedule.next_after(self.clock()), "version": previous.get("version", 0) + 1,
+                "last_run": previous.get("last_run"), "last_status": previous.get("last_status"),
+                "last_duration": previous.get("last_duration"), "last_error": previous.get("last_error"),
+                "running": 0, "queued": False,
+                "runs": previous.get("runs", 0), "successes": previous.get("successes", 0),
+                "misfires": previous.get("misfires", 0), "overlaps": previous.get("overlaps", 0)
+            }
+            self.jobs[name] = job
+            self._push(job)
+            self._condition.notify_all()
+        return True
+    
+    def add_definitions(self, definitions: Dict[str, Dict]) -> List[str]:
+        """Schedule every cron-triggered definition and return their names; unschedulable ones are skipped into errors"""
+        scheduled = []
+        for workflow in definitions.values():
+            try:
+                added = self.add(workflow)
+            except (TypeError, ValueError) as e:
+                self.errors[workflow["name"]] = str(e)
+                continue
+            self.errors.pop(workflow["name"], None)
+            if added:
+                scheduled.append(workflow["name"])
+        return scheduled
+    
+    def remove(self, name: str):
+        """Stop scheduling a workflow"""
+        with self._condition:
+            self.jobs.pop(name, None)
+    
+    def run_now(self, name: str) -> Optional[Future]:
+        """Dispatch a scheduled workflow immediately, subject to the overlap policy"""
+        with self._condition:
+            job = self.jobs.get(name)
+            return self._dispatch(job) if job is not None else None
+    
+    def _dispatch(self, job: Dict) -> Optional[Future]:
+        """Submit a run, honouring the overlap policy; called with the condition held"""
+        if job["running"] and self.overlap_policy != "allow":
+            job["overlaps"] += 1
+            if self.overlap_policy == "queue":
+                job["queued"] = True
+            return None
+        job["running"] += 1
+        return self._executor.submit(self._execute, job)
+    
+    def _execute(self, job: Dict) -> Dict:
+        started = self.clock()
+        timer = time.perf_counter()
+        try:
+            result = self.runner(job["workflow"])
+        except Exception as e:
+            result = {"success": False, "error": str(e)}
+        with self._condition:
+            job["running"] -= 1
+            job["runs"] += 1
+            job["successes"] += 1 if result.get("success") else 0
+            job["last_run"] = started
+            job["last_duration"] = time.perf_counter() - timer
+            job["last_status"] = "success" if result.get("success") else "error"
+            job["last_error"] = result.get("error")
+            if job["queued"] and self.jobs.get(job["name"]) is job:
+                job["queued"] = False
+                self._dispatch(job)
+        return result
+    
+    def tick(self) -> float:
+        """Dispatch every due job and return the seconds until the next one"""
+        with self._condition:
+            now = self.clock()
+            while self._heap and self._heap[0][0] <= now:
+                due, _, name, version = heapq.heappop(self._heap)
+                job = self.jobs.get(name)
+                if job is None or job["version"] != version:
+                    continue
+                late = (now - due).total_seconds()
+                if late <= self.misfire_grace or self.misfire_policy == "run_once":
+                    self._dispatch(job)
+                if late > self.misfire_grace:
+                    job["misfires"] += 1
+                # Next fire time is computed from now, so a long outage coalesces into one run
+                job["next_run"] = job["schedule"].next_after(now)
+                self._push(job)
+            if not self._heap:
+                return 60.0
+            return max(0.0, (self._heap[0][0] - now).total_seconds())
+    
+    def _run(self):
+        while True:
+            delay = self.tick()
+            with self._condition:
+                if not self._running:
+                    return
+                # Cap the sleep so wall-clock changes are noticed within a minute
+                self._condition.wait(min(delay, 60.0))
+                if not self._running:
+                    return
+    
+    def start(self):
+        """Run the scheduler loop in a background thread until stop() is called"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="workflow-scheduler", daemon=True)
+        self._thread.start()
+    
+    def stop(self, wait: bool = True):
+        """Stop firing new runs, optionally waiting for running ones"""
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self._executor.shutdown(wait=wait)
+    
+    def get_status(self) -> Dict[str, Dict]:
+        """Schedule, last/next run times and run counters for every job"""
+        with self._condition:
+            return {
+                name: {
+                    "schedule": job["schedule"].expression, "next_run": job["next_run"],
+                    "last_run": job["last_run"], "last_status": job["last_status"],
+                    "last_duration": job["last_duration"], "last_error": job["last_error"],
+                    "running": job["running"] > 0, "runs": job["runs"], "successes": job["successes"],
+                    "misfires": job["misfires"], "overlaps": job["overlaps"]
+                }
+                for name, job in self.jobs.items()
+            }
+
+# Guards seeding so concurrent sessions never write the sample files twice
+_SEED_LOCK = threading.Lock()
+
+def initialize_sample_data(overwrite: bool = False):
+    """Initialize sample CSV data for the system, writing only files that are missing"""
+    csv_manager = CSVManager(compact_dtypes=True)
+    
+    def needs_seed(filename: str, category: str) -> bool:
+        return overwrite or csv_manager._resolve_read_path(filename, category) is None
+    
+    with _SEED_LOCK:
+        # Sample client data
+        if needs_seed('clients.csv', 'clients'):
+            clients_data = pd.DataFrame({
+                'client_id': ['C001', 'C002', 'C003', 'C004', 'C005'],
+                'name': ['ABC Office Complex', 'Downtown Restaurant', 'Medical Center', 'Retail Store', 'Manufacturing Plant'],
+                'email': ['contact@abcoffice.com', 'manager@downtown.com', 'admin@medcenter.com', 'info@retailstore.com', 'ops@manufacturing.com'],
+                'phone': ['555-0101', '555-0102', '555-0103', '555-0104', '555-0105'],
+                'service_type': ['Commercial', 'Restaurant', 'Healthcare', 'Retail', 'Industrial'],
+                'monthly_amount': [3500, 2200, 4800, 6200, 8500],
+                'status': ['active', 'active', 'active', 'renewal', 'active'],
+                'created_at': pd.date_range('2024-01-01', periods=5, freq=pd.offsets.MonthEnd())
+            })
+            csv_manager.save_csv(clients_data, 'clients.csv', 'clients')
+        
+        # Sample leads data
+        if needs_seed('leads.csv', 'clients'):
+            leads_data = pd.DataFrame({
+                'lead_id': ['L001', 'L002', 'L003', 'L004', 'L005'],
+                'name': ['John Smith', 'Sarah Johnson', 'Mike Wilson', 'Lisa Brown', 'David Lee'],
+                'email': ['john@email.com', 'sarah@email.com', 'mike@email.com', 'lisa@email.com', 'david@email.com'],
+                'phone': ['555-1001', '555-1002', '555-1003', '555-1004', '555-1005'],
+                'service_type': ['Residential', 'Commercial', 'Deep Cleaning', 'Carpet Cleaning', 'Window Cleaning'],
+                'lead_source': ['Website', 'Referral', 'Google Ads', 'Social Media', 'Cold Call'],
+                'status': ['new', 'contacted', 'quoted', 'converted', 'lost'],
+                'created_at': pd.date_range('2024-12-01', periods=5, freq='D')
+            })
+            csv_manager.save_csv(leads_data, 'leads.csv', 'clients')
+        
+        # Sample automation logs
+        if needs_seed('automation_logs.csv', 'automations'):
+            automation_logs = pd.DataFrame({
+                'log_id': range(1, 11),
+                'workflow_name': ['Lead Generation Bot'] * 3 + ['Appointment Scheduler'] * 3 + ['Follow-up Assistant'] * 2 + ['Invoice Generator'] * 2,
+                'execution_time': pd.date_range('2024-12-01', periods=10, freq=pd.offsets.Hour()),
+                'status': ['success'] * 8 + ['failed', 'success'],
+                'records_processed': [5, 3, 7, 12, 8, 15, 6, 4, 0, 25],
+                'execution_duration': [2.5, 1.8, 3.2, 4.1, 2.9, 5.5, 1.2, 0.8, 0.0, 8.7]
+            })
+            csv_manager.save_csv(automation_logs, 'automation_logs.csv', 'automations')
     
     return csv_manager
 
+@st.cache_resource
+def get_shared_csv_manager() -> CSVManager:
+    """Process-wide CSVManager, seeded once, shared by every session"""
+    return initialize_sample_data()
+
+@st.cache_resource
+def get_shared_n8n_agent() -> N8NAgent:
+    """Process-wide N8NAgent shared by every session"""
+    return N8NAgent()
+
+@st.cache_resource
+def get_shared_webhook_manager() -> WebhookManager:
+    """Process-wide WebhookManager shared by every session"""
+    return WebhookManager()
+
+@st.cache_resource
+def get_shared_workflow_registry() -> WorkflowRegistry:
+    """Process-wide WorkflowRegistry, loaded and validated once"""
+    return WorkflowRegistry()
+
+@st.cache_resource
+def get_shared_workflow_deployer() -> WorkflowDeployer:
+    """Process-wide WorkflowDeployer using the shared N8NAgent and registry"""
+    return WorkflowDeployer(get_shared_n8n_agent(), registry=get_shared_workflow_registry())
+
+@st.cache_resource
+def get_shared_workflow_engine() -> WorkflowEngine:
+    """Process-wide WorkflowEngine over the shared CSVManager"""
+    return WorkflowEngine(get_shared_csv_manager())
+
+@st.cache_resource
+def get_shared_scheduler() -> WorkflowScheduler:
+    """Process-wide WorkflowScheduler running every cron-triggered definition on the shared engine"""
+    engine = get_shared_workflow_engine()
+    scheduler = WorkflowScheduler(lambda workflow: engine.run(workflow, batch=True))
+    scheduler.add_definitions(get_shared_workflow_registry().all())
+    scheduler.start()
+    return scheduler
+
+@st.cache_resource
+def get_shared_log_rollup() -> LogRollup:
+    """Process-wide LogRollup over the shared CSVManager's automation log"""
+    return LogRollup(get_shared_csv_manager())
+
+@st.cache_resource
+def get_shared_query_engine() -> CSVQueryEngine:
+    """Process-wide CSVQueryEngine over the shared CSVManager"""
+    return CSVQueryEngine(get_shared_csv_manager())